@@ -3,20 +3,34 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
+from typing import Any
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform, STATE_ON, STATE_OFF
 from homeassistant.core import HomeAssistant, callback, Event
 from homeassistant.helpers.typing import ConfigType
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_time_change,
+)
+from homeassistant.helpers.start import async_at_started
 
 from .const import (
     DOMAIN,
+    DATA_BABIES,
     CONF_CAMERA_CRYING_ENTITY,
     CONF_CAMERA_AUTO_TRACKING,
+    CONF_DUPLICATE_WINDOW_SECONDS,
+    CONF_ROOM_TEMPERATURE_ENTITY,
+    CONF_ROOM_HUMIDITY_ENTITY,
+    DEFAULT_DUPLICATE_WINDOW_SECONDS,
     ACTIVITY_CRYING,
     CRYING_MODERATE,
 )
+from .dedupe import LogDeduplicator
+from .refresh import SensorRefresher
 from .services import async_setup_services, async_remove_services
+from .util import baby_key
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,12 +49,14 @@ class CameraCryingTracker:
         baby_name: str,
         storage,
         camera_entity: str,
+        refresher: SensorRefresher | None = None,
     ) -> None:
         """Initialize the camera crying tracker."""
         self._hass = hass
         self._baby_name = baby_name
         self._storage = storage
         self._camera_entity = camera_entity
+        self._refresher = refresher
         self._crying_start_time: datetime | None = None
         self._unsub = None
 
@@ -97,6 +113,7 @@ class CameraCryingTracker:
                 "crying_intensity": CRYING_MODERATE,
                 "duration": 0,
                 "notes": "Auto-detected by camera (start)",
+                "camera_phase": "start",
             },
         )
         
@@ -127,6 +144,7 @@ class CameraCryingTracker:
                 "crying_intensity": CRYING_MODERATE,
                 "duration": duration_minutes,
                 "notes": f"Auto-detected by camera ({duration_minutes} min)",
+                "camera_phase": "end",
             },
         )
         
@@ -137,21 +155,9 @@ class CameraCryingTracker:
         await self._update_sensors()
 
     async def _update_sensors(self) -> None:
-        """Update all sensors after logging activity."""
-        from homeassistant.helpers.entity_component import async_update_entity
-        from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
-        
-        entity_registry = async_get_entity_registry(self._hass)
-        baby_slug = self._baby_name.lower().replace(" ", "_")
-        
-        # Update all sensors for this baby
-        for entity_id, entry in entity_registry.entities.items():
-            if (
-                entry.domain == "sensor"
-                and entry.platform == DOMAIN
-                and baby_slug in entity_id
-            ):
-                await async_update_entity(self._hass, entity_id)
+        """Queue a refresh of all sensors after logging activity."""
+        if self._refresher is not None:
+            self._refresher.async_schedule()
 
     def stop(self) -> None:
         """Stop tracking camera state changes."""
@@ -167,9 +173,20 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     return True
 
 
+def _loaded_entries(hass: HomeAssistant) -> list[dict[str, Any]]:
+    """Return the data of every loaded config entry."""
+    return [
+        entry_data
+        for entry_id, entry_data in hass.data[DOMAIN].items()
+        if entry_id != DATA_BABIES
+    ]
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Baby Monitor from a config entry."""
     from .storage import BabyMonitorStorage
+    from .coordinator import AnalyticsCoordinator
+    from .scheduler import RefreshScheduler
     from .const import ATTR_BABY_NAME
     
     hass.data.setdefault(DOMAIN, {})
@@ -179,16 +196,65 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     storage = BabyMonitorStorage(hass, baby_name)
     await storage.async_load()
     
+    # One timer per baby wakes time-dependent sensors when their output changes
+    scheduler = RefreshScheduler(hass, storage)
+    scheduler.async_start()
+    
+    # The 30-day summaries run in the executor, one computation at a time
+    analytics = AnalyticsCoordinator(hass, storage)
+    analytics.async_start()
+    
+    # Reset today's running totals at midnight in Home Assistant's time zone
+    entry.async_on_unload(
+        async_track_time_change(
+            hass, storage.async_roll_over_day, hour=0, minute=0, second=0
+        )
+    )
+    
+    # Push hourly totals into long-term statistics, backfilling on first run
+    async def _async_import_statistics(_now: Any = None) -> None:
+        from .long_term_statistics import async_import_statistics
+        
+        await async_import_statistics(hass, storage)
+    
+    entry.async_on_unload(async_at_started(hass, _async_import_statistics))
+    entry.async_on_unload(
+        async_track_time_change(hass, _async_import_statistics, minute=1, second=0)
+    )
+    
+    # Writes queue one coalesced sensor refresh per baby
+    refresher = SensorRefresher(hass, entry.entry_id, baby_name)
+    refresher.async_start()
+    
     # Store data for platforms to access
-    hass.data[DOMAIN][entry.entry_id] = {
+    entry_data = hass.data[DOMAIN][entry.entry_id] = {
         "storage": storage,
         "baby_name": baby_name,
         "options": entry.options,
         "camera_tracker": None,
+        "environment_tracker": None,
+        "scheduler": scheduler,
+        "analytics": analytics,
+        "refresher": refresher,
+        "deduplicator": LogDeduplicator(
+            entry.options.get(CONF_DUPLICATE_WINDOW_SECONDS, DEFAULT_DUPLICATE_WINDOW_SECONDS)
+        ),
     }
     
+    # Index babies by normalized name so services find them in O(1)
+    babies = hass.data[DOMAIN].setdefault(DATA_BABIES, {})
+    key = baby_key(baby_name)
+    if key in babies:
+        # Only entries created before the config flow rejected such names
+        _LOGGER.warning(
+            "Baby name %s matches another configured baby; services will use the first one",
+            baby_name,
+        )
+    else:
+        babies[key] = entry_data
+    
     # Set up services (only once)
-    if len(hass.data[DOMAIN]) == 1:
+    if len(_loaded_entries(hass)) == 1:
         await async_setup_services(hass)
     
     # Set up camera tracking if enabled
@@ -196,7 +262,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     camera_enabled = entry.options.get(CONF_CAMERA_AUTO_TRACKING, False)
     
     if camera_enabled and camera_entity:
-        tracker = CameraCryingTracker(hass, baby_name, storage, camera_entity)
+        tracker = CameraCryingTracker(hass, baby_name, storage, camera_entity, refresher)
         await tracker.async_start()
         hass.data[DOMAIN][entry.entry_id]["camera_tracker"] = tracker
         _LOGGER.info(
@@ -205,6 +271,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             camera_entity,
         )
     
+    # Record room conditions straight from existing sensors
+    temperature_entity = entry.options.get(CONF_ROOM_TEMPERATURE_ENTITY)
+    humidity_entity = entry.options.get(CONF_ROOM_HUMIDITY_ENTITY)
+    if temperature_entity or humidity_entity:
+        from .environment import EnvironmentTracker
+        
+        environment_tracker = EnvironmentTracker(
+            hass, storage, temperature_entity, humidity_entity
+        )
+        environment_tracker.async_start()
+        entry_data["environment_tracker"] = environment_tracker
+    
     # Register update listener for options changes
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     
@@ -224,12 +302,29 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     camera_tracker = entry_data.get("camera_tracker")
     if camera_tracker:
         camera_tracker.stop()
+    environment_tracker = entry_data.get("environment_tracker")
+    if environment_tracker:
+        environment_tracker.async_stop()
     
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data["scheduler"].async_stop()
+        entry_data["analytics"].async_stop()
+        entry_data["refresher"].async_stop()
+        
+        babies = hass.data[DOMAIN][DATA_BABIES]
+        key = baby_key(entry_data["baby_name"])
+        if babies.get(key) is entry_data:
+            del babies[key]
+            # A loaded entry with the same name takes over
+            for other in _loaded_entries(hass):
+                if baby_key(other["baby_name"]) == key:
+                    babies[key] = other
+                    break
         
         # Remove services if this was the last entry
-        if not hass.data[DOMAIN]:
+        if not _loaded_entries(hass):
+            hass.data[DOMAIN].pop(DATA_BABIES)
             await async_remove_services(hass)
     
     return unload_ok
\ No newline at end of file
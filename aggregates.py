@@ -0,0 +1,1102 @@
+"""Incrementally maintained aggregates for Baby Monitor activities."""
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, bisect_right
+from collections import deque
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, NamedTuple
+
+from .const import (
+    ACTIVITY_CRYING,
+    ACTIVITY_DIAPER_CHANGE,
+    ACTIVITY_FEEDING,
+    ACTIVITY_MOOD,
+    ACTIVITY_SLEEP,
+    ACTIVITY_TUMMY_TIME,
+)
+
+
+class WindowSpec(NamedTuple):
+    """Definition of a sliding-window metric over one activity type."""
+
+    activity_type: str
+    days: int
+    value_field: str | None = None
+    category: Callable[[dict[str, Any]], str | None] | None = None
+    include: Callable[[dict[str, Any]], bool] | None = None
+
+
+def _is_sleep_end(data: dict[str, Any]) -> bool:
+    """Return True for the record that closes a sleep session."""
+    return data.get("sleep_type") == "end"
+
+
+def _sleep_length(data: dict[str, Any]) -> str:
+    """Classify a sleep session as short (under an hour) or long."""
+    return "short" if data.get("duration", 0) < 60 else "long"
+
+
+WINDOW_SPECS: dict[str, WindowSpec] = {
+    "sleep_records_3d": WindowSpec(ACTIVITY_SLEEP, 3),
+    "sleep_sessions_3d": WindowSpec(ACTIVITY_SLEEP, 3, "duration", include=_is_sleep_end),
+    "sleep_sessions_7d": WindowSpec(
+        ACTIVITY_SLEEP, 7, "duration", category=_sleep_length, include=_is_sleep_end
+    ),
+    "diaper_changes_7d": WindowSpec(
+        ACTIVITY_DIAPER_CHANGE, 7, category=lambda data: data.get("diaper_type")
+    ),
+    "feedings_7d": WindowSpec(ACTIVITY_FEEDING, 7, "feeding_amount"),
+    "moods_7d": WindowSpec(ACTIVITY_MOOD, 7, category=lambda data: data.get("mood_type")),
+}
+
+
+class IndexSpec(NamedTuple):
+    """Definition of a metric kept in a timestamp index."""
+
+    activity_type: str
+    value_field: str | None = None
+    include: Callable[[dict[str, Any]], bool] | None = None
+
+
+INDEX_SPECS: dict[str, IndexSpec] = {
+    "sleep_duration": IndexSpec(ACTIVITY_SLEEP, "duration", _is_sleep_end),
+    "feeding_amount": IndexSpec(ACTIVITY_FEEDING, "feeding_amount"),
+    "diaper_changes": IndexSpec(ACTIVITY_DIAPER_CHANGE),
+    "crying_duration": IndexSpec(ACTIVITY_CRYING, "duration"),
+    "tummy_time_duration": IndexSpec(ACTIVITY_TUMMY_TIME, "duration"),
+}
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_seconds(when: datetime) -> float:
+    """Convert a naive timestamp to seconds for index keys."""
+    return (when - _EPOCH).total_seconds()
+
+
+def from_seconds(seconds: float) -> datetime:
+    """Convert index key seconds back to a naive timestamp."""
+    return _EPOCH + timedelta(seconds=seconds)
+
+
+class StatisticSpec(NamedTuple):
+    """Definition of an hourly long-term statistic."""
+
+    name: str
+    activity_type: str
+    unit: str | None = None
+    value_field: str | None = None
+    include: Callable[[dict[str, Any]], bool] | None = None
+
+
+STATISTIC_SPECS: dict[str, StatisticSpec] = {
+    "diaper_changes": StatisticSpec("Diaper changes", ACTIVITY_DIAPER_CHANGE),
+    "feedings": StatisticSpec("Feedings", ACTIVITY_FEEDING),
+    "feeding_amount": StatisticSpec(
+        "Feeding amount", ACTIVITY_FEEDING, "ml", "feeding_amount"
+    ),
+    "sleep_minutes": StatisticSpec(
+        "Sleep", ACTIVITY_SLEEP, "min", "duration", _is_sleep_end
+    ),
+    "tummy_time_minutes": StatisticSpec(
+        "Tummy time", ACTIVITY_TUMMY_TIME, "min", "duration"
+    ),
+    "crying_episodes": StatisticSpec("Crying episodes", ACTIVITY_CRYING),
+}
+
+
+def hourly_totals(activities: list[dict[str, Any]]) -> dict[str, dict[datetime, float]]:
+    """Sum each long-term statistic per clock hour.
+
+    Count statistics add one per activity, the others add their value field.
+    """
+    totals: dict[str, dict[datetime, float]] = {}
+    for activity in activities:
+        data = activity["data"]
+        hour = None
+        for metric, spec in STATISTIC_SPECS.items():
+            if spec.activity_type != activity["type"]:
+                continue
+            if spec.include is not None and not spec.include(data):
+                continue
+            if hour is None:
+                hour = datetime.fromisoformat(activity["timestamp"]).replace(
+                    minute=0, second=0, microsecond=0
+                )
+            value = (data.get(spec.value_field) or 0) if spec.value_field else 1
+            buckets = totals.setdefault(metric, {})
+            buckets[hour] = buckets.get(hour, 0) + value
+    return totals
+
+
+# Numeric fields summed per activity type for the current day
+TODAY_SUM_FIELDS: dict[str, tuple[str, ...]] = {
+    ACTIVITY_FEEDING: ("feeding_amount",),
+    ACTIVITY_SLEEP: ("duration",),
+    ACTIVITY_TUMMY_TIME: ("duration",),
+    ACTIVITY_CRYING: ("duration",),
+}
+
+# Categorical field counted per activity type for the current day
+TODAY_BREAKDOWN_FIELDS: dict[str, str] = {
+    ACTIVITY_DIAPER_CHANGE: "diaper_type",
+    ACTIVITY_FEEDING: "feeding_type",
+    ACTIVITY_SLEEP: "sleep_type",
+    ACTIVITY_CRYING: "crying_intensity",
+    ACTIVITY_MOOD: "mood_type",
+}
+
+
+class TodayTotals:
+    """Running totals for the activities logged on one calendar day.
+
+    Each insert updates the totals in O(1). The storage replaces the whole
+    object at midnight so readers never observe a half-reset day.
+    """
+
+    def __init__(self, day: date) -> None:
+        """Initialize empty totals for a day."""
+        self.day = day
+        self._counts: dict[str, int] = {}
+        self._sums: dict[tuple[str, str], float] = {}
+        self._breakdowns: dict[str, dict[str, int]] = {}
+        self._last: dict[str, str] = {}
+
+    def add(self, activity: dict[str, Any]) -> None:
+        """Add an activity logged on this day."""
+        activity_type = activity["type"]
+        data = activity["data"]
+
+        self._counts[activity_type] = self._counts.get(activity_type, 0) + 1
+
+        for field in TODAY_SUM_FIELDS.get(activity_type, ()):
+            key = (activity_type, field)
+            self._sums[key] = self._sums.get(key, 0) + (data.get(field) or 0)
+
+        if field := TODAY_BREAKDOWN_FIELDS.get(activity_type):
+            breakdown = self._breakdowns.setdefault(activity_type, {})
+            value = data.get(field, "unknown")
+            breakdown[value] = breakdown.get(value, 0) + 1
+
+        if activity["timestamp"] >= self._last.get(activity_type, ""):
+            self._last[activity_type] = activity["timestamp"]
+
+    def count(self, activity_type: str) -> int:
+        """Return the number of activities of a type."""
+        return self._counts.get(activity_type, 0)
+
+    def total(self, activity_type: str, field: str) -> float:
+        """Return the sum of a numeric field for an activity type."""
+        return self._sums.get((activity_type, field), 0)
+
+    def breakdown(self, activity_type: str) -> dict[str, int]:
+        """Return counts per category value for an activity type."""
+        return dict(self._breakdowns.get(activity_type, {}))
+
+    def count_where(self, activity_type: str, *values: str) -> int:
+        """Return the number of activities whose category is one of values."""
+        breakdown = self._breakdowns.get(activity_type, {})
+        return sum(breakdown.get(value, 0) for value in values)
+
+    def last_timestamp(self, activity_type: str) -> str | None:
+        """Return the timestamp of the latest activity of a type."""
+        return self._last.get(activity_type)
+
+
+class SlidingWindow:
+    """Time-based window with running count, sum, min, max and category counts.
+
+    Entries are expected in time order. Adding an entry and evicting expired
+    ones are amortized O(1): the sum and category counts are adjusted in place
+    and min/max come from monotonic deques.
+    """
+
+    def __init__(self, span: timedelta) -> None:
+        """Initialize an empty window covering span."""
+        self.span = span
+        self._entries: deque[tuple[datetime, float, str | None]] = deque()
+        self._minimums: deque[tuple[datetime, float]] = deque()
+        self._maximums: deque[tuple[datetime, float]] = deque()
+        self._categories: dict[str, int] = {}
+        self.total: float = 0
+
+    def add(self, when: datetime, value: float = 0, category: str | None = None) -> None:
+        """Add an entry at time when."""
+        self._entries.append((when, value, category))
+        self.total += value
+
+        while self._minimums and self._minimums[-1][1] >= value:
+            self._minimums.pop()
+        self._minimums.append((when, value))
+
+        while self._maximums and self._maximums[-1][1] <= value:
+            self._maximums.pop()
+        self._maximums.append((when, value))
+
+        if category is not None:
+            self._categories[category] = self._categories.get(category, 0) + 1
+
+    def advance(self, now: datetime) -> None:
+        """Evict entries that are older than the window span."""
+        cutoff = now - self.span
+
+        while self._entries and self._entries[0][0] < cutoff:
+            _, value, category = self._entries.popleft()
+            self.total -= value
+            if category is not None:
+                self._categories[category] -= 1
+                if not self._categories[category]:
+                    del self._categories[category]
+
+        while self._minimums and self._minimums[0][0] < cutoff:
+            self._minimums.popleft()
+        while self._maximums and self._maximums[0][0] < cutoff:
+            self._maximums.popleft()
+
+    @property
+    def count(self) -> int:
+        """Return the number of entries in the window."""
+        return len(self._entries)
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean value, or None for an empty window."""
+        return self.total / len(self._entries) if self._entries else None
+
+    @property
+    def minimum(self) -> float | None:
+        """Return the smallest value in the window."""
+        return self._minimums[0][1] if self._minimums else None
+
+    @property
+    def maximum(self) -> float | None:
+        """Return the largest value in the window."""
+        return self._maximums[0][1] if self._maximums else None
+
+    def expires_at(self) -> datetime | None:
+        """Return when the oldest entry leaves the window."""
+        return self._entries[0][0] + self.span if self._entries else None
+
+    def category_count(self, *categories: str) -> int:
+        """Return the number of entries in any of the given categories."""
+        return sum(self._categories.get(category, 0) for category in categories)
+
+    def categories(self) -> dict[str, int]:
+        """Return entry counts per category."""
+        return dict(self._categories)
+
+
+class TimestampIndex:
+    """Sorted timestamps with prefix sums for O(log n) range aggregates.
+
+    Appending in time order is O(1). An out-of-order insert rebuilds the
+    prefix sums, which only happens for backdated records.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._keys: list[float] = []
+        self._values: list[float] = []
+        self._prefix: list[float] = [0]
+
+    def add(self, when: datetime, value: float = 0) -> None:
+        """Add a value at time when."""
+        key = to_seconds(when)
+        if not self._keys or key >= self._keys[-1]:
+            self._keys.append(key)
+            self._values.append(value)
+            self._prefix.append(self._prefix[-1] + value)
+            return
+
+        position = bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._values.insert(position, value)
+        self._prefix = [0]
+        for item in self._values:
+            self._prefix.append(self._prefix[-1] + item)
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return len(self._keys)
+
+    def _bounds(self, start: datetime, end: datetime) -> tuple[int, int]:
+        """Return list positions covering the range (start, end]."""
+        return (
+            bisect_right(self._keys, to_seconds(start)),
+            bisect_right(self._keys, to_seconds(end)),
+        )
+
+    def aggregate(self, start: datetime, end: datetime) -> dict[str, Any]:
+        """Return count, sum and mean for entries in (start, end]."""
+        low, high = self._bounds(start, end)
+        count = high - low
+        total = self._prefix[high] - self._prefix[low]
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else None,
+        }
+
+    def next_expiry(self, now: datetime, span: timedelta) -> datetime | None:
+        """Return when the oldest entry in (now - span, now] leaves that range."""
+        position = bisect_right(self._keys, to_seconds(now - span))
+        if position >= len(self._keys):
+            return None
+        return _EPOCH + timedelta(seconds=self._keys[position]) + span
+
+
+class FeedingModel:
+    """Exponentially weighted feeding interval with a time-of-day profile.
+
+    Each feeding updates the overall interval estimate and the estimate for
+    the hour of day the interval started in, both in O(1). Feedings are
+    expected in time order.
+    """
+
+    # Weight given to the newest interval
+    ALPHA = 0.3
+    # Longer gaps are missed logs or overnight breaks, not feeding intervals
+    MAX_INTERVAL_HOURS = 12
+    # Intervals needed in an hour bin before it overrides the overall estimate
+    PROFILE_MIN_SAMPLES = 3
+
+    def __init__(self) -> None:
+        """Initialize an empty model."""
+        self.last: datetime | None = None
+        self.samples = 0
+        self._mean = 0.0
+        self._variance = 0.0
+        self._profile: list[tuple[int, float]] = [(0, 0.0)] * 24
+
+    def add(self, when: datetime) -> None:
+        """Add a feeding at time when; feedings older than the last are ignored."""
+        last = self.last
+        if last is not None and when <= last:
+            return
+        self.last = when
+        if last is None:
+            return
+
+        interval = (when - last).total_seconds() / 3600
+        if interval > self.MAX_INTERVAL_HOURS:
+            return
+
+        if self.samples:
+            diff = interval - self._mean
+            self._mean += self.ALPHA * diff
+            self._variance = (1 - self.ALPHA) * (self._variance + self.ALPHA * diff * diff)
+        else:
+            self._mean = interval
+        self.samples += 1
+
+        count, mean = self._profile[last.hour]
+        mean = mean + self.ALPHA * (interval - mean) if count else interval
+        self._profile[last.hour] = (count + 1, mean)
+
+    @property
+    def interval_hours(self) -> float | None:
+        """Return the expected interval after the last feeding."""
+        if self.samples < 2 or self.last is None:
+            return None
+        count, mean = self._profile[self.last.hour]
+        return mean if count >= self.PROFILE_MIN_SAMPLES else self._mean
+
+    @property
+    def uses_profile(self) -> bool:
+        """Return True if the time-of-day profile drives the prediction."""
+        return (
+            self.last is not None
+            and self._profile[self.last.hour][0] >= self.PROFILE_MIN_SAMPLES
+        )
+
+    @property
+    def deviation_hours(self) -> float:
+        """Return the weighted standard deviation of the interval."""
+        return self._variance ** 0.5
+
+    def predicted_next(self) -> datetime | None:
+        """Return the predicted time of the next feeding."""
+        interval = self.interval_hours
+        if interval is None:
+            return None
+        return self.last + timedelta(hours=interval)
+
+    @property
+    def confidence(self) -> str:
+        """Return how consistent the recent intervals have been."""
+        if self.samples < 2 or not self._mean:
+            return "Low"
+        spread = self.deviation_hours / self._mean
+        if self.samples >= 4 and spread <= 0.25:
+            return "High"
+        if spread <= 0.5:
+            return "Medium"
+        return "Low"
+
+
+class FeedingTotals:
+    """Running sums and counts per feeding type, updated in O(1) per feeding."""
+
+    def __init__(self) -> None:
+        """Initialize empty totals."""
+        self._totals: dict[str, dict[str, float]] = {}
+
+    def add(self, data: dict[str, Any]) -> None:
+        """Add a feeding."""
+        totals = self._totals.setdefault(
+            data.get("feeding_type", "unknown"),
+            dict.fromkeys(
+                (
+                    "count",
+                    "amount",
+                    "amount_samples",
+                    "duration",
+                    "duration_samples",
+                    "ratio",
+                    "ratio_amount",
+                    "ratio_duration",
+                    "ratio_samples",
+                ),
+                0,
+            ),
+        )
+        amount = data.get("feeding_amount")
+        duration = data.get("feeding_duration")
+
+        totals["count"] += 1
+        if amount is not None:
+            totals["amount"] += amount
+            totals["amount_samples"] += 1
+        if duration is not None:
+            totals["duration"] += duration
+            totals["duration_samples"] += 1
+        if (amount or 0) > 0 and (duration or 0) > 0:
+            totals["ratio"] += amount / duration
+            totals["ratio_amount"] += amount
+            totals["ratio_duration"] += duration
+            totals["ratio_samples"] += 1
+
+    def get(self, field: str, feeding_type: str | None = None) -> float:
+        """Return a running total for one feeding type, or all types."""
+        if feeding_type is not None:
+            return self._totals.get(feeding_type, {}).get(field, 0)
+        return sum(totals[field] for totals in self._totals.values())
+
+    def count_matching(self, text: str) -> int:
+        """Return the number of feedings whose type contains text."""
+        return sum(
+            totals["count"]
+            for feeding_type, totals in self._totals.items()
+            if text in feeding_type
+        )
+
+    def average_amount(self, feeding_type: str | None = None) -> float | None:
+        """Return the mean amount over feedings that recorded one."""
+        samples = self.get("amount_samples", feeding_type)
+        return self.get("amount", feeding_type) / samples if samples else None
+
+    def average_ratio(self, feeding_type: str | None = None) -> float | None:
+        """Return the mean amount per minute over feedings with both values."""
+        samples = self.get("ratio_samples", feeding_type)
+        return self.get("ratio", feeding_type) / samples if samples else None
+
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+class CryingHistogram:
+    """Crying episodes and minutes per hour of day and per weekday hour.
+
+    Each episode is placed in the hour it started, which for a record with a
+    duration is its timestamp minus that duration. The camera tracker's
+    start marker is skipped because its end record describes the episode.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty 24 and 7x24 bins."""
+        self.episodes = [[0] * 24 for _ in WEEKDAYS]
+        self.minutes = [[0] * 24 for _ in WEEKDAYS]
+
+    def add(self, activity: dict[str, Any]) -> None:
+        """Add a crying record."""
+        data = activity["data"]
+        if data.get("camera_phase") == "start":
+            return
+
+        duration = data.get("duration") or 0
+        start = datetime.fromisoformat(activity["timestamp"]) - timedelta(minutes=duration)
+        self.episodes[start.weekday()][start.hour] += 1
+        self.minutes[start.weekday()][start.hour] += duration
+
+    def hourly_episodes(self) -> list[int]:
+        """Return episodes per hour of day over all weekdays."""
+        return [sum(day[hour] for day in self.episodes) for hour in range(24)]
+
+    def hourly_minutes(self) -> list[float]:
+        """Return crying minutes per hour of day over all weekdays."""
+        return [sum(day[hour] for day in self.minutes) for hour in range(24)]
+
+    def peak_hour(self) -> int | None:
+        """Return the hour of day with the most episodes."""
+        hourly = self.hourly_episodes()
+        peak = max(range(24), key=hourly.__getitem__)
+        return peak if hourly[peak] else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return both histograms in a JSON friendly form."""
+        return {
+            "hourly": {
+                "episodes": self.hourly_episodes(),
+                "minutes": self.hourly_minutes(),
+            },
+            "weekly": {
+                weekday: {
+                    "episodes": list(self.episodes[day]),
+                    "minutes": list(self.minutes[day]),
+                }
+                for day, weekday in enumerate(WEEKDAYS)
+            },
+            "peak_hour": self.peak_hour(),
+        }
+
+
+class GrowthTrend:
+    """Least-squares trend over the measurements of the last window_days.
+
+    The window ends at the newest measurement, so sparse measurements still
+    give a trend. Sufficient statistics (n, sums of t, y, t*t, t*y, y*y) are
+    kept for the points in the window; adding a measurement, even an older
+    one, adjusts them in O(1) plus a binary search, and slope,
+    intercept and residual spread are read from them without rescanning.
+    """
+
+    OUTLIER_THRESHOLD = 2.5
+
+    def __init__(self, window_days: float) -> None:
+        """Initialize an empty trend."""
+        self.window_days = window_days
+        self.window = window_days * 86400
+        self._times: list[float] = []
+        self._values: list[float] = []
+        # Index of the oldest point inside the window
+        self._start = 0
+        self._origin: float | None = None
+        self._n = 0
+        self._t = self._y = self._tt = self._ty = self._yy = 0.0
+
+    def _apply(self, when: float, value: float, sign: int) -> None:
+        """Add (sign 1) or remove (sign -1) a point from the statistics."""
+        # Days from a fixed origin keep the squared sums well conditioned
+        t = (when - self._origin) / 86400
+        self._n += sign
+        self._t += sign * t
+        self._y += sign * value
+        self._tt += sign * t * t
+        self._ty += sign * t * value
+        self._yy += sign * value * value
+
+    def _cutoff(self) -> float:
+        """Return the oldest timestamp inside the window."""
+        return self._times[-1] - self.window
+
+    def _slide(self) -> None:
+        """Move the window start to match the newest measurement."""
+        cutoff = self._cutoff()
+        while self._start < len(self._times) and self._times[self._start] < cutoff:
+            self._apply(self._times[self._start], self._values[self._start], -1)
+            self._start += 1
+
+    def add(self, when: float, value: float) -> None:
+        """Add a measurement taken at when (seconds, see to_seconds)."""
+        if self._origin is None:
+            self._origin = when
+        position = bisect_right(self._times, when)
+        self._times.insert(position, when)
+        self._values.insert(position, value)
+        if position < self._start or when < self._cutoff():
+            self._start += 1
+        else:
+            self._apply(when, value, 1)
+        self._slide()
+
+    @property
+    def count(self) -> int:
+        """Return the number of measurements in the window."""
+        return self._n
+
+    @property
+    def latest(self) -> tuple[float, float] | None:
+        """Return the newest (timestamp, value), or None."""
+        return (self._times[-1], self._values[-1]) if self._times else None
+
+    def _centered(self) -> tuple[float, float, float]:
+        """Return the centered sums Stt, Sty and Syy."""
+        n = self._n
+        return (
+            self._tt - self._t * self._t / n,
+            self._ty - self._t * self._y / n,
+            self._yy - self._y * self._y / n,
+        )
+
+    @property
+    def slope(self) -> float | None:
+        """Return the fitted change per day, or None with too little spread."""
+        if self._n < 2:
+            return None
+        stt, sty, _ = self._centered()
+        # Measurements taken within a minute of each other give no trend
+        if stt < 1e-6:
+            return None
+        return sty / stt
+
+    def predict(self, when: float) -> float | None:
+        """Return the fitted value at a timestamp."""
+        slope = self.slope
+        if slope is None:
+            return None
+        t = (when - self._origin) / 86400
+        return (self._y - slope * self._t) / self._n + slope * t
+
+    @property
+    def residual_std(self) -> float | None:
+        """Return the standard deviation of the residuals, needs 3 points."""
+        slope = self.slope
+        if slope is None or self._n < 3:
+            return None
+        _, sty, syy = self._centered()
+        return (max(syy - slope * sty, 0) / (self._n - 2)) ** 0.5
+
+    def residual(self, when: float, value: float) -> float | None:
+        """Return the residual of a measurement against the fit."""
+        fitted = self.predict(when)
+        return None if fitted is None else value - fitted
+
+    def is_outlier(self, when: float, value: float) -> bool | None:
+        """Return whether a measurement is far from the fit, needs 4 points."""
+        residual = self.residual(when, value)
+        spread = self.residual_std
+        if residual is None or spread is None or self._n < 4:
+            return None
+        if spread == 0:
+            return False
+        return abs(residual) > self.OUTLIER_THRESHOLD * spread
+
+
+QUERY_GROUP_BY = ("none", "hour", "day", "week")
+QUERY_AGGREGATES = ("count", "sum", "mean", "min", "max")
+MAX_QUERY_BUCKETS = 500
+_SECONDS_PER_HOUR = 3600
+_SECONDS_PER_DAY = 86400
+
+
+def _bucket_start(key: float, group_by: str) -> float:
+    """Return the start of the hour, day or Monday-based week holding key."""
+    if group_by == "hour":
+        return math.floor(key / _SECONDS_PER_HOUR) * _SECONDS_PER_HOUR
+    day = math.floor(key / _SECONDS_PER_DAY)
+    if group_by == "week":
+        # 1970-01-01 was a Thursday
+        day -= (day + 3) % 7
+    return day * _SECONDS_PER_DAY
+
+
+def _reduced(
+    count: int, total: float, low: float, high: float, aggregates: tuple[str, ...]
+) -> dict[str, Any]:
+    """Return the requested aggregates of one group."""
+    result = {
+        "count": count,
+        "sum": round(total, 6),
+        "mean": round(total / count, 6) if count else None,
+        "min": low if count else None,
+        "max": high if count else None,
+    }
+    return {name: result[name] for name in aggregates}
+
+
+def group_reduce(
+    timestamps: list[float],
+    values: list[float],
+    start: datetime | None,
+    end: datetime | None,
+    group_by: str = "none",
+    aggregates: tuple[str, ...] = ("count",),
+    limit: int = MAX_QUERY_BUCKETS,
+) -> dict[str, Any]:
+    """Aggregate time-ordered columns over [start, end], optionally per bucket.
+
+    The range is found by bisection, so only matching entries are visited.
+    Only buckets with data are returned; when there are more than limit,
+    the most recent ones are kept and truncated is set.
+    """
+    low = 0 if start is None else bisect_left(timestamps, to_seconds(start))
+    high = len(timestamps) if end is None else bisect_right(timestamps, to_seconds(end))
+    selected = values[low:high]
+    result: dict[str, Any] = _reduced(
+        len(selected),
+        math.fsum(selected),
+        min(selected, default=0),
+        max(selected, default=0),
+        aggregates,
+    )
+    if group_by == "none":
+        return result
+
+    # bucket start -> [count, sum, min, max]
+    buckets: dict[float, list[float]] = {}
+    for position in range(low, high):
+        key = _bucket_start(timestamps[position], group_by)
+        value = values[position]
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [1, value, value, value]
+            continue
+        bucket[0] += 1
+        bucket[1] += value
+        bucket[2] = min(bucket[2], value)
+        bucket[3] = max(bucket[3], value)
+
+    keys = list(buckets)
+    result["truncated"] = len(keys) > limit
+    result["buckets"] = [
+        {
+            "start": (_EPOCH + timedelta(seconds=key)).isoformat(),
+            **_reduced(*buckets[key], aggregates),
+        }
+        for key in keys[-limit:]
+    ]
+    return result
+
+
+class EnvironmentSeries:
+    """Room readings downsampled into fixed-length time buckets.
+
+    Each bucket keeps count, sum, min and max per field, so a reading is
+    folded in at O(1) and the series never holds more than retention_days of
+    buckets. The bucket list is plain JSON data and is stored as is.
+
+    The newest reading of each field is kept on its own with its timestamp,
+    since one sensor can stay quiet while the other keeps reporting. Buckets
+    starting before keep_before, such as readings moved from the activity
+    list, are never dropped.
+    """
+
+    FIELDS = ("room_temperature", "humidity")
+    BUCKET_MINUTES = 5
+    RETENTION_DAYS = 30
+
+    def __init__(
+        self,
+        buckets: list[dict[str, Any]],
+        readings: dict[str, dict[str, Any]] | None = None,
+        keep_before: str | None = None,
+    ) -> None:
+        """Wrap a time-ordered bucket list and newest readings, updated in place."""
+        self.buckets = buckets
+        self.readings = {} if readings is None else readings
+        self.keep_before = keep_before
+        # Series stored before the newest readings were kept: use the mean of
+        # the newest bucket holding each field
+        missing = [field for field in self.FIELDS if field not in self.readings]
+        for bucket in reversed(buckets):
+            if not missing:
+                break
+            for field in list(missing):
+                if field in bucket:
+                    count, total, _, _ = bucket[field]
+                    self.readings[field] = {
+                        "value": round(total / count, 1),
+                        "timestamp": bucket["last_reading"],
+                    }
+                    missing.remove(field)
+
+    def _bucket_start(self, when: datetime) -> str:
+        """Return the ISO start of the bucket holding when."""
+        minute = when.minute - when.minute % self.BUCKET_MINUTES
+        return when.replace(minute=minute, second=0, microsecond=0).isoformat()
+
+    def add(self, when: datetime, data: dict[str, Any]) -> None:
+        """Fold one reading into its bucket."""
+        start = self._bucket_start(when)
+        buckets = self.buckets
+        if buckets and buckets[-1]["start"] == start:
+            bucket = buckets[-1]
+        elif not buckets or buckets[-1]["start"] < start:
+            bucket = {"start": start}
+            buckets.append(bucket)
+        else:
+            # Backdated reading, e.g. from an import
+            position = bisect_left(buckets, start, key=lambda item: item["start"])
+            if position < len(buckets) and buckets[position]["start"] == start:
+                bucket = buckets[position]
+            else:
+                bucket = {"start": start}
+                buckets.insert(position, bucket)
+
+        timestamp = when.isoformat()
+        if timestamp > bucket.get("last_reading", ""):
+            bucket["last_reading"] = timestamp
+        for field in self.FIELDS:
+            value = data.get(field)
+            if value is None:
+                continue
+            if timestamp >= self.readings.get(field, {}).get("timestamp", ""):
+                self.readings[field] = {"value": value, "timestamp": timestamp}
+            stats = bucket.get(field)
+            if stats is None:
+                bucket[field] = [1, value, value, value]
+            else:
+                stats[0] += 1
+                stats[1] += value
+                stats[2] = min(stats[2], value)
+                stats[3] = max(stats[3], value)
+
+        self._trim()
+
+    def _trim(self) -> None:
+        """Drop buckets older than the retention period, except kept ones."""
+        buckets = self.buckets
+        newest = datetime.fromisoformat(buckets[-1]["start"])
+        cutoff = (newest - timedelta(days=self.RETENTION_DAYS)).isoformat()
+        first = 0
+        if self.keep_before is not None:
+            first = bisect_right(buckets, self.keep_before, key=lambda item: item["start"])
+        if first < len(buckets) and buckets[first]["start"] < cutoff:
+            del buckets[first:bisect_left(buckets, cutoff, key=lambda item: item["start"])]
+
+    def means(
+        self, start: datetime | None = None, end: datetime | None = None
+    ) -> Iterator[tuple[str, dict[str, float]]]:
+        """Yield (bucket start, mean per field) for buckets starting in a range."""
+        first = 0
+        last = len(self.buckets)
+        if start is not None:
+            first = bisect_left(self.buckets, start.isoformat(), key=lambda item: item["start"])
+        if end is not None:
+            last = bisect_right(self.buckets, end.isoformat(), key=lambda item: item["start"])
+        for bucket in self.buckets[first:last]:
+            yield bucket["start"], {
+                field: round(bucket[field][1] / bucket[field][0], 1)
+                for field in self.FIELDS
+                if field in bucket
+            }
+
+    def columns(self, field: str | None) -> tuple[list[float], list[float]]:
+        """Return bucket starts in seconds and bucket means of a field.
+
+        A field of None gives every bucket with value 1, like
+        storage.get_columns.
+        """
+        timestamps: list[float] = []
+        values: list[float] = []
+        for bucket in self.buckets:
+            if field is None:
+                value = 1
+            elif field in bucket:
+                value = bucket[field][1] / bucket[field][0]
+            else:
+                continue
+            timestamps.append(to_seconds(datetime.fromisoformat(bucket["start"])))
+            values.append(value)
+        return timestamps, values
+
+    def latest(self) -> dict[str, Any] | None:
+        """Return mean, min and max per field for the newest bucket."""
+        if not self.buckets:
+            return None
+        bucket = self.buckets[-1]
+        result: dict[str, Any] = {
+            "start": bucket["start"],
+            "last_reading": bucket["last_reading"],
+        }
+        for field in self.FIELDS:
+            if field in bucket:
+                count, total, low, high = bucket[field]
+                result[field] = {
+                    "mean": round(total / count, 1),
+                    "min": low,
+                    "max": high,
+                    "count": count,
+                }
+        return result
+
+
+# Comfortable nursery ranges per room reading
+ROOM_RANGES = {"room_temperature": (18, 22), "humidity": (30, 60)}
+TIME_IN_RANGE_WINDOWS = ("today", "24h", "7d")
+
+
+class _RangeWindow:
+    """Running totals over the slots and excursions after a moving cutoff."""
+
+    def __init__(self) -> None:
+        """Initialize an empty window."""
+        self.slots: deque[list[float]] = deque()
+        self.seconds = 0.0
+        self.weighted = 0.0
+        self.in_range = 0.0
+        # Finished excursions (start, end), longest first and later ones after
+        self.excursions: deque[tuple[float, float]] = deque()
+
+    def add(self, seconds: float, weighted: float, in_range: float) -> None:
+        """Count a piece of the newest slot."""
+        self.seconds += seconds
+        self.weighted += weighted
+        self.in_range += in_range
+
+    def add_excursion(self, start: float, end: float) -> None:
+        """Remember a finished excursion unless a later one is as long."""
+        while self.excursions and (
+            self.excursions[-1][1] - self.excursions[-1][0] <= end - start
+        ):
+            self.excursions.pop()
+        self.excursions.append((start, end))
+
+    def advance(self, cutoff: float, slot_seconds: float) -> None:
+        """Drop slots and excursions that end before cutoff."""
+        while self.slots and self.slots[0][0] + slot_seconds <= cutoff:
+            _, seconds, weighted, in_range = self.slots.popleft()
+            self.add(-seconds, -weighted, -in_range)
+        while self.excursions and self.excursions[0][1] <= cutoff:
+            self.excursions.popleft()
+
+    def longest_excursion(
+        self, cutoff: float, ongoing: tuple[float, float] | None
+    ) -> float:
+        """Return the longest excursion in seconds, clipped to the window.
+
+        Only the first remembered excursion can start before the cutoff;
+        the one after it is the longest of all later excursions.
+        """
+        longest = 0.0
+        candidates = list(self.excursions)[:2]
+        if ongoing is not None:
+            candidates.append(ongoing)
+        for start, end in candidates:
+            longest = max(longest, end - max(start, cutoff))
+        return longest
+
+
+class TimeInRange:
+    """Time-weighted statistics of one room reading over rolling windows.
+
+    A reading is taken to hold until the next one, for at most MAX_HOLD
+    seconds; longer gaps count as no data. Held time is split into
+    SLOT_SECONDS slots of covered, value-weighted and in-range seconds that
+    the today, 24h and 7d windows share. Each window keeps running totals
+    over its slots and a monotonic deque of excursions out of range, so a
+    reading is added and a window moved in amortized O(1) without a rescan.
+    Readings older than the newest one are ignored.
+    """
+
+    SLOT_SECONDS = 300
+    MAX_HOLD = 3600
+    SPANS = {"24h": 86400, "7d": 7 * 86400}
+
+    def __init__(self, low: float, high: float) -> None:
+        """Initialize with the comfortable range, bounds included."""
+        self.low = low
+        self.high = high
+        self._last: tuple[float, float] | None = None
+        self._slot: list[float] | None = None
+        self._excursion: list[float] | None = None
+        self._windows = {name: _RangeWindow() for name in TIME_IN_RANGE_WINDOWS}
+
+    def _inside(self, value: float) -> bool:
+        """Return True if value is in range."""
+        return self.low <= value <= self.high
+
+    def add(self, when: datetime, value: float) -> None:
+        """Add a reading; the previous one held until now."""
+        now = to_seconds(when)
+        if self._last is not None:
+            start, previous = self._last
+            if now < start:
+                return
+            self._cover(start, min(now, start + self.MAX_HOLD), previous)
+            if now > start + self.MAX_HOLD:
+                self._end_excursion()
+        self._last = (now, value)
+
+    def _cover(self, start: float, end: float, value: float) -> None:
+        """Count value as held from start to end."""
+        inside = self._inside(value)
+        position = start
+        while position < end:
+            slot_start = position - position % self.SLOT_SECONDS
+            piece_end = min(end, slot_start + self.SLOT_SECONDS)
+            self._add_piece(slot_start, piece_end - position, value, inside)
+            position = piece_end
+
+        if inside:
+            self._end_excursion()
+        elif self._excursion is None:
+            self._excursion = [start, end]
+        else:
+            self._excursion[1] = end
+
+    def _add_piece(self, slot_start: float, seconds: float, value: float, inside: bool) -> None:
+        """Add held seconds to the newest slot, opening it if needed."""
+        if self._slot is None or self._slot[0] != slot_start:
+            self._slot = [slot_start, 0.0, 0.0, 0.0]
+            for window in self._windows.values():
+                window.slots.append(self._slot)
+        in_range = seconds if inside else 0.0
+        self._slot[1] += seconds
+        self._slot[2] += value * seconds
+        self._slot[3] += in_range
+        for window in self._windows.values():
+            window.add(seconds, value * seconds, in_range)
+
+    def _end_excursion(self) -> None:
+        """Hand a finished excursion to every window."""
+        if self._excursion is not None:
+            for window in self._windows.values():
+                window.add_excursion(*self._excursion)
+            self._excursion = None
+
+    def summary(self, when: datetime) -> dict[str, dict[str, float] | None]:
+        """Return in-range percent, mean and longest excursion per window.
+
+        The latest reading counts as held until when. A window without data
+        maps to None; the longest excursion is in minutes.
+        """
+        now = to_seconds(when)
+        cutoffs = {
+            "today": to_seconds(datetime.combine(when.date(), datetime.min.time())),
+            **{name: now - span for name, span in self.SPANS.items()},
+        }
+
+        held: tuple[float, float, float] | None = None
+        ongoing = tuple(self._excursion) if self._excursion is not None else None
+        if self._last is not None:
+            start, value = self._last
+            end = min(now, start + self.MAX_HOLD)
+            if end > start:
+                held = (start, end, value)
+                if not self._inside(value):
+                    ongoing = (ongoing[0] if ongoing else start, end)
+
+        result: dict[str, dict[str, float] | None] = {}
+        for name, window in self._windows.items():
+            cutoff = cutoffs[name]
+            window.advance(cutoff, self.SLOT_SECONDS)
+            seconds, weighted, in_range = window.seconds, window.weighted, window.in_range
+            if held is not None and held[1] > max(held[0], cutoff):
+                extra = held[1] - max(held[0], cutoff)
+                seconds += extra
+                weighted += held[2] * extra
+                in_range += extra if self._inside(held[2]) else 0.0
+            if seconds <= 0:
+                result[name] = None
+                continue
+            result[name] = {
+                "in_range": round(100 * in_range / seconds, 1),
+                "mean": round(weighted / seconds, 1),
+                "longest_excursion": round(window.longest_excursion(cutoff, ongoing) / 60),
+            }
+        return result
@@ -0,0 +1,116 @@
+"""Window reductions for long-range Baby Monitor analytics.
+
+The reductions run over column arrays exported from storage: timestamps as
+seconds (see aggregates.to_seconds) and one numeric value per timestamp.
+NumPy is used when it is installed, which it is in Home Assistant; otherwise
+an equivalent pure-Python implementation runs. Results are rounded to
+PRECISION decimals so both backends return identical values.
+"""
+from __future__ import annotations
+
+import math
+from collections.abc import Sequence
+from datetime import date, timedelta
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy ships with Home Assistant
+    np = None
+
+PRECISION = 6
+SECONDS_PER_DAY = 86400
+_EPOCH_DAY = date(1970, 1, 1)
+
+
+def _day(index: int) -> str:
+    """Return the ISO date for a day number counted from the epoch."""
+    return (_EPOCH_DAY + timedelta(days=index)).isoformat()
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Return a linearly interpolated percentile of sorted values."""
+    position = (len(ordered) - 1) * fraction
+    low = math.floor(position)
+    high = math.ceil(position)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def _summarize_python(
+    timestamps: Sequence[float], values: Sequence[float]
+) -> dict[str, Any]:
+    """Reduce the columns with plain Python."""
+    ordered = sorted(values)
+    per_day: dict[int, float] = {}
+    for timestamp, value in zip(timestamps, values):
+        day = math.floor(timestamp / SECONDS_PER_DAY)
+        per_day[day] = per_day.get(day, 0) + value
+
+    total = math.fsum(values)
+    return {
+        "count": len(values),
+        "total": total,
+        "mean": total / len(values),
+        "median": _percentile(ordered, 0.5),
+        "p90": _percentile(ordered, 0.9),
+        "per_day": {_day(day): per_day[day] for day in sorted(per_day)},
+    }
+
+
+def _summarize_numpy(
+    timestamps: Sequence[float], values: Sequence[float]
+) -> dict[str, Any]:
+    """Reduce the columns with vectorized NumPy operations."""
+    times = np.asarray(timestamps, dtype=np.float64)
+    amounts = np.asarray(values, dtype=np.float64)
+    days, positions = np.unique(
+        np.floor(times / SECONDS_PER_DAY).astype(np.int64), return_inverse=True
+    )
+    sums = np.bincount(positions, weights=amounts)
+    median, p90 = np.percentile(amounts, [50, 90])
+
+    total = math.fsum(amounts.tolist())
+    return {
+        "count": int(amounts.size),
+        "total": total,
+        "mean": total / amounts.size,
+        "median": float(median),
+        "p90": float(p90),
+        "per_day": {_day(int(day)): float(value) for day, value in zip(days, sums)},
+    }
+
+
+def summarize(
+    timestamps: Sequence[float],
+    values: Sequence[float],
+    use_numpy: bool | None = None,
+) -> dict[str, Any] | None:
+    """Return count, total, mean, median, 90th percentile and daily totals.
+
+    Daily totals are keyed by ISO date; daily_mean averages them over the
+    days that have data. Returns None for empty columns.
+    """
+    if not values:
+        return None
+
+    if use_numpy is None:
+        use_numpy = np is not None
+    result = (_summarize_numpy if use_numpy else _summarize_python)(timestamps, values)
+
+    result["daily_mean"] = math.fsum(result["per_day"].values()) / len(result["per_day"])
+    for key in ("total", "mean", "median", "p90", "daily_mean"):
+        result[key] = round(result[key], PRECISION)
+    result["per_day"] = {
+        day: round(value, PRECISION) for day, value in result["per_day"].items()
+    }
+    return result
+
+
+def summarize_columns(
+    columns: dict[str, tuple[Sequence[float], Sequence[float]]],
+) -> dict[str, dict[str, Any] | None]:
+    """Summarize several named (timestamps, values) column pairs.
+
+    Pure function over immutable inputs, safe to run in an executor thread.
+    """
+    return {name: summarize(*pair) for name, pair in columns.items()}
@@ -8,8 +8,6 @@ from typing import Any
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity_component import async_update_entity
-from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
@@ -27,6 +25,8 @@ from .const import (
     SLEEP_START,
     SLEEP_END,
 )
+from .storage import local_now
+from .util import baby_id
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -41,24 +41,26 @@ async def async_setup_entry(
     data = hass.data[DOMAIN][config_entry.entry_id]
     baby_name = data["baby_name"]
     storage = data["storage"]
+    refresher = data["refresher"]
+    deduplicator = data["deduplicator"]
     
     buttons = [
-        QuickDiaperWetButton(baby_name, storage),
-        QuickDiaperDirtyButton(baby_name, storage),
-        QuickDiaperBothButton(baby_name, storage),
-        QuickFeedingBottleButton(baby_name, storage),
-        QuickFeedingBreastLeftButton(baby_name, storage),
-        QuickFeedingBreastRightButton(baby_name, storage),
-        QuickFeedingBreastBothButton(baby_name, storage),
-        QuickSleepStartButton(baby_name, storage),
-        QuickSleepEndButton(baby_name, storage),
-        QuickBathButton(baby_name, storage),
-        QuickTummyTimeButton(baby_name, storage),
-        QuickHappyMoodButton(baby_name, storage),
-        QuickCalmMoodButton(baby_name, storage),
-        QuickCryingButton(baby_name, storage),
-        QuickTemperatureButton(baby_name, storage),
-        LogCaregiverButton(baby_name, storage),
+        QuickDiaperWetButton(baby_name, storage, refresher, deduplicator),
+        QuickDiaperDirtyButton(baby_name, storage, refresher, deduplicator),
+        QuickDiaperBothButton(baby_name, storage, refresher, deduplicator),
+        QuickFeedingBottleButton(baby_name, storage, refresher, deduplicator),
+        QuickFeedingBreastLeftButton(baby_name, storage, refresher, deduplicator),
+        QuickFeedingBreastRightButton(baby_name, storage, refresher, deduplicator),
+        QuickFeedingBreastBothButton(baby_name, storage, refresher, deduplicator),
+        QuickSleepStartButton(baby_name, storage, refresher, deduplicator),
+        QuickSleepEndButton(baby_name, storage, refresher, deduplicator),
+        QuickBathButton(baby_name, storage, refresher, deduplicator),
+        QuickTummyTimeButton(baby_name, storage, refresher, deduplicator),
+        QuickHappyMoodButton(baby_name, storage, refresher, deduplicator),
+        QuickCalmMoodButton(baby_name, storage, refresher, deduplicator),
+        QuickCryingButton(baby_name, storage, refresher, deduplicator),
+        QuickTemperatureButton(baby_name, storage, refresher, deduplicator),
+        LogCaregiverButton(baby_name, storage, refresher, deduplicator),
     ]
     
     async_add_entities(buttons, True)
@@ -67,12 +69,14 @@ async def async_setup_entry(
 class BabyMonitorButtonBase(ButtonEntity):
     """Base class for Baby Monitor buttons."""
     
-    def __init__(self, baby_name: str, storage) -> None:
+    def __init__(self, baby_name: str, storage, refresher, deduplicator) -> None:
         """Initialize the button."""
         self._baby_name = baby_name
         self._storage = storage
+        self._refresher = refresher
+        self._deduplicator = deduplicator
         self._attr_name = f"{baby_name} {self._button_name}"
-        self._attr_unique_id = f"{baby_name.lower().replace(' ', '_')}_{self._button_id}"
+        self._attr_unique_id = f"{baby_id(baby_name)}_{self._button_id}"
     
     @property
     def device_info(self) -> dict[str, Any]:
@@ -84,23 +88,16 @@ class BabyMonitorButtonBase(ButtonEntity):
             "model": "Baby Care Tracker",
         }
     
-    async def _trigger_sensor_updates(self) -> None:
-        """Trigger sensor updates after button press."""
-        if not self.hass:
+    async def _log_activity(self, activity_type: str, data: dict[str, Any]) -> None:
+        """Store an activity unless an identical press was just handled."""
+        if self._deduplicator.is_duplicate(None, activity_type, data):
+            _LOGGER.info("Ignored repeated %s press for %s", self._button_id, self._baby_name)
             return
-        
-        # Get entity registry
-        ent_reg = async_get_entity_registry(self.hass)
-        
-        # Find all sensors for this baby
-        baby_id = self._baby_name.lower().replace(" ", "_")
-        
-        # Update all sensor entities for this baby
-        for entity in ent_reg.entities.values():
-            if entity.unique_id and entity.unique_id.startswith(f"{baby_id}_"):
-                if entity.domain == "sensor":
-                    # Trigger entity update
-                    await async_update_entity(self.hass, entity.entity_id)
+        await self._storage.async_add_activity(activity_type, data)
+    
+    async def _trigger_sensor_updates(self) -> None:
+        """Queue a sensor refresh after button press."""
+        self._refresher.async_schedule()
 
 
 class QuickDiaperWetButton(BabyMonitorButtonBase):
@@ -112,7 +109,7 @@ class QuickDiaperWetButton(BabyMonitorButtonBase):
     
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self._storage.async_add_activity(
+        await self._log_activity(
             ACTIVITY_DIAPER_CHANGE,
             {"diaper_type": DIAPER_WET, "notes": "Quick log"}
         )
@@ -128,7 +125,7 @@ class QuickDiaperDirtyButton(BabyMonitorButtonBase):
     
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self._storage.async_add_activity(
+        await self._log_activity(
             ACTIVITY_DIAPER_CHANGE,
             {"diaper_type": DIAPER_DIRTY, "notes": "Quick log"}
         )
@@ -144,7 +141,7 @@ class QuickDiaperBothButton(BabyMonitorButtonBase):
     
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self._storage.async_add_activity(
+        await self._log_activity(
             ACTIVITY_DIAPER_CHANGE,
             {"diaper_type": DIAPER_BOTH, "notes": "Quick log"}
         )
@@ -160,7 +157,7 @@ class QuickFeedingBottleButton(BabyMonitorButtonBase):
     
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self._storage.async_add_activity(
+        await self._log_activity(
             ACTIVITY_FEEDING,
             {
                 "feeding_type": FEEDING_BOTTLE,
@@ -181,7 +178,7 @@ class QuickFeedingBreastLeftButton(BabyMonitorButtonBase):
     
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self._storage.async_add_activity(
+        await self._log_activity(
             ACTIVITY_FEEDING,
             {
                 "feeding_type": FEEDING_BREAST_LEFT,
@@ -201,7 +198,7 @@ class QuickFeedingBreastRightButton(BabyMonitorButtonBase):
     
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self._storage.async_add_activity(
+        await self._log_activity(
             ACTIVITY_FEEDING,
             {
                 "feeding_type": FEEDING_BREAST_RIGHT,
@@ -221,7 +218,7 @@ class QuickFeedingBreastBothButton(BabyMonitorButtonBase):
     
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self._storage.async_add_activity(
+        await self._log_activity(
             ACTIVITY_FEEDING,
             {
                 "feeding_type": FEEDING_BREAST_BOTH,
@@ -241,7 +238,7 @@ class QuickSleepStartButton(BabyMonitorButtonBase):
     
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self._storage.async_add_activity(
+        await self._log_activity(
             ACTIVITY_SLEEP,
             {
                 "sleep_type": SLEEP_START,
@@ -267,11 +264,11 @@ class QuickSleepEndButton(BabyMonitorButtonBase):
         for activity in sleep_activities:
             if activity["data"].get("sleep_type") == SLEEP_START:
                 start_time = datetime.fromisoformat(activity["timestamp"])
-                end_time = datetime.now()
+                end_time = local_now()
                 duration = int((end_time - start_time).total_seconds() / 60)
                 break
         
-        await self._storage.async_add_activity(
+        await self._log_activity(
             ACTIVITY_SLEEP,
             {
                 "sleep_type": SLEEP_END,
@@ -290,7 +287,7 @@ class QuickBathButton(BabyMonitorButtonBase):
     
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self._storage.async_add_activity(
+        await self._log_activity(
             "bath",
             {
                 "bath_type": "full_bath",
@@ -308,7 +305,7 @@ class QuickTummyTimeButton(BabyMonitorButtonBase):
     
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self._storage.async_add_activity(
+        await self._log_activity(
             "tummy_time",
             {
                 "duration": 10,  # Default 10 minute session
@@ -326,7 +323,7 @@ class QuickHappyMoodButton(BabyMonitorButtonBase):
     
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self._storage.async_add_activity(
+        await self._log_activity(
             "mood",
             {
                 "mood_type": "happy",
@@ -344,7 +341,7 @@ class QuickCalmMoodButton(BabyMonitorButtonBase):
     
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self._storage.async_add_activity(
+        await self._log_activity(
             "mood",
             {
                 "mood_type": "calm",
@@ -362,7 +359,7 @@ class QuickCryingButton(BabyMonitorButtonBase):
     
     async def async_press(self) -> None:
         """Handle the button press."""
-        await self._storage.async_add_activity(
+        await self._log_activity(
             "crying",
             {
                 "crying_intensity": "moderate",
@@ -382,7 +379,7 @@ class QuickTemperatureButton(BabyMonitorButtonBase):
     async def async_press(self) -> None:
         """Handle the button press."""
         # Log normal body temperature as default
-        await self._storage.async_add_activity(
+        await self._log_activity(
             "temperature",
             {
                 "temperature": 37.0,
@@ -401,7 +398,7 @@ class LogCaregiverButton(BabyMonitorButtonBase):
     async def async_press(self) -> None:
         """Handle the button press."""
         # This would ideally prompt for caregiver name, for now using "Parent"
-        await self._storage.async_add_activity(
+        await self._log_activity(
             "caregiver",
             {
                 "caregiver_name": "Parent",
@@ -24,6 +24,12 @@ from .const import (
     CONF_DIAPER_REMINDER_HOURS,
     CONF_CAMERA_CRYING_ENTITY,
     CONF_CAMERA_AUTO_TRACKING,
+    CONF_ROOM_TEMPERATURE_ENTITY,
+    CONF_ROOM_HUMIDITY_ENTITY,
+    CONF_BIRTH_DATE,
+    CONF_SEX,
+    CONF_GROWTH_WINDOW_DAYS,
+    CONF_DUPLICATE_WINDOW_SECONDS,
     DEFAULT_MIN_DIAPERS_PER_DAY,
     DEFAULT_MIN_WET_DIAPERS_PER_DAY,
     DEFAULT_MIN_FEEDINGS_PER_DAY,
@@ -31,7 +37,10 @@ from .const import (
     DEFAULT_TARGET_TUMMY_TIME_MINUTES,
     DEFAULT_FEEDING_REMINDER_HOURS,
     DEFAULT_DIAPER_REMINDER_HOURS,
+    DEFAULT_GROWTH_WINDOW_DAYS,
+    DEFAULT_DUPLICATE_WINDOW_SECONDS,
 )
+from .util import baby_id, baby_key
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -58,8 +67,13 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 baby_name = user_input[ATTR_BABY_NAME]
                 
                 # Set unique ID based on baby name
-                await self.async_set_unique_id(baby_name.lower().replace(" ", "_"))
+                await self.async_set_unique_id(baby_id(baby_name))
                 self._abort_if_unique_id_configured()
+                # Services find babies by name ignoring case and spacing
+                key = baby_key(baby_name)
+                for entry in self._async_current_entries(include_ignore=False):
+                    if baby_key(entry.data.get(ATTR_BABY_NAME, "")) == key:
+                        return self.async_abort(reason="already_configured")
                 
                 return self.async_create_entry(
                     title=f"Baby Monitor - {baby_name}",
@@ -74,6 +88,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         CONF_DIAPER_REMINDER_HOURS: DEFAULT_DIAPER_REMINDER_HOURS,
                         CONF_CAMERA_CRYING_ENTITY: "",
                         CONF_CAMERA_AUTO_TRACKING: False,
+                        CONF_GROWTH_WINDOW_DAYS: DEFAULT_GROWTH_WINDOW_DAYS,
+                        CONF_DUPLICATE_WINDOW_SECONDS: DEFAULT_DUPLICATE_WINDOW_SECONDS,
                     }
                 )
             except CannotConnect:
@@ -155,6 +171,41 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 ): selector.EntitySelector(
                     selector.EntitySelectorConfig(domain="binary_sensor")
                 ),
+                vol.Optional(
+                    CONF_ROOM_TEMPERATURE_ENTITY,
+                    description={"suggested_value": options.get(CONF_ROOM_TEMPERATURE_ENTITY)},
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain="sensor", device_class="temperature")
+                ),
+                vol.Optional(
+                    CONF_ROOM_HUMIDITY_ENTITY,
+                    description={"suggested_value": options.get(CONF_ROOM_HUMIDITY_ENTITY)},
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain="sensor", device_class="humidity")
+                ),
+                vol.Optional(
+                    CONF_BIRTH_DATE,
+                    description={"suggested_value": options.get(CONF_BIRTH_DATE)},
+                ): selector.DateSelector(),
+                vol.Optional(
+                    CONF_SEX,
+                    description={"suggested_value": options.get(CONF_SEX)},
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=["male", "female"],
+                        translation_key=CONF_SEX,
+                    )
+                ),
+                vol.Optional(
+                    CONF_GROWTH_WINDOW_DAYS,
+                    default=options.get(CONF_GROWTH_WINDOW_DAYS, DEFAULT_GROWTH_WINDOW_DAYS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=7, max=365)),
+                vol.Optional(
+                    CONF_DUPLICATE_WINDOW_SECONDS,
+                    default=options.get(
+                        CONF_DUPLICATE_WINDOW_SECONDS, DEFAULT_DUPLICATE_WINDOW_SECONDS
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=300)),
             }
         )
 
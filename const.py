@@ -6,6 +6,9 @@ from typing import Final
 DOMAIN: Final = "babymonitor"
 DEFAULT_NAME = "Baby Monitor"
 
+# Key in hass.data[DOMAIN] mapping baby_key(name) to that baby's entry data
+DATA_BABIES = "babies"
+
 # Activity types
 ACTIVITY_DIAPER_CHANGE = "diaper_change"
 ACTIVITY_FEEDING = "feeding"
@@ -53,6 +56,12 @@ SERVICE_LOG_CRYING = "log_crying"
 SERVICE_LOG_MOOD = "log_mood"
 SERVICE_LOG_ENVIRONMENTAL = "log_environmental"
 SERVICE_LOG_CAREGIVER = "log_caregiver"
+SERVICE_GET_CRYING_HISTOGRAM = "get_crying_histogram"
+SERVICE_GET_GROWTH_HISTORY = "get_growth_history"
+SERVICE_LOG_BATCH = "log_batch"
+SERVICE_IMPORT_HISTORY = "import_history"
+SERVICE_EXPORT_HISTORY = "export_history"
+SERVICE_QUERY = "query"
 
 # Attributes
 ATTR_BABY_NAME = "baby_name"
@@ -76,6 +85,22 @@ ATTR_ROOM_TEMPERATURE = "room_temperature"
 ATTR_HUMIDITY = "humidity"
 ATTR_CAREGIVER_NAME = "caregiver_name"
 ATTR_BATH_TYPE = "bath_type"
+ATTR_ACTIVITIES = "activities"
+ATTR_ACTIVITY_TYPE = "type"
+ATTR_FILE_PATH = "file_path"
+ATTR_COLUMN_MAP = "column_map"
+ATTR_TYPE_MAP = "type_map"
+ATTR_FORMAT = "format"
+ATTR_COMPRESS = "compress"
+ATTR_ACTIVITY_TYPES = "activity_types"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_FILENAME = "filename"
+ATTR_FIELD = "field"
+ATTR_GROUP_BY = "group_by"
+ATTR_AGGREGATES = "aggregates"
+ATTR_LIMIT = "limit"
+ATTR_REQUEST_ID = "request_id"
 
 # Mood types
 MOOD_HAPPY = "happy"
@@ -104,6 +129,12 @@ CONF_FEEDING_REMINDER_HOURS = "feeding_reminder_hours"
 CONF_DIAPER_REMINDER_HOURS = "diaper_reminder_hours"
 CONF_CAMERA_CRYING_ENTITY = "camera_crying_entity"
 CONF_CAMERA_AUTO_TRACKING = "camera_auto_tracking"
+CONF_ROOM_TEMPERATURE_ENTITY = "room_temperature_entity"
+CONF_ROOM_HUMIDITY_ENTITY = "room_humidity_entity"
+CONF_BIRTH_DATE = "birth_date"
+CONF_SEX = "sex"
+CONF_GROWTH_WINDOW_DAYS = "growth_window_days"
+CONF_DUPLICATE_WINDOW_SECONDS = "duplicate_window_seconds"
 
 # Default values for configuration options
 DEFAULT_MIN_DIAPERS_PER_DAY = 6
@@ -113,6 +144,17 @@ DEFAULT_MIN_SLEEP_HOURS_PER_DAY = 12
 DEFAULT_TARGET_TUMMY_TIME_MINUTES = 15
 DEFAULT_FEEDING_REMINDER_HOURS = 3
 DEFAULT_DIAPER_REMINDER_HOURS = 4
+DEFAULT_GROWTH_WINDOW_DAYS = 30
+DEFAULT_DUPLICATE_WINDOW_SECONDS = 10
 
 # Camera tracking
-CAMERA_TRACKING_HELPER_PREFIX = "baby_crying_tracker"
\ No newline at end of file
+CAMERA_TRACKING_HELPER_PREFIX = "baby_crying_tracker"
+
+# History exports are written here, relative to the config directory
+EXPORT_DIRECTORY = "babymonitor_exports"
+
+# Recorder limits
+# Byte budget for the JSON encoded state attributes of one sensor
+MAX_ATTRIBUTES_BYTES = 4096
+# Longest string kept in an attribute before it is shortened
+MAX_ATTRIBUTE_STRING_LENGTH = 255
\ No newline at end of file
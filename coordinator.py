@@ -0,0 +1,153 @@
+"""Executor-backed analytics for Baby Monitor."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_time
+
+from .aggregates import from_seconds
+from .analytics import summarize_columns
+from .const import ACTIVITY_FEEDING, ACTIVITY_SLEEP
+from .storage import BabyMonitorStorage, local_now, to_aware
+
+_LOGGER = logging.getLogger(__name__)
+
+# Days covered by the long-range analytics
+LONG_RANGE_DAYS = 30
+
+# Result name -> (activity type, numeric field) summarized over LONG_RANGE_DAYS
+LONG_RANGE_METRICS: dict[str, tuple[str, str]] = {
+    "sleep_duration": (ACTIVITY_SLEEP, "duration"),
+    "feeding_amount": (ACTIVITY_FEEDING, "feeding_amount"),
+}
+
+
+class AnalyticsCoordinator:
+    """Compute the 30-day summaries off the event loop.
+    
+    Only the LONG_RANGE_METRICS summaries (median, 90th percentile and daily
+    totals) run here. The other sensor getters, stored statistics included,
+    still run on the loop: they read running totals, sliding windows and the
+    feeding and crying models, which are updated per record. The models are
+    built from the full history the first time a sensor reads them.
+    
+    On every storage change the columns are copied into an immutable snapshot
+    on the loop, reduced in an executor thread, and the results are applied
+    back on the loop before listeners are told. Only one computation runs at a
+    time per baby; changes that arrive meanwhile trigger a single rerun.
+    
+    The window also slides without new data: a timer recomputes when the
+    oldest summarized record leaves it.
+    """
+
+    def __init__(self, hass: HomeAssistant, storage: BabyMonitorStorage) -> None:
+        """Initialize the coordinator."""
+        self._hass = hass
+        self._storage = storage
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._unsub_storage: CALLBACK_TYPE | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._task: asyncio.Task | None = None
+        self._pending = False
+        self.results: dict[str, dict[str, Any] | None] = {}
+
+    @callback
+    def async_start(self) -> None:
+        """Compute once and then after every storage change."""
+        self._unsub_storage = self._storage.async_add_listener(self.async_request_refresh)
+        self.async_request_refresh()
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for new results and return a callback to stop listening."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_request_refresh(self) -> None:
+        """Start a computation, or queue one if a computation is running."""
+        if self._task is not None:
+            self._pending = True
+            return
+        self._task = self._hass.async_create_background_task(
+            self._async_run(), f"babymonitor analytics {self._storage.baby_name}"
+        )
+
+    def _snapshot(self) -> dict[str, tuple[tuple[float, ...], tuple[float, ...]]]:
+        """Copy the columns the computation needs."""
+        since = local_now() - timedelta(days=LONG_RANGE_DAYS)
+        snapshot = {}
+        for name, (activity_type, field) in LONG_RANGE_METRICS.items():
+            timestamps, values = self._storage.get_columns(activity_type, field, since)
+            snapshot[name] = (tuple(timestamps), tuple(values))
+        return snapshot
+
+    async def _async_run(self) -> None:
+        """Compute until no change is pending."""
+        try:
+            while True:
+                self._pending = False
+                snapshot = self._snapshot()
+                self.results = await self._hass.async_add_executor_job(
+                    summarize_columns, snapshot
+                )
+                self._schedule_expiry(snapshot)
+                for update_callback in list(self._listeners):
+                    update_callback()
+                if not self._pending:
+                    break
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception(
+                "Failed to compute analytics for %s", self._storage.baby_name
+            )
+        finally:
+            self._task = None
+
+    def _schedule_expiry(
+        self, snapshot: dict[str, tuple[tuple[float, ...], tuple[float, ...]]]
+    ) -> None:
+        """Arm the timer for when the oldest summarized record leaves the window."""
+        self._cancel_timer()
+        oldest = min(
+            (timestamps[0] for timestamps, _ in snapshot.values() if timestamps),
+            default=None,
+        )
+        if oldest is None:
+            return
+        expires = from_seconds(oldest) + timedelta(days=LONG_RANGE_DAYS, seconds=1)
+        self._unsub_timer = async_track_point_in_time(
+            self._hass, self._handle_expiry, to_aware(expires)
+        )
+
+    @callback
+    def _handle_expiry(self, _now: Any) -> None:
+        """Recompute once a record has left the window."""
+        self._unsub_timer = None
+        self.async_request_refresh()
+
+    def _cancel_timer(self) -> None:
+        """Cancel the expiry timer, if any."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following storage changes and cancel a running computation."""
+        if self._unsub_storage is not None:
+            self._unsub_storage()
+            self._unsub_storage = None
+        self._cancel_timer()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._listeners.clear()
@@ -0,0 +1,100 @@
+"""Drop repeated Baby Monitor log requests."""
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from collections.abc import Hashable
+from typing import Any
+
+# How long request ids are remembered, and how many at most
+REQUEST_ID_TTL = 24 * 3600
+MAX_REQUEST_IDS = 1000
+
+
+def payload_key(*parts: Any) -> int:
+    """Return a hash of a request payload, independent of key order."""
+    return hash(json.dumps(parts, sort_keys=True, default=str))
+
+
+class DuplicateFilter:
+    """Remember keys for ttl seconds to recognise repeated requests.
+
+    Keys live in a dict for O(1) lookups and in a deque in arrival order.
+    Every key has the same lifetime, so expired keys are always at the front
+    and are dropped in amortized O(1). At most max_size keys are kept. A
+    forgotten key leaves its deque entry behind, which is skipped when it
+    reaches the front.
+    """
+
+    def __init__(self, ttl: float, max_size: int | None = None) -> None:
+        """Initialize an empty filter."""
+        self.ttl = ttl
+        self._max_size = max_size
+        self._expires: dict[Hashable, float] = {}
+        self._order: deque[tuple[float, Hashable]] = deque()
+
+    def _drop_oldest(self) -> None:
+        """Drop the front deque entry and its key, unless the key was renewed."""
+        expires, key = self._order.popleft()
+        if self._expires.get(key) == expires:
+            del self._expires[key]
+
+    def _expire(self, now: float) -> None:
+        """Forget keys whose time is up."""
+        while self._order and self._order[0][0] <= now:
+            self._drop_oldest()
+
+    def seen(self, key: Hashable, now: float | None = None) -> bool:
+        """Return True if key was added within ttl; otherwise add it."""
+        if self.ttl <= 0:
+            return False
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        if key in self._expires:
+            return True
+
+        expires = now + self.ttl
+        self._expires[key] = expires
+        self._order.append((expires, key))
+        if self._max_size is not None:
+            while len(self._expires) > self._max_size:
+                self._drop_oldest()
+        return False
+
+    def forget(self, key: Hashable) -> None:
+        """Forget a key, so that it is not a duplicate any more."""
+        self._expires.pop(key, None)
+
+    def __len__(self) -> int:
+        """Return the number of remembered keys."""
+        return len(self._expires)
+
+
+class LogDeduplicator:
+    """Decide whether a log request repeats an earlier one.
+
+    A request with a request id is a duplicate if that id was used in the
+    last REQUEST_ID_TTL seconds. Without one, a request is a duplicate if an
+    identical payload arrived within the last window seconds; a window of 0
+    turns that check off.
+    """
+
+    def __init__(self, window: float) -> None:
+        """Initialize the filters."""
+        self._request_ids = DuplicateFilter(REQUEST_ID_TTL, MAX_REQUEST_IDS)
+        self._payloads = DuplicateFilter(window)
+
+    def is_duplicate(self, request_id: str | None, *payload: Any) -> bool:
+        """Return True if the request should be dropped."""
+        if request_id:
+            return self._request_ids.seen(request_id)
+        return self._payloads.seen(payload_key(*payload))
+
+    def forget(self, request_id: str | None, *payload: Any) -> None:
+        """Forget a request that could not be stored, so a retry goes through."""
+        if request_id:
+            self._request_ids.forget(request_id)
+        else:
+            self._payloads.forget(payload_key(*payload))
+
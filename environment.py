@@ -0,0 +1,134 @@
+"""Room temperature and humidity tracking from existing sensors."""
+from __future__ import annotations
+
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT, UnitOfTemperature
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_time_interval,
+)
+from homeassistant.util.unit_conversion import TemperatureConverter
+
+from .const import ATTR_HUMIDITY, ATTR_ROOM_TEMPERATURE
+from .storage import BabyMonitorStorage
+
+_LOGGER = logging.getLogger(__name__)
+
+# Minimum seconds between samples taken from one entity
+MIN_SAMPLE_INTERVAL = 60
+# A sensor whose state hasn't changed for this long is sampled again, so a
+# steady reading keeps counting as data (TimeInRange.MAX_HOLD is an hour)
+RESAMPLE_INTERVAL = timedelta(minutes=15)
+
+
+class EnvironmentTracker:
+    """Sample room sensors into a baby's environment series.
+
+    A single state change subscription covers both entities. Each entity is
+    sampled at most once per MIN_SAMPLE_INTERVAL and the sample is folded
+    straight into the storage's time buckets, without a service call or a
+    full save. Sensors that have not been sampled for RESAMPLE_INTERVAL are
+    sampled again from their current state.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        storage: BabyMonitorStorage,
+        temperature_entity: str | None,
+        humidity_entity: str | None,
+    ) -> None:
+        """Initialize the tracker."""
+        self._hass = hass
+        self._storage = storage
+        self._fields = {
+            entity_id: field
+            for field, entity_id in (
+                (ATTR_ROOM_TEMPERATURE, temperature_entity),
+                (ATTR_HUMIDITY, humidity_entity),
+            )
+            if entity_id
+        }
+        self._last_sample: dict[str, float] = {}
+        self._unsub: CALLBACK_TYPE | None = None
+        self._unsub_resample: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Take the current readings and follow state changes."""
+        _LOGGER.info(
+            "Tracking room conditions for %s from %s",
+            self._storage.baby_name,
+            ", ".join(self._fields),
+        )
+        for entity_id in self._fields:
+            self._sample(self._hass.states.get(entity_id))
+        self._unsub = async_track_state_change_event(
+            self._hass, list(self._fields), self._handle_state_change
+        )
+        self._unsub_resample = async_track_time_interval(
+            self._hass, self._async_resample, RESAMPLE_INTERVAL
+        )
+
+    @callback
+    def _handle_state_change(self, event: Event) -> None:
+        """Sample a changed room sensor."""
+        self._sample(event.data.get("new_state"))
+
+    @callback
+    def _async_resample(self, _when: datetime, now: float | None = None) -> None:
+        """Sample again the sensors that have held their state."""
+        now = time.monotonic() if now is None else now
+        for entity_id in self._fields:
+            last = self._last_sample.get(entity_id)
+            if last is None or now - last >= RESAMPLE_INTERVAL.total_seconds():
+                self._sample(self._hass.states.get(entity_id), now)
+
+    def _value(self, state: State) -> float | None:
+        """Return the reading of a state, temperatures in °C, or None."""
+        try:
+            value = float(state.state)
+        except ValueError:
+            return None
+        if not math.isfinite(value):
+            return None
+        unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+        if self._fields[state.entity_id] == ATTR_ROOM_TEMPERATURE and unit in (
+            UnitOfTemperature.FAHRENHEIT,
+            UnitOfTemperature.KELVIN,
+        ):
+            value = round(
+                TemperatureConverter.convert(value, unit, UnitOfTemperature.CELSIUS), 1
+            )
+        return value
+
+    @callback
+    def _sample(self, state: State | None, now: float | None = None) -> None:
+        """Store a reading unless the entity was sampled too recently."""
+        if state is None or state.entity_id not in self._fields:
+            return
+        value = self._value(state)
+        if value is None:
+            return
+
+        now = time.monotonic() if now is None else now
+        last = self._last_sample.get(state.entity_id)
+        if last is not None and now - last < MIN_SAMPLE_INTERVAL:
+            return
+        self._last_sample[state.entity_id] = now
+        self._storage.async_add_environment_reading({self._fields[state.entity_id]: value})
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following the room sensors."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if self._unsub_resample is not None:
+            self._unsub_resample()
+            self._unsub_resample = None
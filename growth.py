@@ -0,0 +1,276 @@
+"""WHO growth percentile engine.
+
+Each WHO indicator is expanded once, on first use, into flat arrays holding
+the L, M and S parameters at every step of its key: every day of age for the
+age-based indicators and every millimetre of length for weight-for-length.
+Intermediate steps are linearly interpolated between the published rows, so
+a lookup is a single array index.
+
+Z-scores use the LMS formula; for the weight indicators values beyond
++/-3 SD use the WHO restricted adjustment. History for every stored
+measurement is computed in one vectorized pass with NumPy when it is
+installed, otherwise with an equivalent pure-Python loop.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping, Sequence
+from datetime import date, datetime, timedelta
+from functools import cache
+from typing import Any
+
+from .aggregates import to_seconds
+from .const import CONF_BIRTH_DATE, CONF_SEX
+from .who_growth_data import LENGTH_FOR_AGE, WEIGHT_FOR_AGE, WEIGHT_FOR_LENGTH
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy ships with Home Assistant
+    np = None
+
+SEXES = ("male", "female")
+SECONDS_PER_DAY = 86400
+
+# Source rows, key steps per unit, and whether the restricted SD adjustment applies
+INDICATORS: dict[str, tuple[Mapping[str, Sequence[tuple]], int, bool]] = {
+    "weight_for_age": (WEIGHT_FOR_AGE, 1, True),
+    "length_for_age": (LENGTH_FOR_AGE, 1, False),
+    "weight_for_length": (WEIGHT_FOR_LENGTH, 10, True),
+}
+
+
+class LmsTable:
+    """L, M and S parameters at every step of an indicator's key."""
+
+    def __init__(self, rows: Sequence[tuple], steps_per_unit: int, adjust: bool) -> None:
+        """Expand the published rows into per-step arrays."""
+        self.start = rows[0][0]
+        self.steps_per_unit = steps_per_unit
+        self.adjust = adjust
+        self.l = array("d")
+        self.m = array("d")
+        self.s = array("d")
+
+        for (key, *low), (next_key, *high) in zip(rows, rows[1:]):
+            first = round((key - self.start) * steps_per_unit)
+            span = round((next_key - self.start) * steps_per_unit) - first
+            for step in range(span):
+                fraction = step / span
+                for column, a, b in zip((self.l, self.m, self.s), low, high):
+                    column.append(a + (b - a) * fraction)
+        for column, value in zip((self.l, self.m, self.s), rows[-1][1:]):
+            column.append(value)
+
+    def __len__(self) -> int:
+        """Return the number of steps covered."""
+        return len(self.m)
+
+    def position(self, key: float) -> int | None:
+        """Return the array position for a key, or None if out of range."""
+        position = round((key - self.start) * self.steps_per_unit)
+        if 0 <= position < len(self.m):
+            return position
+        return None
+
+    def z_score(self, key: float, value: float) -> float | None:
+        """Return the z-score of a measurement, or None if out of range."""
+        position = self.position(key)
+        if position is None or value <= 0:
+            return None
+        return _z_score(
+            self.l[position], self.m[position], self.s[position], value, self.adjust
+        )
+
+
+def _sd(l: float, m: float, s: float, z: float) -> float:
+    """Return the measurement at a given z-score."""
+    if l == 0:
+        return m * math.exp(s * z)
+    return m * (1 + l * s * z) ** (1 / l)
+
+
+def _z_score(l: float, m: float, s: float, value: float, adjust: bool) -> float:
+    """Return the LMS z-score, restricted beyond +/-3 SD when requested."""
+    if l == 0:
+        z = math.log(value / m) / s
+    else:
+        z = ((value / m) ** l - 1) / (l * s)
+
+    if adjust and z > 3:
+        sd3 = _sd(l, m, s, 3)
+        z = 3 + (value - sd3) / (sd3 - _sd(l, m, s, 2))
+    elif adjust and z < -3:
+        sd3 = _sd(l, m, s, -3)
+        z = -3 + (value - sd3) / (_sd(l, m, s, -2) - sd3)
+    return z
+
+
+@cache
+def get_table(indicator: str, sex: str) -> LmsTable:
+    """Return the expanded table for an indicator, building it on first use."""
+    rows, steps_per_unit, adjust = INDICATORS[indicator]
+    return LmsTable(rows[sex], steps_per_unit, adjust)
+
+
+def percentile(z: float | None) -> float | None:
+    """Convert a z-score to a percentile (0-100)."""
+    if z is None:
+        return None
+    return round(50 * (1 + math.erf(z / math.sqrt(2))), 1)
+
+
+def age_in_days(birth_date: date, when: datetime) -> int:
+    """Return the completed days of age at a moment."""
+    return (when.date() - birth_date).days
+
+
+def birth_profile(options: Mapping[str, Any]) -> tuple[date, str] | None:
+    """Return (birth date, sex) from entry options, or None if not set."""
+    birth_date = options.get(CONF_BIRTH_DATE)
+    sex = options.get(CONF_SEX)
+    if not birth_date or sex not in SEXES:
+        return None
+    try:
+        return date.fromisoformat(str(birth_date)), sex
+    except ValueError:
+        return None
+
+
+def z_score(
+    indicator: str, sex: str, key: float, value: float
+) -> float | None:
+    """Return the z-score of one measurement (key is age in days or length in cm)."""
+    return get_table(indicator, sex).z_score(key, value)
+
+
+def _z_scores_python(
+    table: LmsTable, keys: Sequence[float | None], values: Sequence[float]
+) -> list[float | None]:
+    """Compute z-scores one measurement at a time."""
+    return [
+        None if key is None else table.z_score(key, value)
+        for key, value in zip(keys, values)
+    ]
+
+
+def _z_scores_numpy(
+    table: LmsTable, keys: Sequence[float | None], values: Sequence[float]
+) -> list[float | None]:
+    """Compute z-scores for all measurements with array operations."""
+    keys_ = np.array([np.nan if key is None else key for key in keys], dtype=np.float64)
+    values_ = np.asarray(values, dtype=np.float64)
+    positions = np.rint((keys_ - table.start) * table.steps_per_unit)
+    valid = (positions >= 0) & (positions < len(table)) & (values_ > 0)
+    positions = np.where(valid, positions, 0).astype(np.int64)
+    values_ = np.where(valid, values_, 1.0)
+
+    l = np.frombuffer(table.l, dtype=np.float64)[positions]
+    m = np.frombuffer(table.m, dtype=np.float64)[positions]
+    s = np.frombuffer(table.s, dtype=np.float64)[positions]
+    box_cox = l != 0
+    safe_l = np.where(box_cox, l, 1.0)
+
+    def sd(z: float):
+        return np.where(
+            box_cox, m * (1 + safe_l * s * z) ** (1 / safe_l), m * np.exp(s * z)
+        )
+
+    with np.errstate(invalid="ignore"):
+        z = np.where(
+            box_cox,
+            ((values_ / m) ** safe_l - 1) / (safe_l * s),
+            np.log(values_ / m) / s,
+        )
+        if table.adjust:
+            sd2, sd3 = sd(2), sd(3)
+            sd2neg, sd3neg = sd(-2), sd(-3)
+            z = np.where(z > 3, 3 + (values_ - sd3) / (sd3 - sd2), z)
+            z = np.where(z < -3, -3 + (values_ - sd3neg) / (sd2neg - sd3neg), z)
+
+    return [float(score) if ok else None for score, ok in zip(z, valid)]
+
+
+def _paired_lengths(
+    times: Sequence[float],
+    height_times: Sequence[float],
+    height_values: Sequence[float],
+    use_numpy: bool,
+) -> list[float | None]:
+    """Return the latest length measured at or before each moment."""
+    if use_numpy:
+        found = np.searchsorted(np.asarray(height_times, dtype=np.float64), times, "right")
+        positions = found.tolist()
+    else:
+        positions = [bisect_right(height_times, when) for when in times]
+    return [height_values[i - 1] if i else None for i in positions]
+
+
+def _series(
+    times: Sequence[float],
+    values: Sequence[float],
+    ages: Sequence[int],
+    z_scores: Sequence[float | None],
+) -> list[dict[str, Any]]:
+    """Build the per-measurement history records."""
+    return [
+        {
+            "timestamp": (datetime(1970, 1, 1) + timedelta(seconds=when)).isoformat(),
+            "age_days": age,
+            "value": value,
+            "z_score": None if z is None else round(z, 2),
+            "percentile": percentile(z),
+        }
+        for when, value, age, z in zip(times, values, ages, z_scores)
+    ]
+
+
+def percentile_history(
+    birth_date: date,
+    sex: str,
+    weights: tuple[Sequence[float], Sequence[float]],
+    heights: tuple[Sequence[float], Sequence[float]],
+    use_numpy: bool | None = None,
+) -> dict[str, list[dict[str, Any]]]:
+    """Compute percentiles for every stored weight and length measurement.
+
+    weights and heights are time-ordered (timestamps, values) columns from
+    storage. Weight records also carry weight-for-length against the latest
+    length measured at or before them.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    z_scores = _z_scores_numpy if use_numpy else _z_scores_python
+    born = to_seconds(datetime.combine(birth_date, datetime.min.time()))
+
+    weight_times, weight_values = weights
+    height_times, height_values = heights
+    weight_ages = [math.floor((when - born) / SECONDS_PER_DAY) for when in weight_times]
+    height_ages = [math.floor((when - born) / SECONDS_PER_DAY) for when in height_times]
+    lengths = _paired_lengths(weight_times, height_times, height_values, use_numpy)
+
+    weight_series = _series(
+        weight_times,
+        weight_values,
+        weight_ages,
+        z_scores(get_table("weight_for_age", sex), weight_ages, weight_values),
+    )
+    for record, length, z in zip(
+        weight_series,
+        lengths,
+        z_scores(get_table("weight_for_length", sex), lengths, weight_values),
+    ):
+        record["length_cm"] = length
+        record["weight_for_length_z_score"] = None if z is None else round(z, 2)
+        record["weight_for_length_percentile"] = percentile(z)
+
+    return {
+        "weight": weight_series,
+        "height": _series(
+            height_times,
+            height_values,
+            height_ages,
+            z_scores(get_table("length_for_age", sex), height_ages, height_values),
+        ),
+    }
@@ -0,0 +1,223 @@
+"""Streaming import and export of activity history files.
+
+Files are read and written in the executor, a chunk at a time, so memory use
+does not grow with file size. Imports accept CSV, JSON Lines (.jsonl/.ndjson)
+and a JSON array of objects (.json), optionally gzipped; exports write CSV or
+JSON Lines, optionally gzipped. Each row has a type and a timestamp column;
+the remaining columns are the fields of the matching log service, so an
+export can be imported again.
+"""
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+import re
+from collections.abc import Iterator, Mapping, Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any
+
+import voluptuous as vol
+
+from homeassistant.util import dt as dt_util
+
+from .const import ATTR_ACTIVITY_TYPE, ATTR_TIMESTAMP
+
+IMPORT_CHUNK_SIZE = 5000
+EXPORT_CHUNK_SIZE = 5000
+EXPORT_FORMATS = ("csv", "jsonl")
+MAX_IMPORT_ERRORS = 20
+_READ_SIZE = 1 << 16
+_SEPARATOR = re.compile(r"[\s,]*")
+
+
+def _open(path: Path) -> tuple[IO[str], str]:
+    """Open a file for text reading and return it with its format suffix."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", newline=""), Path(path.stem).suffix
+    return open(path, encoding="utf-8", newline=""), path.suffix
+
+
+def _json_array_rows(handle: IO[str]) -> Iterator[tuple[int, Any]]:
+    """Yield (item number, item) from a JSON array without loading it whole."""
+    decoder = json.JSONDecoder()
+    buffer = handle.read(_READ_SIZE).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("Expected a JSON array of activities")
+    position = 1
+    eof = False
+    number = 0
+
+    while True:
+        position = _SEPARATOR.match(buffer, position).end()
+        if buffer.startswith("]", position):
+            return
+        try:
+            if position == len(buffer):
+                raise ValueError("Need more data")
+            item, position = decoder.raw_decode(buffer, position)
+        except ValueError:
+            if eof:
+                raise ValueError(f"Invalid JSON after item {number}") from None
+            chunk = handle.read(_READ_SIZE)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        number += 1
+        yield number, item
+
+
+def _json_lines_rows(handle: IO[str]) -> Iterator[tuple[int, Any]]:
+    """Yield (line number, item) from a JSON Lines file."""
+    for number, line in enumerate(handle, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, line
+
+
+def _csv_rows(handle: IO[str]) -> Iterator[tuple[int, Any]]:
+    """Yield (line number, row) from a CSV file with a header row."""
+    reader = csv.DictReader(handle)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def parse_timestamp(value: Any) -> str:
+    """Return an activity timestamp: naive local time in ISO format."""
+    when = datetime.fromisoformat(str(value).strip())
+    if when.tzinfo is not None:
+        when = dt_util.as_local(when).replace(tzinfo=None)
+    return when.isoformat()
+
+
+class HistoryReader:
+    """Read validated activities from a history file in chunks.
+
+    Runs in the executor. Rows that fail validation are skipped and the
+    first MAX_IMPORT_ERRORS reasons are kept for the service response.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        schemas: Mapping[str, vol.Schema],
+        column_map: Mapping[str, str] | None = None,
+        type_map: Mapping[str, str] | None = None,
+    ) -> None:
+        """Open the file and prepare the row iterator."""
+        self._schemas = schemas
+        self._column_map = column_map or {}
+        self._type_map = {
+            str(source).strip().lower(): target for source, target in (type_map or {}).items()
+        }
+        self.imported = 0
+        self.skipped = 0
+        self.errors: list[str] = []
+
+        self._handle, suffix = _open(Path(path))
+        if suffix == ".csv":
+            self._rows = _csv_rows(self._handle)
+        elif suffix in (".jsonl", ".ndjson"):
+            self._rows = _json_lines_rows(self._handle)
+        elif suffix == ".json":
+            self._rows = _json_array_rows(self._handle)
+        else:
+            self._handle.close()
+            raise ValueError(f"Unsupported file type {suffix or path}")
+
+    def _convert(self, raw: Any) -> tuple[str, str, dict[str, Any]]:
+        """Map one raw row onto an activity type, timestamp and data."""
+        if not isinstance(raw, dict):
+            raise vol.Invalid("row is not a JSON object")
+        # Empty CSV cells mean "not set", so schema defaults apply
+        row = {
+            self._column_map.get(key, key): value
+            for key, value in raw.items()
+            if value not in ("", None)
+        }
+
+        source_type = str(row.pop(ATTR_ACTIVITY_TYPE, "")).strip().lower()
+        activity_type = self._type_map.get(source_type, source_type.replace(" ", "_"))
+        if activity_type not in self._schemas:
+            raise vol.Invalid(f"unknown activity type '{source_type}'")
+        if ATTR_TIMESTAMP not in row:
+            raise vol.Invalid("missing timestamp")
+        try:
+            timestamp = parse_timestamp(row.pop(ATTR_TIMESTAMP))
+        except ValueError as err:
+            raise vol.Invalid(f"invalid timestamp: {err}") from err
+
+        return activity_type, timestamp, self._schemas[activity_type](row)
+
+    def read_chunk(self, size: int = IMPORT_CHUNK_SIZE) -> list[tuple[str, str, dict[str, Any]]]:
+        """Return up to size valid activities; an empty list means the end."""
+        chunk = []
+        for number, raw in self._rows:
+            try:
+                chunk.append(self._convert(raw))
+            except vol.Invalid as err:
+                self.skipped += 1
+                if len(self.errors) < MAX_IMPORT_ERRORS:
+                    self.errors.append(f"row {number}: {err}")
+                continue
+            if len(chunk) == size:
+                break
+        self.imported += len(chunk)
+        return chunk
+
+    def close(self) -> None:
+        """Close the file."""
+        self._handle.close()
+
+
+class HistoryWriter:
+    """Write activities to a CSV or JSON Lines file in chunks.
+
+    Runs in the executor. CSV files have a fixed set of columns, the fields
+    of the log services; JSON Lines rows keep every stored field.
+    """
+
+    def __init__(
+        self, path: Path, file_format: str, fields: Sequence[str], compress: bool = False
+    ) -> None:
+        """Create the file and write the CSV header."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if compress:
+            self._handle: IO[str] = gzip.open(path, "wt", encoding="utf-8", newline="")
+        else:
+            self._handle = open(path, "w", encoding="utf-8", newline="")
+        self._csv: csv.DictWriter | None = None
+        if file_format == "csv":
+            self._csv = csv.DictWriter(
+                self._handle,
+                fieldnames=[ATTR_ACTIVITY_TYPE, ATTR_TIMESTAMP, *fields, "id"],
+                extrasaction="ignore",
+            )
+            self._csv.writeheader()
+        self.written = 0
+
+    def write(self, activities: Sequence[dict[str, Any]]) -> None:
+        """Append a chunk of stored activities."""
+        rows = (
+            {
+                **activity["data"],
+                ATTR_ACTIVITY_TYPE: activity["type"],
+                ATTR_TIMESTAMP: activity["timestamp"],
+                "id": activity.get("id"),
+            }
+            for activity in activities
+        )
+        if self._csv is not None:
+            self._csv.writerows(rows)
+        else:
+            self._handle.writelines(json.dumps(row) + "\n" for row in rows)
+        self.written += len(activities)
+
+    def close(self) -> None:
+        """Close the file."""
+        self._handle.close()
@@ -0,0 +1,81 @@
+"""Long-term statistics import for Baby Monitor."""
+from __future__ import annotations
+
+import logging
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.core import HomeAssistant
+from homeassistant.util import slugify
+
+from .aggregates import STATISTIC_SPECS, hourly_totals
+from .const import DOMAIN
+from .storage import BabyMonitorStorage, local_now, to_aware
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def statistic_id(baby_name: str, metric: str) -> str:
+    """Return the external statistic id for a baby's metric."""
+    return f"{DOMAIN}:{slugify(baby_name)}_{metric}"
+
+
+async def async_import_statistics(
+    hass: HomeAssistant, storage: BabyMonitorStorage
+) -> None:
+    """Push hourly activity totals into long-term statistics.
+    
+    Only completed hours are imported. The first run backfills the whole
+    history; later runs continue from where the previous one stopped, carrying
+    the running sums forward so graphs can take daily differences. Hourly
+    totals are computed in the executor, so a large backfill doesn't block
+    the event loop.
+    
+    An import of older history resets the progress, and the next run imports
+    everything again. Rows are written per hour and replace the stored ones,
+    so every hour that has activities is corrected. Activities are never
+    edited or deleted, so no hour loses all of its activities and leaves a
+    stale row behind.
+    """
+    if "recorder" not in hass.config.components:
+        return
+    
+    progress = storage.get_statistics_progress()
+    until = local_now().replace(minute=0, second=0, microsecond=0).isoformat()
+    if progress["imported_until"] == until:
+        return
+    
+    activities = storage.get_activities_between(progress["imported_until"], until)
+    sums = dict(progress["sums"])
+    
+    totals = await hass.async_add_executor_job(hourly_totals, activities)
+    for metric, buckets in totals.items():
+        spec = STATISTIC_SPECS[metric]
+        total = sums.get(metric, 0)
+        statistics: list[StatisticData] = []
+        for hour in sorted(buckets):
+            total += buckets[hour]
+            statistics.append(
+                StatisticData(start=to_aware(hour), state=buckets[hour], sum=total)
+            )
+        sums[metric] = total
+        
+        async_add_external_statistics(
+            hass,
+            StatisticMetaData(
+                has_mean=False,
+                has_sum=True,
+                name=f"{storage.baby_name} {spec.name}",
+                source=DOMAIN,
+                statistic_id=statistic_id(storage.baby_name, metric),
+                unit_of_measurement=spec.unit,
+            ),
+            statistics,
+        )
+    
+    _LOGGER.debug(
+        "Imported %d activities for %s into long-term statistics",
+        len(activities),
+        storage.baby_name,
+    )
+    storage.async_set_statistics_progress(until, sums)
@@ -0,0 +1,134 @@
+"""Coalesced sensor refresh after Baby Monitor writes."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.entity_component import async_update_entity
+from homeassistant.helpers.entity_registry import (
+    EVENT_ENTITY_REGISTRY_UPDATED,
+    async_entries_for_config_entry,
+    async_get as async_get_entity_registry,
+)
+from homeassistant.helpers.event import async_call_later
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to wait after a write so a burst of writes refreshes once
+REFRESH_DELAY = 0.5
+
+
+class SensorRefresher:
+    """Refresh a baby's sensors once after a burst of writes.
+
+    Writers call ``async_schedule``, which only marks the baby dirty and
+    returns. REFRESH_DELAY seconds after the first request every sensor is
+    updated concurrently. Requests that arrive while a refresh runs cause a
+    single follow-up refresh, so no write is missed.
+
+    The enabled sensors are looked up once through the config entry and
+    cached until the registry changes one of this entry's entities.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, baby_name: str) -> None:
+        """Initialize the refresher."""
+        self._hass = hass
+        self._entry_id = entry_id
+        self._baby_name = baby_name
+        self._entity_ids: list[str] | None = None
+        self._unsub_registry: CALLBACK_TYPE | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._task: asyncio.Task | None = None
+        self._pending = False
+
+    @callback
+    def async_start(self) -> None:
+        """Start following entity registry changes."""
+        self._unsub_registry = self._hass.bus.async_listen(
+            EVENT_ENTITY_REGISTRY_UPDATED,
+            self._handle_registry_update,
+            event_filter=self._is_own_entity,
+        )
+
+    @callback
+    def _is_own_entity(self, event: Event) -> bool:
+        """Return True if a registry change concerns this entry's entities."""
+        if self._entity_ids is None:
+            return False
+        entity_id = event.data["entity_id"]
+        if entity_id in self._entity_ids or event.data.get("old_entity_id") in self._entity_ids:
+            return True
+        # A new or re-enabled entity is not cached yet
+        entry = async_get_entity_registry(self._hass).async_get(entity_id)
+        return entry is not None and entry.config_entry_id == self._entry_id
+
+    @callback
+    def _handle_registry_update(self, _event: Event) -> None:
+        """Drop the cached sensors; registry changes are rare."""
+        self._entity_ids = None
+
+    @callback
+    def async_schedule(self) -> None:
+        """Request a refresh; returns immediately."""
+        if self._task is not None:
+            self._pending = True
+            return
+        if self._unsub_timer is None:
+            self._unsub_timer = async_call_later(
+                self._hass, REFRESH_DELAY, self._handle_timer
+            )
+
+    @callback
+    def _handle_timer(self, _now: Any) -> None:
+        """Start the refresh once the delay has passed."""
+        self._unsub_timer = None
+        self._task = self._hass.async_create_background_task(
+            self._async_run(), f"babymonitor refresh {self._baby_name}"
+        )
+
+    def _sensor_entity_ids(self) -> list[str]:
+        """Return the entity ids of this entry's enabled sensors."""
+        if self._entity_ids is None:
+            self._entity_ids = [
+                entity.entity_id
+                for entity in async_entries_for_config_entry(
+                    async_get_entity_registry(self._hass), self._entry_id
+                )
+                if entity.domain == "sensor" and not entity.disabled
+            ]
+        return self._entity_ids
+
+    async def _async_run(self) -> None:
+        """Update every sensor concurrently, then rerun if writes arrived."""
+        try:
+            entity_ids = self._sensor_entity_ids()
+            results = await asyncio.gather(
+                *(async_update_entity(self._hass, entity_id) for entity_id in entity_ids),
+                return_exceptions=True,
+            )
+            for entity_id, result in zip(entity_ids, results):
+                if isinstance(result, Exception):
+                    _LOGGER.warning("Could not refresh %s: %s", entity_id, result)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Failed to refresh sensors for %s", self._baby_name)
+        finally:
+            self._task = None
+        if self._pending:
+            self._pending = False
+            self.async_schedule()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following the registry and cancel a scheduled or running refresh."""
+        if self._unsub_registry is not None:
+            self._unsub_registry()
+            self._unsub_registry = None
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._pending = False
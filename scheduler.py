@@ -0,0 +1,114 @@
+"""Time-driven refresh scheduler for Baby Monitor sensors."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_time
+
+from .storage import BabyMonitorStorage, local_now, to_aware
+
+if TYPE_CHECKING:
+    from .sensor import BabyMonitorSensorBase
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RefreshScheduler:
+    """Arm a single timer for the next instant any sensor output changes.
+
+    Sensors register themselves and report, via ``next_refresh``, the next
+    wall-clock instant their state or attributes change (a minute boundary for
+    "time ago" text, a predicted feeding time, midnight, a record leaving a
+    window). The scheduler keeps exactly one ``async_track_point_in_time``
+    armed for the earliest of those instants and re-arms after each firing and
+    after every storage change.
+    """
+
+    def __init__(self, hass: HomeAssistant, storage: BabyMonitorStorage) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._storage = storage
+        self._entities: set[BabyMonitorSensorBase] = set()
+        self._due: dict[BabyMonitorSensorBase, datetime] = {}
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._unsub_storage: CALLBACK_TYPE | None = None
+        self._armed_for: datetime | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start following storage changes."""
+        self._unsub_storage = self._storage.async_add_listener(self.async_reschedule)
+
+    @callback
+    def async_register(self, entity: BabyMonitorSensorBase) -> CALLBACK_TYPE:
+        """Register an entity and return a callback that unregisters it."""
+        self._entities.add(entity)
+        self.async_reschedule()
+
+        @callback
+        def _unregister() -> None:
+            self._entities.discard(entity)
+            self._due.pop(entity, None)
+            self.async_reschedule()
+
+        return _unregister
+
+    @callback
+    def async_reschedule(self) -> None:
+        """Recompute due times and arm the timer for the earliest one."""
+        now = local_now()
+        self._due = {}
+        for entity in self._entities:
+            try:
+                when = entity.next_refresh(now)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Failed to compute next refresh for %s", entity)
+                continue
+            if when is not None and when > now:
+                self._due[entity] = when
+
+        next_due = min(self._due.values(), default=None)
+        if next_due == self._armed_for and self._unsub_timer is not None:
+            return
+
+        self._cancel_timer()
+        if next_due is None:
+            return
+
+        self._armed_for = next_due
+        self._unsub_timer = async_track_point_in_time(
+            self._hass, self._handle_timer, to_aware(next_due)
+        )
+
+    @callback
+    def _handle_timer(self, _fired_at: Any) -> None:
+        """Refresh every entity whose due time has passed, then re-arm."""
+        self._unsub_timer = None
+        self._armed_for = None
+        now = local_now()
+
+        for entity, when in list(self._due.items()):
+            if when <= now and entity in self._entities:
+                entity.async_write_ha_state()
+
+        self.async_reschedule()
+
+    def _cancel_timer(self) -> None:
+        """Cancel the armed timer, if any."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._armed_for = None
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the scheduler."""
+        self._cancel_timer()
+        if self._unsub_storage is not None:
+            self._unsub_storage()
+            self._unsub_storage = None
+        self._entities.clear()
+        self._due.clear()
@@ -1,6 +1,7 @@
 """Sensor platform for Baby Monitor integration."""
 from __future__ import annotations
 
+import json
 import logging
 from datetime import datetime, timedelta
 from typing import Any
@@ -17,18 +18,33 @@ from .const import (
     ACTIVITY_FEEDING,
     ACTIVITY_SLEEP,
     ACTIVITY_TEMPERATURE,
+    ACTIVITY_TUMMY_TIME,
+    ACTIVITY_CRYING,
+    ACTIVITY_MOOD,
+    ACTIVITY_CAREGIVER,
+    ACTIVITY_WEIGHT,
+    ACTIVITY_HEIGHT,
     CONF_MIN_DIAPERS_PER_DAY,
     CONF_MIN_WET_DIAPERS_PER_DAY,
     CONF_MIN_FEEDINGS_PER_DAY,
     CONF_MIN_SLEEP_HOURS_PER_DAY,
     CONF_TARGET_TUMMY_TIME_MINUTES,
+    CONF_GROWTH_WINDOW_DAYS,
     DEFAULT_MIN_DIAPERS_PER_DAY,
     DEFAULT_MIN_WET_DIAPERS_PER_DAY,
     DEFAULT_MIN_FEEDINGS_PER_DAY,
     DEFAULT_MIN_SLEEP_HOURS_PER_DAY,
     DEFAULT_TARGET_TUMMY_TIME_MINUTES,
+    DEFAULT_GROWTH_WINDOW_DAYS,
+    MAX_ATTRIBUTE_STRING_LENGTH,
+    MAX_ATTRIBUTES_BYTES,
 )
-from .storage import BabyMonitorStorage
+from .aggregates import ROOM_RANGES, TIME_IN_RANGE_WINDOWS, GrowthTrend
+from .coordinator import AnalyticsCoordinator
+from .growth import age_in_days, birth_profile, percentile, z_score
+from .scheduler import RefreshScheduler
+from .storage import BabyMonitorStorage, local_now, to_aware
+from .util import baby_id
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -44,33 +60,35 @@ async def async_setup_entry(
     baby_name = data["baby_name"]
     storage = data["storage"]
     options = data["options"]
+    scheduler = data["scheduler"]
+    analytics = data["analytics"]
     
     sensors = [
-        LastDiaperChangeSensor(baby_name, storage, options),
-        LastFeedingSensor(baby_name, storage, options),
-        LastSleepSensor(baby_name, storage, options),
-        TotalDiaperChangesSensor(baby_name, storage, options),
-        TotalFeedingsSensor(baby_name, storage, options),
-        TotalSleepSessionsSensor(baby_name, storage, options),
-        AverageSleepDurationSensor(baby_name, storage, options),
-        AverageFeedingAmountSensor(baby_name, storage, options),
-        DailySummaryDisplaySensor(baby_name, storage, options),
-        WeeklySummaryDisplaySensor(baby_name, storage, options),
-        CurrentTemperatureSensor(baby_name, storage, options),
-        LastBathSensor(baby_name, storage, options),
-        TummyTimeTodaySensor(baby_name, storage, options),
-        SleepQualityScoreSensor(baby_name, storage, options),
-        GrowthPercentileSensor(baby_name, storage, options),
-        NextFeedingPredictionSensor(baby_name, storage, options),
-        MoodAnalysisSensor(baby_name, storage, options),
-        CryingAnalysisSensor(baby_name, storage, options),
-        TotalCryingEpisodesToday(baby_name, storage, options),
-        EnvironmentalConditionsSensor(baby_name, storage, options),
-        CurrentCaregiverSensor(baby_name, storage, options),
-        GrowthVelocitySensor(baby_name, storage, options),
-        SleepRegressionIndicatorSensor(baby_name, storage, options),
-        DiaperChangeFrequencySensor(baby_name, storage, options),
-        FeedingEfficiencySensor(baby_name, storage, options),
+        LastDiaperChangeSensor(baby_name, storage, options, scheduler),
+        LastFeedingSensor(baby_name, storage, options, scheduler),
+        LastSleepSensor(baby_name, storage, options, scheduler),
+        TotalDiaperChangesSensor(baby_name, storage, options, scheduler),
+        TotalFeedingsSensor(baby_name, storage, options, scheduler),
+        TotalSleepSessionsSensor(baby_name, storage, options, scheduler),
+        AverageSleepDurationSensor(baby_name, storage, options, scheduler, analytics),
+        AverageFeedingAmountSensor(baby_name, storage, options, scheduler, analytics),
+        DailySummaryDisplaySensor(baby_name, storage, options, scheduler),
+        WeeklySummaryDisplaySensor(baby_name, storage, options, scheduler),
+        CurrentTemperatureSensor(baby_name, storage, options, scheduler),
+        LastBathSensor(baby_name, storage, options, scheduler),
+        TummyTimeTodaySensor(baby_name, storage, options, scheduler),
+        SleepQualityScoreSensor(baby_name, storage, options, scheduler),
+        GrowthPercentileSensor(baby_name, storage, options, scheduler),
+        NextFeedingPredictionSensor(baby_name, storage, options, scheduler),
+        MoodAnalysisSensor(baby_name, storage, options, scheduler),
+        CryingAnalysisSensor(baby_name, storage, options, scheduler),
+        TotalCryingEpisodesToday(baby_name, storage, options, scheduler),
+        EnvironmentalConditionsSensor(baby_name, storage, options, scheduler),
+        CurrentCaregiverSensor(baby_name, storage, options, scheduler),
+        GrowthVelocitySensor(baby_name, storage, options, scheduler),
+        SleepRegressionIndicatorSensor(baby_name, storage, options, scheduler),
+        DiaperChangeFrequencySensor(baby_name, storage, options, scheduler),
+        FeedingEfficiencySensor(baby_name, storage, options, scheduler),
     ]
     
     async_add_entities(sensors, True)
@@ -79,13 +97,124 @@ async def async_setup_entry(
 class BabyMonitorSensorBase(SensorEntity, RestoreEntity):
     """Base class for Baby Monitor sensors."""
     
-    def __init__(self, baby_name: str, storage: BabyMonitorStorage, options: dict[str, Any]) -> None:
+    _attr_should_poll = False
+    
+    def __init__(
+        self,
+        baby_name: str,
+        storage: BabyMonitorStorage,
+        options: dict[str, Any],
+        scheduler: RefreshScheduler | None = None,
+        analytics: AnalyticsCoordinator | None = None,
+    ) -> None:
         """Initialize the sensor."""
         self._baby_name = baby_name
         self._storage = storage
         self._options = options
+        self._scheduler = scheduler
+        self._analytics = analytics
         self._attr_name = f"{baby_name} {self._sensor_name}"
-        self._attr_unique_id = f"{baby_name.lower().replace(' ', '_')}_{self._sensor_id}"
+        self._attr_unique_id = f"{baby_id(baby_name)}_{self._sensor_id}"
+    
+    async def async_added_to_hass(self) -> None:
+        """Register with the refresh scheduler when added to Home Assistant."""
+        await super().async_added_to_hass()
+        if self._scheduler is not None:
+            self.async_on_remove(self._scheduler.async_register(self))
+        if self._analytics is not None:
+            self.async_on_remove(
+                self._analytics.async_add_listener(self.async_write_ha_state)
+            )
+    
+    @staticmethod
+    def _bounded(attributes: dict[str, Any]) -> dict[str, Any]:
+        """Keep attributes within the recorder size budget.
+        
+        Long strings are shortened first; if the payload is still too large
+        the trailing attributes are dropped and a truncated flag is added.
+        """
+        if len(json.dumps(attributes, default=str)) <= MAX_ATTRIBUTES_BYTES:
+            return attributes
+        
+        bounded = {
+            key: value[:MAX_ATTRIBUTE_STRING_LENGTH - 1] + "…"
+            if isinstance(value, str) and len(value) > MAX_ATTRIBUTE_STRING_LENGTH
+            else value
+            for key, value in attributes.items()
+        }
+        while bounded and len(json.dumps(bounded, default=str)) > MAX_ATTRIBUTES_BYTES:
+            bounded.popitem()
+        bounded["truncated"] = True
+        return bounded
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Return the next instant this sensor's output changes with the clock.
+        
+        Sensors that only change when new data is logged return None.
+        """
+        return None
+    
+    def _get_time_ago(self, timestamp: str) -> str:
+        """Get human readable time ago."""
+        dt = datetime.fromisoformat(timestamp)
+        diff = local_now() - dt
+        
+        if diff.days > 0:
+            return f"{diff.days} days ago"
+        elif diff.seconds > 3600:
+            hours = diff.seconds // 3600
+            return f"{hours} hours ago"
+        elif diff.seconds > 60:
+            minutes = diff.seconds // 60
+            return f"{minutes} minutes ago"
+        else:
+            return "Just now"
+    
+    @staticmethod
+    def _next_time_ago_change(timestamp: str, now: datetime) -> datetime:
+        """Return when the text from _get_time_ago next changes."""
+        dt = datetime.fromisoformat(timestamp)
+        diff = now - dt
+        
+        if diff.days > 0:
+            step = timedelta(days=1)
+        elif diff.seconds > 3600:
+            step = timedelta(hours=1)
+        else:
+            step = timedelta(minutes=1)
+        
+        return dt + (diff // step + 1) * step + timedelta(seconds=1)
+    
+    @staticmethod
+    def _next_step(timestamp: str, now: datetime, step: timedelta) -> datetime:
+        """Return the next multiple of step after timestamp that lies after now."""
+        dt = datetime.fromisoformat(timestamp)
+        return dt + ((now - dt) // step + 1) * step
+    
+    @staticmethod
+    def _next_midnight(now: datetime) -> datetime:
+        """Return the start of the next day."""
+        return datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    
+    def _next_window_expiry(self, *names: str) -> datetime | None:
+        """Return when the oldest entry leaves any of the named windows."""
+        expiries = [self._storage.get_window(name).expires_at() for name in names]
+        return min((expiry for expiry in expiries if expiry), default=None)
+    
+    def _long_range_summary(self, metric: str, unit: str) -> dict[str, Any]:
+        """Return the latest long-range summary computed off the event loop."""
+        if self._analytics is None:
+            return {}
+        summary = self._analytics.results.get(metric)
+        if summary is None:
+            return {}
+        
+        return {
+            f"median_{unit}_30d": round(summary["median"], 1),
+            f"p90_{unit}_30d": round(summary["p90"], 1),
+            f"daily_total_{unit}_30d": round(summary["daily_mean"], 1),
+            "days_with_data_30d": len(summary["per_day"]),
+        }
     
     @property
     def device_info(self) -> dict[str, Any]:
@@ -104,6 +233,7 @@ class LastDiaperChangeSensor(BabyMonitorSensorBase):
     _sensor_name = "Last Diaper Change"
     _sensor_id = "last_diaper_change"
     _attr_icon = "mdi:baby-bottle"
+    _unrecorded_attributes = frozenset({"notes", "time_ago"})
     
     @property
     def state(self) -> str | None:
@@ -120,28 +250,19 @@ class LastDiaperChangeSensor(BabyMonitorSensorBase):
         """Return additional state attributes."""
         activities = self._storage.get_activities_by_type(ACTIVITY_DIAPER_CHANGE, limit=1)
         if activities:
-            return {
+            return self._bounded({
                 "diaper_type": activities[0]["data"].get("diaper_type", "unknown"),
                 "notes": activities[0]["data"].get("notes", ""),
                 "time_ago": self._get_time_ago(activities[0]["timestamp"])
-            }
+            })
         return {}
     
-    def _get_time_ago(self, timestamp: str) -> str:
-        """Get human readable time ago."""
-        dt = datetime.fromisoformat(timestamp)
-        diff = datetime.now() - dt
-        
-        if diff.days > 0:
-            return f"{diff.days} days ago"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours} hours ago"
-        elif diff.seconds > 60:
-            minutes = diff.seconds // 60
-            return f"{minutes} minutes ago"
-        else:
-            return "Just now"
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh when the time ago text changes."""
+        latest = self._storage.get_latest_activity(ACTIVITY_DIAPER_CHANGE)
+        if latest:
+            return self._next_time_ago_change(latest["timestamp"], now)
+        return None
 
 
 class LastFeedingSensor(BabyMonitorSensorBase):
@@ -149,6 +270,7 @@ class LastFeedingSensor(BabyMonitorSensorBase):
     
     _sensor_name = "Last Feeding"
     _sensor_id = "last_feeding"
+    _unrecorded_attributes = frozenset({"notes", "time_ago"})
     
     @property
     def state(self) -> str | None:
@@ -166,30 +288,21 @@ class LastFeedingSensor(BabyMonitorSensorBase):
         activities = self._storage.get_activities_by_type(ACTIVITY_FEEDING, limit=1)
         if activities:
             data = activities[0]["data"]
-            return {
+            return self._bounded({
                 "feeding_type": data.get("feeding_type", "unknown"),
                 "amount_ml": data.get("feeding_amount", 0),
                 "duration_minutes": data.get("feeding_duration", 0),
                 "notes": data.get("notes", ""),
                 "time_ago": self._get_time_ago(activities[0]["timestamp"])
-            }
+            })
         return {}
     
-    def _get_time_ago(self, timestamp: str) -> str:
-        """Get human readable time ago."""
-        dt = datetime.fromisoformat(timestamp)
-        diff = datetime.now() - dt
-        
-        if diff.days > 0:
-            return f"{diff.days} days ago"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours} hours ago"
-        elif diff.seconds > 60:
-            minutes = diff.seconds // 60
-            return f"{minutes} minutes ago"
-        else:
-            return "Just now"
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh when the time ago text changes."""
+        latest = self._storage.get_latest_activity(ACTIVITY_FEEDING)
+        if latest:
+            return self._next_time_ago_change(latest["timestamp"], now)
+        return None
 
 
 class LastSleepSensor(BabyMonitorSensorBase):
@@ -197,6 +310,7 @@ class LastSleepSensor(BabyMonitorSensorBase):
     
     _sensor_name = "Last Sleep"
     _sensor_id = "last_sleep"
+    _unrecorded_attributes = frozenset({"duration_formatted", "notes", "time_ago"})
     
     @property
     def state(self) -> str | None:
@@ -219,29 +333,20 @@ class LastSleepSensor(BabyMonitorSensorBase):
                 duration = activity["data"].get("duration", 0)
                 hours = duration // 60
                 minutes = duration % 60
-                return {
+                return self._bounded({
                     "duration_minutes": duration,
                     "duration_formatted": f"{hours}h {minutes}m",
                     "notes": activity["data"].get("notes", ""),
                     "time_ago": self._get_time_ago(activity["timestamp"])
-                }
+                })
         return {}
     
-    def _get_time_ago(self, timestamp: str) -> str:
-        """Get human readable time ago."""
-        dt = datetime.fromisoformat(timestamp)
-        diff = datetime.now() - dt
-        
-        if diff.days > 0:
-            return f"{diff.days} days ago"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours} hours ago"
-        elif diff.seconds > 60:
-            minutes = diff.seconds // 60
-            return f"{minutes} minutes ago"
-        else:
-            return "Just now"
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh when the time ago text changes."""
+        last_sleep = self._storage.get_stats().get("last_sleep")
+        if last_sleep:
+            return self._next_time_ago_change(last_sleep, now)
+        return None
 
 
 class TotalDiaperChangesSensor(BabyMonitorSensorBase):
@@ -250,6 +355,9 @@ class TotalDiaperChangesSensor(BabyMonitorSensorBase):
     _sensor_name = "Total Diaper Changes"
     _sensor_id = "total_diaper_changes"
     _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _unrecorded_attributes = frozenset(
+        {"min_diapers_goal", "min_wet_diapers_goal", "progress_percentage"}
+    )
     
     @property
     def state(self) -> int:
@@ -260,16 +368,11 @@ class TotalDiaperChangesSensor(BabyMonitorSensorBase):
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
-        today = datetime.now().date()
-        today_start = datetime.combine(today, datetime.min.time()).isoformat()
-        today_end = datetime.combine(today, datetime.max.time()).isoformat()
-        
-        today_changes = self._storage.get_activities_by_date_range(today_start, today_end)
-        today_diaper_changes = [a for a in today_changes if a["type"] == ACTIVITY_DIAPER_CHANGE]
+        today = self._storage.get_today_totals()
         
-        today_count = len(today_diaper_changes)
-        wet_today = len([a for a in today_diaper_changes if a["data"].get("diaper_type") in ["wet", "both"]])
-        dirty_today = len([a for a in today_diaper_changes if a["data"].get("diaper_type") in ["dirty", "both"]])
+        today_count = today.count(ACTIVITY_DIAPER_CHANGE)
+        wet_today = today.count_where(ACTIVITY_DIAPER_CHANGE, "wet", "both")
+        dirty_today = today.count_where(ACTIVITY_DIAPER_CHANGE, "dirty", "both")
         
         # Get configured thresholds
         min_diapers = self._options.get(CONF_MIN_DIAPERS_PER_DAY, DEFAULT_MIN_DIAPERS_PER_DAY)
@@ -289,6 +392,10 @@ class TotalDiaperChangesSensor(BabyMonitorSensorBase):
             "wet_diaper_status": wet_status,
             "progress_percentage": round((today_count / min_diapers * 100), 0) if min_diapers > 0 else 100,
         }
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh at midnight when today's counts reset."""
+        return self._next_midnight(now)
 
 
 class TotalFeedingsSensor(BabyMonitorSensorBase):
@@ -297,6 +404,7 @@ class TotalFeedingsSensor(BabyMonitorSensorBase):
     _sensor_name = "Total Feedings"
     _sensor_id = "total_feedings"
     _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _unrecorded_attributes = frozenset({"min_feedings_goal", "progress_percentage"})
     
     @property
     def state(self) -> int:
@@ -307,15 +415,11 @@ class TotalFeedingsSensor(BabyMonitorSensorBase):
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
-        today = datetime.now().date()
-        today_start = datetime.combine(today, datetime.min.time()).isoformat()
-        today_end = datetime.combine(today, datetime.max.time()).isoformat()
+        today = self._storage.get_today_totals()
         
-        today_activities = self._storage.get_activities_by_date_range(today_start, today_end)
-        today_feedings = [a for a in today_activities if a["type"] == ACTIVITY_FEEDING]
-        
-        total_amount_today = sum(f["data"].get("feeding_amount", 0) for f in today_feedings)
-        today_count = len(today_feedings)
+        total_amount_today = today.total(ACTIVITY_FEEDING, "feeding_amount")
+        today_count = today.count(ACTIVITY_FEEDING)
+        feeding_types = today.breakdown(ACTIVITY_FEEDING)
         
         # Get configured threshold
         min_feedings = self._options.get(CONF_MIN_FEEDINGS_PER_DAY, DEFAULT_MIN_FEEDINGS_PER_DAY)
@@ -326,12 +430,16 @@ class TotalFeedingsSensor(BabyMonitorSensorBase):
         return {
             "today_count": today_count,
             "total_amount_today_ml": total_amount_today,
-            "bottle_feedings_today": len([f for f in today_feedings if f["data"].get("feeding_type") == "bottle"]),
-            "breast_feedings_today": len([f for f in today_feedings if "breast" in f["data"].get("feeding_type", "")]),
+            "bottle_feedings_today": feeding_types.get("bottle", 0),
+            "breast_feedings_today": sum(count for feeding_type, count in feeding_types.items() if "breast" in feeding_type),
             "min_feedings_goal": min_feedings,
             "feeding_status": feeding_status,
             "progress_percentage": round((today_count / min_feedings * 100), 0) if min_feedings > 0 else 100,
         }
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh at midnight when today's counts reset."""
+        return self._next_midnight(now)
 
 
 class TotalSleepSessionsSensor(BabyMonitorSensorBase):
@@ -355,12 +463,25 @@ class AverageSleepDurationSensor(BabyMonitorSensorBase):
     _sensor_id = "average_sleep_duration"
     _attr_unit_of_measurement = "minutes"
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _unrecorded_attributes = frozenset(
+        {
+            "median_minutes_30d",
+            "p90_minutes_30d",
+            "daily_total_minutes_30d",
+            "days_with_data_30d",
+        }
+    )
     
     @property
     def state(self) -> float:
         """Return the state of the sensor."""
         stats = self._storage.get_stats()
         return round(stats.get("average_sleep_duration", 0), 1)
+    
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return sleep duration analytics for the last 30 days."""
+        return self._long_range_summary("sleep_duration", "minutes")
 
 
 class AverageFeedingAmountSensor(BabyMonitorSensorBase):
@@ -370,12 +491,19 @@ class AverageFeedingAmountSensor(BabyMonitorSensorBase):
     _sensor_id = "average_feeding_amount"
     _attr_unit_of_measurement = "ml"
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _unrecorded_attributes = frozenset(
+        {"median_ml_30d", "p90_ml_30d", "daily_total_ml_30d", "days_with_data_30d"}
+    )
     
     @property
     def state(self) -> float:
         """Return the state of the sensor."""
-        stats = self._storage.get_stats()
-        return round(stats.get("average_feeding_amount", 0), 1)
+        return round(self._storage.get_feeding_totals().average_amount() or 0, 1)
+    
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return feeding amount analytics for the last 30 days."""
+        return self._long_range_summary("feeding_amount", "ml")
 
 
 class CurrentTemperatureSensor(BabyMonitorSensorBase):
@@ -386,6 +514,7 @@ class CurrentTemperatureSensor(BabyMonitorSensorBase):
     _attr_unit_of_measurement = "°C"
     _attr_device_class = "temperature"
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _unrecorded_attributes = frozenset({"notes", "time_ago"})
     
     @property
     def native_value(self) -> float | None:
@@ -400,28 +529,19 @@ class CurrentTemperatureSensor(BabyMonitorSensorBase):
         """Return additional state attributes."""
         activities = self._storage.get_activities_by_type(ACTIVITY_TEMPERATURE, limit=1)
         if activities:
-            return {
+            return self._bounded({
                 "last_recorded": activities[0]["timestamp"],
                 "notes": activities[0]["data"].get("notes", ""),
                 "time_ago": self._get_time_ago(activities[0]["timestamp"])
-            }
+            })
         return {}
     
-    def _get_time_ago(self, timestamp: str) -> str:
-        """Get human readable time ago."""
-        dt = datetime.fromisoformat(timestamp)
-        diff = datetime.now() - dt
-        
-        if diff.days > 0:
-            return f"{diff.days} days ago"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours} hours ago"
-        elif diff.seconds > 60:
-            minutes = diff.seconds // 60
-            return f"{minutes} minutes ago"
-        else:
-            return "Just now"
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh when the time ago text changes."""
+        latest = self._storage.get_latest_activity(ACTIVITY_TEMPERATURE)
+        if latest:
+            return self._next_time_ago_change(latest["timestamp"], now)
+        return None
 
 
 class DailySummaryDisplaySensor(BabyMonitorSensorBase):
@@ -429,49 +549,42 @@ class DailySummaryDisplaySensor(BabyMonitorSensorBase):
     
     _sensor_name = "Daily Summary"
     _sensor_id = "daily_summary"
+    _unrecorded_attributes = frozenset({"total_sleep_formatted"})
     
     @property
     def state(self) -> str:
         """Return a summary state."""
-        today = datetime.now().date()
-        today_start = datetime.combine(today, datetime.min.time()).isoformat()
-        today_end = datetime.combine(today, datetime.max.time()).isoformat()
-        
-        today_activities = self._storage.get_activities_by_date_range(today_start, today_end)
+        today = self._storage.get_today_totals()
         
-        diaper_count = len([a for a in today_activities if a["type"] == ACTIVITY_DIAPER_CHANGE])
-        feeding_count = len([a for a in today_activities if a["type"] == ACTIVITY_FEEDING])
-        sleep_count = len([a for a in today_activities if a["type"] == ACTIVITY_SLEEP and a["data"].get("sleep_type") == "end"])
+        diaper_count = today.count(ACTIVITY_DIAPER_CHANGE)
+        feeding_count = today.count(ACTIVITY_FEEDING)
+        sleep_count = today.count_where(ACTIVITY_SLEEP, "end")
         
         return f"D:{diaper_count} F:{feeding_count} S:{sleep_count}"
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return detailed daily summary."""
-        today = datetime.now().date()
-        today_start = datetime.combine(today, datetime.min.time()).isoformat()
-        today_end = datetime.combine(today, datetime.max.time()).isoformat()
+        today = self._storage.get_today_totals()
         
-        today_activities = self._storage.get_activities_by_date_range(today_start, today_end)
-        
-        diaper_changes = [a for a in today_activities if a["type"] == ACTIVITY_DIAPER_CHANGE]
-        feedings = [a for a in today_activities if a["type"] == ACTIVITY_FEEDING]
-        sleep_sessions = [a for a in today_activities if a["type"] == ACTIVITY_SLEEP and a["data"].get("sleep_type") == "end"]
-        
-        total_feeding_amount = sum(f["data"].get("feeding_amount", 0) for f in feedings)
-        total_sleep_minutes = sum(s["data"].get("duration", 0) for s in sleep_sessions)
+        total_feeding_amount = today.total(ACTIVITY_FEEDING, "feeding_amount")
+        total_sleep_minutes = today.total(ACTIVITY_SLEEP, "duration")
         
         return {
-            "date": today.isoformat(),
-            "diaper_changes": len(diaper_changes),
-            "wet_diapers": len([d for d in diaper_changes if d["data"].get("diaper_type") in ["wet", "both"]]),
-            "dirty_diapers": len([d for d in diaper_changes if d["data"].get("diaper_type") in ["dirty", "both"]]),
-            "feedings": len(feedings),
+            "date": today.day.isoformat(),
+            "diaper_changes": today.count(ACTIVITY_DIAPER_CHANGE),
+            "wet_diapers": today.count_where(ACTIVITY_DIAPER_CHANGE, "wet", "both"),
+            "dirty_diapers": today.count_where(ACTIVITY_DIAPER_CHANGE, "dirty", "both"),
+            "feedings": today.count(ACTIVITY_FEEDING),
             "total_feeding_amount_ml": total_feeding_amount,
-            "sleep_sessions": len(sleep_sessions),
+            "sleep_sessions": today.count_where(ACTIVITY_SLEEP, "end"),
             "total_sleep_minutes": total_sleep_minutes,
             "total_sleep_formatted": f"{total_sleep_minutes // 60}h {total_sleep_minutes % 60}m"
         }
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh at midnight when today's counts reset."""
+        return self._next_midnight(now)
 
 
 class WeeklySummaryDisplaySensor(BabyMonitorSensorBase):
@@ -479,54 +592,61 @@ class WeeklySummaryDisplaySensor(BabyMonitorSensorBase):
     
     _sensor_name = "Weekly Summary"
     _sensor_id = "weekly_summary"
+    _unrecorded_attributes = frozenset(
+        {
+            "period_start",
+            "period_end",
+            "avg_diapers_per_day",
+            "avg_feedings_per_day",
+            "avg_sleep_minutes_per_day",
+            "avg_sleep_per_day_formatted",
+        }
+    )
     
     @property
     def state(self) -> str:
         """Return a summary state."""
-        week_start = (datetime.now() - timedelta(days=7)).isoformat()
-        week_end = datetime.now().isoformat()
-        
-        week_activities = self._storage.get_activities_by_date_range(week_start, week_end)
-        
-        diaper_count = len([a for a in week_activities if a["type"] == ACTIVITY_DIAPER_CHANGE])
-        feeding_count = len([a for a in week_activities if a["type"] == ACTIVITY_FEEDING])
-        sleep_count = len([a for a in week_activities if a["type"] == ACTIVITY_SLEEP and a["data"].get("sleep_type") == "end"])
+        diaper_count = self._storage.get_window("diaper_changes_7d").count
+        feeding_count = self._storage.get_window("feedings_7d").count
+        sleep_count = self._storage.get_window("sleep_sessions_7d").count
         
         return f"7d: D:{diaper_count} F:{feeding_count} S:{sleep_count}"
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return detailed weekly summary."""
-        week_start = (datetime.now() - timedelta(days=7)).isoformat()
-        week_end = datetime.now().isoformat()
+        week_start = (local_now() - timedelta(days=7)).isoformat()
+        week_end = local_now().isoformat()
         
-        week_activities = self._storage.get_activities_by_date_range(week_start, week_end)
+        diaper_changes = self._storage.get_window("diaper_changes_7d")
+        feedings = self._storage.get_window("feedings_7d")
+        sleep_sessions = self._storage.get_window("sleep_sessions_7d")
         
-        diaper_changes = [a for a in week_activities if a["type"] == ACTIVITY_DIAPER_CHANGE]
-        feedings = [a for a in week_activities if a["type"] == ACTIVITY_FEEDING]
-        sleep_sessions = [a for a in week_activities if a["type"] == ACTIVITY_SLEEP and a["data"].get("sleep_type") == "end"]
-        
-        total_feeding_amount = sum(f["data"].get("feeding_amount", 0) for f in feedings)
-        total_sleep_minutes = sum(s["data"].get("duration", 0) for s in sleep_sessions)
+        total_feeding_amount = feedings.total
+        total_sleep_minutes = sleep_sessions.total
         
         # Calculate daily averages
-        avg_diapers_per_day = len(diaper_changes) / 7
-        avg_feedings_per_day = len(feedings) / 7
+        avg_diapers_per_day = diaper_changes.count / 7
+        avg_feedings_per_day = feedings.count / 7
         avg_sleep_per_day = total_sleep_minutes / 7
         
-        return {
+        return self._bounded({
             "period_start": week_start,
             "period_end": week_end,
-            "total_diaper_changes": len(diaper_changes),
-            "total_feedings": len(feedings),
+            "total_diaper_changes": diaper_changes.count,
+            "total_feedings": feedings.count,
             "total_feeding_amount_ml": total_feeding_amount,
-            "total_sleep_sessions": len(sleep_sessions),
+            "total_sleep_sessions": sleep_sessions.count,
             "total_sleep_minutes": total_sleep_minutes,
             "avg_diapers_per_day": round(avg_diapers_per_day, 1),
             "avg_feedings_per_day": round(avg_feedings_per_day, 1),
             "avg_sleep_minutes_per_day": round(avg_sleep_per_day, 1),
             "avg_sleep_per_day_formatted": f"{int(avg_sleep_per_day // 60)}h {int(avg_sleep_per_day % 60)}m"
-        }
+        })
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh when the oldest counted activity leaves the 7 day window."""
+        return self._next_window_expiry("diaper_changes_7d", "feedings_7d", "sleep_sessions_7d")
 
 
 class LastBathSensor(BabyMonitorSensorBase):
@@ -534,34 +654,40 @@ class LastBathSensor(BabyMonitorSensorBase):
     
     _sensor_name = "Last Bath"
     _sensor_id = "last_bath"
+    _unrecorded_attributes = frozenset({"hours_since", "days_since", "notes"})
     
     @property
     def native_value(self) -> str | None:
-        activities = self._storage.get_activities_by_type("bath")
-        if not activities:
+        last_activity = self._storage.get_latest_activity("bath")
+        if not last_activity:
             return "Never"
         
-        last_activity = activities[-1]
         last_time = datetime.fromisoformat(last_activity["timestamp"])
         return last_time.strftime("%Y-%m-%d %H:%M")
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        activities = self._storage.get_activities_by_type("bath")
-        if not activities:
+        last_activity = self._storage.get_latest_activity("bath")
+        if not last_activity:
             return {}
         
-        last_activity = activities[-1]
         last_time = datetime.fromisoformat(last_activity["timestamp"])
-        time_since = datetime.now() - last_time
+        time_since = local_now() - last_time
         
-        return {
+        return self._bounded({
             "timestamp": last_activity["timestamp"],
             "bath_type": last_activity["data"].get("bath_type", "full_bath"),
             "hours_since": round(time_since.total_seconds() / 3600, 1),
             "days_since": round(time_since.days, 1),
             "notes": last_activity["data"].get("notes", "")
-        }
+        })
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh when hours_since moves to the next tenth of an hour."""
+        last_activity = self._storage.get_latest_activity("bath")
+        if not last_activity:
+            return None
+        return self._next_step(last_activity["timestamp"], now, timedelta(minutes=6))
 
 
 class TummyTimeTodaySensor(BabyMonitorSensorBase):
@@ -570,19 +696,22 @@ class TummyTimeTodaySensor(BabyMonitorSensorBase):
     _sensor_name = "Tummy Time Today"
     _sensor_id = "tummy_time_today"
     _attr_unit_of_measurement = "min"
-    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_state_class = SensorStateClass.TOTAL
+    _unrecorded_attributes = frozenset({"target_daily_minutes", "progress_percentage"})
+    
+    @property
+    def last_reset(self) -> datetime:
+        """Return midnight, when the daily count started."""
+        day = self._storage.get_today_totals().day
+        return to_aware(datetime.combine(day, datetime.min.time()))
     
     @property
     def native_value(self) -> int:
-        today_activities = self._storage.get_daily_activities()
-        tummy_time_activities = [a for a in today_activities if a["type"] == "tummy_time"]
-        total_minutes = sum(a["data"].get("duration", 0) for a in tummy_time_activities)
-        return total_minutes
+        return self._storage.get_today_totals().total(ACTIVITY_TUMMY_TIME, "duration")
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        today_activities = self._storage.get_daily_activities()
-        tummy_time_activities = [a for a in today_activities if a["type"] == "tummy_time"]
+        sessions_today = self._storage.get_today_totals().count(ACTIVITY_TUMMY_TIME)
         
         # Get configured target
         target_minutes = self._options.get(CONF_TARGET_TUMMY_TIME_MINUTES, DEFAULT_TARGET_TUMMY_TIME_MINUTES)
@@ -591,11 +720,15 @@ class TummyTimeTodaySensor(BabyMonitorSensorBase):
         tummy_time_status = "Meeting goal" if self.native_value >= target_minutes else "Below goal"
         
         return {
-            "sessions_today": len(tummy_time_activities),
+            "sessions_today": sessions_today,
             "target_daily_minutes": target_minutes,
             "progress_percentage": min(100, round((self.native_value / target_minutes) * 100, 0)) if target_minutes > 0 and self.native_value else 0,
             "tummy_time_status": tummy_time_status,
         }
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh at midnight when today's counts reset."""
+        return self._next_midnight(now)
 
 
 class SleepQualityScoreSensor(BabyMonitorSensorBase):
@@ -603,131 +736,114 @@ class SleepQualityScoreSensor(BabyMonitorSensorBase):
     
     _sensor_name = "Sleep Quality Score"
     _sensor_id = "sleep_quality_score"
+    _attr_entity_registry_enabled_default = False
     _attr_unit_of_measurement = "%"
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _unrecorded_attributes = frozenset({"analysis_period"})
     
     @property
     def native_value(self) -> int:
         """Calculate sleep quality score based on recent patterns."""
-        recent_activities = self._storage.get_activities_since_days(3)
-        sleep_activities = [a for a in recent_activities if a["type"] == ACTIVITY_SLEEP]
-        
-        if len(sleep_activities) < 4:  # Need some data
+        if self._storage.get_window("sleep_records_3d").count < 4:  # Need some data
             return 50
         
-        # Analyze sleep sessions (pairs of start/end)
-        sleep_sessions = []
-        start_activity = None
+        # Completed sleep sessions (end records) in the last 3 days
+        sleep_sessions = self._storage.get_window("sleep_sessions_3d")
         
-        for activity in sleep_activities:
-            if activity["data"].get("sleep_type") == "start":
-                start_activity = activity
-            elif activity["data"].get("sleep_type") == "end" and start_activity:
-                duration = activity["data"].get("duration", 0)
-                sleep_sessions.append({
-                    "duration": duration,
-                    "start_time": start_activity["timestamp"],
-                    "end_time": activity["timestamp"]
-                })
-                start_activity = None
-        
-        if not sleep_sessions:
+        if not sleep_sessions.count:
             return 50
         
         # Calculate quality factors
-        avg_duration = sum(s["duration"] for s in sleep_sessions) / len(sleep_sessions)
+        avg_duration = sleep_sessions.mean
         
         # Quality factors (0-100 each)
         duration_score = min(100, (avg_duration / 60) * 100)  # 60 min = perfect
-        consistency_score = max(0, 100 - (len(sleep_sessions) - 6) * 10)  # 6 sessions ideal
+        consistency_score = max(0, 100 - (sleep_sessions.count - 6) * 10)  # 6 sessions ideal
         
         overall_score = (duration_score * 0.6 + consistency_score * 0.4)
         return round(overall_score)
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        recent_activities = self._storage.get_activities_since_days(3)
-        sleep_activities = [a for a in recent_activities if a["type"] == ACTIVITY_SLEEP]
-        
-        # Calculate sessions
-        sleep_sessions = []
-        start_activity = None
+        sleep_sessions = self._storage.get_window("sleep_sessions_3d")
         
-        for activity in sleep_activities:
-            if activity["data"].get("sleep_type") == "start":
-                start_activity = activity
-            elif activity["data"].get("sleep_type") == "end" and start_activity:
-                duration = activity["data"].get("duration", 0)
-                sleep_sessions.append(duration)
-                start_activity = None
-        
-        if not sleep_sessions:
+        if not sleep_sessions.count:
             return {"analysis": "Insufficient data"}
         
-        avg_duration = sum(sleep_sessions) / len(sleep_sessions)
-        longest_session = max(sleep_sessions)
-        
         return {
-            "average_session_duration": f"{int(avg_duration)}min",
-            "longest_session": f"{int(longest_session)}min",
-            "sessions_in_3_days": len(sleep_sessions),
+            "average_session_duration": f"{int(sleep_sessions.mean)}min",
+            "longest_session": f"{int(sleep_sessions.maximum)}min",
+            "sessions_in_3_days": sleep_sessions.count,
             "analysis_period": "3 days"
         }
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh when the oldest sleep record leaves the 3 day window."""
+        return self._next_window_expiry("sleep_records_3d", "sleep_sessions_3d")
 
 
 class GrowthPercentileSensor(BabyMonitorSensorBase):
-    """Sensor for growth percentile tracking."""
+    """Sensor for WHO weight-for-age growth percentile."""
     
     _sensor_name = "Growth Percentile"
     _sensor_id = "growth_percentile"
     _attr_unit_of_measurement = "%"
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _unrecorded_attributes = frozenset({"chart_reference", "note"})
     
-    @property
-    def native_value(self) -> int | None:
-        """Calculate approximate growth percentile."""
-        weight_activities = self._storage.get_activities_by_type("weight")
-        height_activities = self._storage.get_activities_by_type("height")
-        
-        if not weight_activities or not height_activities:
-            return None
-        
-        # Get latest measurements
-        latest_weight = weight_activities[-1]["data"].get("weight", 0)
-        latest_height = height_activities[-1]["data"].get("height", 0)
-        
-        # Simplified percentile calculation (would need proper WHO charts in real implementation)
-        # This is a mock calculation for demo purposes
-        if latest_weight > 0 and latest_height > 0:
-            # Mock percentile based on ratio (simplified)
-            ratio = latest_weight / (latest_height / 100) ** 2  # Simple BMI-like calculation
-            if ratio < 12:
-                return 10
-            elif ratio < 14:
-                return 25
-            elif ratio < 16:
-                return 50
-            elif ratio < 18:
-                return 75
-            else:
-                return 90
-        
-        return 50  # Default middle percentile
-    
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        weight_activities = self._storage.get_activities_by_type("weight")
-        height_activities = self._storage.get_activities_by_type("height")
+    def _percentiles(self) -> dict[str, Any]:
+        """Compute WHO percentiles for the latest weight and length."""
+        weight_activities = self._storage.get_activities_by_type(ACTIVITY_WEIGHT, limit=1)
+        height_activities = self._storage.get_activities_by_type(ACTIVITY_HEIGHT, limit=1)
         
-        latest_weight = weight_activities[-1]["data"].get("weight", 0) if weight_activities else 0
-        latest_height = height_activities[-1]["data"].get("height", 0) if height_activities else 0
+        # Lists are newest first
+        latest_weight = weight_activities[0]["data"].get("weight") if weight_activities else None
+        latest_height = height_activities[0]["data"].get("height") if height_activities else None
         
-        return {
+        result: dict[str, Any] = {
             "latest_weight_kg": latest_weight,
             "latest_height_cm": latest_height,
-            "chart_reference": "WHO Growth Standards",
-            "note": "Consult pediatrician for official growth assessment"
         }
+        profile = birth_profile(self._options)
+        if profile is None:
+            return result
+        birth_date, sex = profile
+        
+        if latest_weight:
+            age = age_in_days(
+                birth_date, datetime.fromisoformat(weight_activities[0]["timestamp"])
+            )
+            result["age_days"] = age
+            result["weight_for_age_percentile"] = percentile(
+                z_score("weight_for_age", sex, age, latest_weight)
+            )
+            if latest_height:
+                result["weight_for_length_percentile"] = percentile(
+                    z_score("weight_for_length", sex, latest_height, latest_weight)
+                )
+        if latest_height:
+            age = age_in_days(
+                birth_date, datetime.fromisoformat(height_activities[0]["timestamp"])
+            )
+            result["length_for_age_percentile"] = percentile(
+                z_score("length_for_age", sex, age, latest_height)
+            )
+        return result
+    
+    @property
+    def native_value(self) -> float | None:
+        """Return the weight-for-age percentile of the latest weight."""
+        return self._percentiles().get("weight_for_age_percentile")
+    
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        attributes = self._percentiles()
+        attributes["chart_reference"] = "WHO Child Growth Standards"
+        if birth_profile(self._options) is None:
+            attributes["note"] = "Set birth date and sex in the integration options"
+        else:
+            attributes["note"] = "Consult pediatrician for official growth assessment"
+        return attributes
 
 
 class NextFeedingPredictionSensor(BabyMonitorSensorBase):
@@ -735,67 +851,55 @@ class NextFeedingPredictionSensor(BabyMonitorSensorBase):
     
     _sensor_name = "Next Feeding Prediction"
     _sensor_id = "next_feeding_prediction"
+    _unrecorded_attributes = frozenset(
+        {"hours_since_last_feeding", "interval_deviation_hours", "interval_source"}
+    )
     
     @property
     def native_value(self) -> str:
         """Predict next feeding time based on recent patterns."""
-        feeding_activities = self._storage.get_activities_by_type(ACTIVITY_FEEDING)
-        
-        if len(feeding_activities) < 3:
-            return "Insufficient data"
-        
-        # Get last 5 feeding times
-        recent_feedings = feeding_activities[-5:]
-        intervals = []
+        predicted_next = self._storage.get_feeding_model().predicted_next()
         
-        for i in range(1, len(recent_feedings)):
-            prev_time = datetime.fromisoformat(recent_feedings[i-1]["timestamp"])
-            curr_time = datetime.fromisoformat(recent_feedings[i]["timestamp"])
-            interval_hours = (curr_time - prev_time).total_seconds() / 3600
-            intervals.append(interval_hours)
-        
-        if not intervals:
+        if predicted_next is None:
             return "Insufficient data"
         
-        # Calculate average interval
-        avg_interval = sum(intervals) / len(intervals)
-        
-        # Predict next feeding
-        last_feeding_time = datetime.fromisoformat(feeding_activities[-1]["timestamp"])
-        predicted_next = last_feeding_time + timedelta(hours=avg_interval)
-        
-        if predicted_next < datetime.now():
+        if predicted_next <= local_now():
             return "Due now"
         
         return predicted_next.strftime("%H:%M")
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        feeding_activities = self._storage.get_activities_by_type(ACTIVITY_FEEDING)
+        model = self._storage.get_feeding_model()
+        avg_interval = model.interval_hours
         
-        if len(feeding_activities) < 3:
+        if avg_interval is None:
             return {"status": "Need more feeding data"}
         
-        # Calculate intervals
-        recent_feedings = feeding_activities[-5:]
-        intervals = []
-        
-        for i in range(1, len(recent_feedings)):
-            prev_time = datetime.fromisoformat(recent_feedings[i-1]["timestamp"])
-            curr_time = datetime.fromisoformat(recent_feedings[i]["timestamp"])
-            interval_hours = (curr_time - prev_time).total_seconds() / 3600
-            intervals.append(interval_hours)
-        
-        avg_interval = sum(intervals) / len(intervals) if intervals else 3
-        last_feeding = datetime.fromisoformat(feeding_activities[-1]["timestamp"])
-        time_since_last = (datetime.now() - last_feeding).total_seconds() / 3600
+        time_since_last = (local_now() - model.last).total_seconds() / 3600
         
         return {
             "average_interval_hours": round(avg_interval, 1),
+            "interval_deviation_hours": round(model.deviation_hours, 1),
+            "interval_source": "time_of_day" if model.uses_profile else "overall",
             "hours_since_last_feeding": round(time_since_last, 1),
-            "pattern_confidence": "High" if len(intervals) >= 4 else "Medium",
-            "last_feeding": last_feeding.strftime("%H:%M")
+            "pattern_confidence": model.confidence,
+            "last_feeding": model.last.strftime("%H:%M")
         }
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh exactly when the prediction becomes due or hours_since ticks over."""
+        model = self._storage.get_feeding_model()
+        predicted_next = model.predicted_next()
+        
+        if predicted_next is None:
+            return None
+        
+        next_tick = self._next_step(model.last.isoformat(), now, timedelta(minutes=6))
+        if predicted_next <= now:
+            return next_tick
+        
+        return min(next_tick, predicted_next)
 
 
 class MoodAnalysisSensor(BabyMonitorSensorBase):
@@ -803,6 +907,7 @@ class MoodAnalysisSensor(BabyMonitorSensorBase):
     
     _sensor_name = "Current Mood"
     _sensor_id = "current_mood"
+    _unrecorded_attributes = frozenset({"mood_counts_today", "mood_counts_week"})
     
     @property
     def native_value(self) -> str:
@@ -817,26 +922,30 @@ class MoodAnalysisSensor(BabyMonitorSensorBase):
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        today_moods = [a for a in self._storage.get_daily_activities() if a["type"] == "mood"]
-        week_moods = [a for a in self._storage.get_activities_since_days(7) if a["type"] == "mood"]
+        today = self._storage.get_today_totals()
+        mood_changes_today = today.count(ACTIVITY_MOOD)
         
-        if not today_moods:
+        if not mood_changes_today:
             return {"analysis": "No mood data today"}
         
         # Count mood types today
-        mood_counts = {}
-        for mood in today_moods:
-            mood_type = mood["data"].get("mood_type", "unknown")
-            mood_counts[mood_type] = mood_counts.get(mood_type, 0) + 1
+        mood_counts = today.breakdown(ACTIVITY_MOOD)
         
         dominant_mood = max(mood_counts, key=mood_counts.get) if mood_counts else "unknown"
         
-        return {
+        return self._bounded({
             "dominant_mood_today": dominant_mood.title(),
-            "mood_changes_today": len(today_moods),
+            "mood_changes_today": mood_changes_today,
             "mood_counts_today": mood_counts,
-            "mood_stability": "Stable" if len(today_moods) <= 3 else "Variable"
-        }
+            "mood_counts_week": self._storage.get_window("moods_7d").categories(),
+            "mood_stability": "Stable" if mood_changes_today <= 3 else "Variable"
+        })
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh at midnight or when a mood leaves the 7 day window."""
+        expiry = self._next_window_expiry("moods_7d")
+        midnight = self._next_midnight(now)
+        return min(expiry, midnight) if expiry else midnight
 
 
 class CryingAnalysisSensor(BabyMonitorSensorBase):
@@ -844,17 +953,25 @@ class CryingAnalysisSensor(BabyMonitorSensorBase):
     
     _sensor_name = "Crying Analysis"
     _sensor_id = "crying_analysis"
+    _unrecorded_attributes = frozenset(
+        {
+            "average_episode_duration",
+            "intensity_breakdown",
+            "episodes_by_hour",
+            "minutes_by_hour",
+        }
+    )
     
     @property
     def native_value(self) -> str:
         """Get crying status summary."""
-        today_crying = [a for a in self._storage.get_daily_activities() if a["type"] == "crying"]
+        today = self._storage.get_today_totals()
+        episodes = today.count(ACTIVITY_CRYING)
         
-        if not today_crying:
+        if not episodes:
             return "No crying recorded"
         
-        total_duration = sum(a["data"].get("duration", 0) for a in today_crying)
-        episodes = len(today_crying)
+        total_duration = today.total(ACTIVITY_CRYING, "duration")
         
         if episodes == 0:
             return "Peaceful day"
@@ -867,25 +984,32 @@ class CryingAnalysisSensor(BabyMonitorSensorBase):
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        today_crying = [a for a in self._storage.get_daily_activities() if a["type"] == "crying"]
-        
-        if not today_crying:
-            return {"status": "No crying episodes today"}
+        today = self._storage.get_today_totals()
+        episodes = today.count(ACTIVITY_CRYING)
+        histogram = self._storage.get_crying_histogram()
+        time_of_day = {
+            "episodes_by_hour": histogram.hourly_episodes(),
+            "minutes_by_hour": histogram.hourly_minutes(),
+            "peak_crying_hour": histogram.peak_hour(),
+        }
         
-        total_duration = sum(a["data"].get("duration", 0) for a in today_crying)
-        intensities = [a["data"].get("crying_intensity", "moderate") for a in today_crying]
-        intensity_counts = {}
+        if not episodes:
+            return {"status": "No crying episodes today", **time_of_day}
         
-        for intensity in intensities:
-            intensity_counts[intensity] = intensity_counts.get(intensity, 0) + 1
+        total_duration = today.total(ACTIVITY_CRYING, "duration")
         
-        return {
-            "episodes_today": len(today_crying),
+        return self._bounded({
+            "episodes_today": episodes,
             "total_duration_minutes": total_duration,
-            "average_episode_duration": round(total_duration / len(today_crying), 1) if today_crying else 0,
-            "intensity_breakdown": intensity_counts,
-            "last_episode": today_crying[-1]["timestamp"] if today_crying else None
-        }
+            "average_episode_duration": round(total_duration / episodes, 1),
+            "intensity_breakdown": today.breakdown(ACTIVITY_CRYING),
+            "last_episode": today.last_timestamp(ACTIVITY_CRYING),
+            **time_of_day,
+        })
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh at midnight when today's counts reset."""
+        return self._next_midnight(now)
 
 
 class TotalCryingEpisodesToday(BabyMonitorSensorBase):
@@ -893,36 +1017,44 @@ class TotalCryingEpisodesToday(BabyMonitorSensorBase):
     
     _sensor_name = "Total Crying Episodes"
     _sensor_id = "total_crying_episodes"
-    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_state_class = SensorStateClass.TOTAL
     _attr_icon = "mdi:emoticon-sad-outline"
+    _unrecorded_attributes = frozenset(
+        {"average_episode_duration", "intensity_breakdown"}
+    )
+    
+    @property
+    def last_reset(self) -> datetime:
+        """Return midnight, when the daily count started."""
+        day = self._storage.get_today_totals().day
+        return to_aware(datetime.combine(day, datetime.min.time()))
     
     @property
     def native_value(self) -> int:
         """Return the total number of crying episodes today."""
-        today_crying = [a for a in self._storage.get_daily_activities() if a["type"] == "crying"]
-        return len(today_crying)
+        return self._storage.get_today_totals().count(ACTIVITY_CRYING)
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
-        today_crying = [a for a in self._storage.get_daily_activities() if a["type"] == "crying"]
+        today = self._storage.get_today_totals()
+        episodes = today.count(ACTIVITY_CRYING)
         
-        if not today_crying:
+        if not episodes:
             return {"status": "No crying episodes today"}
         
-        total_duration = sum(a["data"].get("duration", 0) for a in today_crying)
-        intensities = [a["data"].get("crying_intensity", "moderate") for a in today_crying]
-        intensity_counts = {}
-        
-        for intensity in intensities:
-            intensity_counts[intensity] = intensity_counts.get(intensity, 0) + 1
+        total_duration = today.total(ACTIVITY_CRYING, "duration")
         
         return {
             "total_duration_minutes": total_duration,
-            "average_episode_duration": round(total_duration / len(today_crying), 1) if today_crying else 0,
-            "intensity_breakdown": intensity_counts,
-            "last_episode": today_crying[-1]["timestamp"] if today_crying else None
+            "average_episode_duration": round(total_duration / episodes, 1),
+            "intensity_breakdown": today.breakdown(ACTIVITY_CRYING),
+            "last_episode": today.last_timestamp(ACTIVITY_CRYING)
         }
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh at midnight when today's counts reset."""
+        return self._next_midnight(now)
 
 
 class EnvironmentalConditionsSensor(BabyMonitorSensorBase):
@@ -930,47 +1062,91 @@ class EnvironmentalConditionsSensor(BabyMonitorSensorBase):
     
     _sensor_name = "Room Conditions"
     _sensor_id = "room_conditions"
+    _unrecorded_attributes = frozenset({
+        "overall_comfort",
+        "period_start",
+        "room_temperature_last_update",
+        "humidity_last_update",
+        "room_temperature_min",
+        "room_temperature_max",
+        "humidity_min",
+        "humidity_max",
+    }) | frozenset(
+        f"{field}_{statistic}_{window}"
+        for field in ROOM_RANGES
+        for statistic in ("in_range", "mean", "longest_excursion")
+        for window in TIME_IN_RANGE_WINDOWS
+    )
+    
+    async def async_added_to_hass(self) -> None:
+        """Update as soon as a room reading arrives."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._storage.async_add_environment_listener(self.async_write_ha_state)
+        )
     
     @property
     def native_value(self) -> str:
         """Get latest environmental conditions."""
-        env_activities = self._storage.get_activities_by_type("environmental")
+        readings = self._storage.get_environment().readings
         
-        if not env_activities:
+        if not readings:
             return "Not monitored"
         
-        latest = env_activities[-1]["data"]
-        temp = latest.get("room_temperature", 0)
-        humidity = latest.get("humidity", 0)
-        
-        if temp > 0:
-            return f"{temp}°C, {humidity}%"
-        
-        return "No recent data"
+        # Each reading is the newest of its own sensor
+        parts = []
+        if "room_temperature" in readings:
+            parts.append(f"{readings['room_temperature']['value']}°C")
+        if "humidity" in readings:
+            parts.append(f"{readings['humidity']['value']}%")
+        return ", ".join(parts)
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        env_activities = self._storage.get_activities_by_type("environmental")
+        environment = self._storage.get_environment()
+        readings = environment.readings
         
-        if not env_activities:
+        if not readings:
             return {"status": "Environmental monitoring not active"}
         
-        latest = env_activities[-1]["data"]
-        temp = latest.get("room_temperature", 0)
-        humidity = latest.get("humidity", 0)
-        
         # Assess conditions
-        temp_status = "optimal" if 18 <= temp <= 22 else ("too_warm" if temp > 22 else "too_cool")
-        humidity_status = "optimal" if 30 <= humidity <= 60 else ("too_humid" if humidity > 60 else "too_dry")
-        
-        return {
-            "room_temperature": temp,
-            "humidity": humidity,
-            "temperature_status": temp_status,
-            "humidity_status": humidity_status,
-            "overall_comfort": "Good" if temp_status == "optimal" and humidity_status == "optimal" else "Needs attention",
-            "last_update": env_activities[-1]["timestamp"]
-        }
+        attributes: dict[str, Any] = {}
+        statuses = []
+        if "room_temperature" in readings:
+            temp = readings["room_temperature"]["value"]
+            temp_low, temp_high = ROOM_RANGES["room_temperature"]
+            temp_status = "optimal" if temp_low <= temp <= temp_high else ("too_warm" if temp > temp_high else "too_cool")
+            attributes["room_temperature"] = temp
+            attributes["temperature_status"] = temp_status
+            statuses.append(temp_status)
+        if "humidity" in readings:
+            humidity = readings["humidity"]["value"]
+            humidity_low, humidity_high = ROOM_RANGES["humidity"]
+            humidity_status = "optimal" if humidity_low <= humidity <= humidity_high else ("too_humid" if humidity > humidity_high else "too_dry")
+            attributes["humidity"] = humidity
+            attributes["humidity_status"] = humidity_status
+            statuses.append(humidity_status)
+        attributes["overall_comfort"] = "Good" if all(status == "optimal" for status in statuses) else "Needs attention"
+        for field, reading in readings.items():
+            attributes[f"{field}_last_update"] = reading["timestamp"]
+        attributes["last_update"] = max(reading["timestamp"] for reading in readings.values())
+        
+        # Range of the readings averaged into the newest period
+        latest = environment.latest()
+        attributes["period_start"] = latest["start"]
+        for field in ("room_temperature", "humidity"):
+            if field in latest:
+                attributes[f"{field}_min"] = latest[field]["min"]
+                attributes[f"{field}_max"] = latest[field]["max"]
+        # Share of time in the comfortable range, time-weighted mean and
+        # longest excursion (minutes) per window
+        for field, windows in self._storage.get_time_in_range().items():
+            for window, summary in windows.items():
+                if summary is None:
+                    continue
+                for statistic, value in summary.items():
+                    attributes[f"{field}_{statistic}_{window}"] = value
+        return attributes
 
 
 class CurrentCaregiverSensor(BabyMonitorSensorBase):
@@ -978,41 +1154,43 @@ class CurrentCaregiverSensor(BabyMonitorSensorBase):
     
     _sensor_name = "Current Caregiver"
     _sensor_id = "current_caregiver"
+    _unrecorded_attributes = frozenset({"duration_hours"})
     
     @property
     def native_value(self) -> str:
         """Get current caregiver on duty."""
-        caregiver_activities = self._storage.get_activities_by_type("caregiver")
+        latest = self._storage.get_latest_activity(ACTIVITY_CAREGIVER)
         
-        if not caregiver_activities:
+        if not latest:
             return "Unknown"
         
-        latest = caregiver_activities[-1]["data"]
-        return latest.get("caregiver_name", "Unknown")
+        return latest["data"].get("caregiver_name", "Unknown")
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        caregiver_activities = self._storage.get_activities_by_type("caregiver")
-        today_activities = self._storage.get_daily_activities()
+        latest = self._storage.get_latest_activity(ACTIVITY_CAREGIVER)
         
-        if not caregiver_activities:
+        if not latest:
             return {"status": "Caregiver tracking not active"}
         
-        # Count activities by caregiver today
-        caregiver_stats = {}
-        for activity in today_activities:
-            if activity["type"] in [ACTIVITY_DIAPER_CHANGE, ACTIVITY_FEEDING]:
-                caregiver = "Unknown"  # Would need to track this in activity data
-                caregiver_stats[caregiver] = caregiver_stats.get(caregiver, 0) + 1
-        
-        latest_change = datetime.fromisoformat(caregiver_activities[-1]["timestamp"])
-        duration = datetime.now() - latest_change
+        latest_change = datetime.fromisoformat(latest["timestamp"])
+        duration = local_now() - latest_change
         
         return {
-            "on_duty_since": caregiver_activities[-1]["timestamp"],
+            "on_duty_since": latest["timestamp"],
             "duration_hours": round(duration.total_seconds() / 3600, 1),
-            "shift_changes_today": len([a for a in today_activities if a["type"] == "caregiver"])
+            "shift_changes_today": self._storage.get_today_totals().count(ACTIVITY_CAREGIVER)
         }
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh when duration_hours ticks over or at midnight."""
+        latest = self._storage.get_latest_activity(ACTIVITY_CAREGIVER)
+        if not latest:
+            return None
+        return min(
+            self._next_step(latest["timestamp"], now, timedelta(minutes=6)),
+            self._next_midnight(now),
+        )
 
 
 class GrowthVelocitySensor(BabyMonitorSensorBase):
@@ -1020,40 +1198,32 @@ class GrowthVelocitySensor(BabyMonitorSensorBase):
     
     _sensor_name = "Growth Velocity"
     _sensor_id = "growth_velocity"
+    _attr_entity_registry_enabled_default = False
     _attr_unit_of_measurement = "g/day"
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _unrecorded_attributes = frozenset({"normal_range", "note", "window_days"})
+    
+    def _trend(self, activity_type: str) -> GrowthTrend:
+        """Get the configured trend for weight or height."""
+        window_days = self._options.get(CONF_GROWTH_WINDOW_DAYS, DEFAULT_GROWTH_WINDOW_DAYS)
+        return self._storage.get_growth_trend(activity_type, activity_type, window_days)
     
     @property
     def native_value(self) -> float | None:
-        """Calculate daily weight gain velocity."""
-        weight_activities = self._storage.get_activities_by_type("weight")
+        """Return the fitted daily weight gain over the window."""
+        slope = self._trend(ACTIVITY_WEIGHT).slope
         
-        if len(weight_activities) < 2:
+        if slope is None:
             return None
         
-        # Get last two measurements
-        latest = weight_activities[-1]
-        previous = weight_activities[-2]
-        
-        latest_weight = latest["data"].get("weight", 0) * 1000  # Convert to grams
-        previous_weight = previous["data"].get("weight", 0) * 1000
-        
-        latest_time = datetime.fromisoformat(latest["timestamp"])
-        previous_time = datetime.fromisoformat(previous["timestamp"])
-        
-        days_diff = (latest_time - previous_time).total_seconds() / (24 * 3600)
-        
-        if days_diff > 0:
-            velocity = (latest_weight - previous_weight) / days_diff
-            return round(velocity, 1)
-        
-        return None
+        # Weights are logged in kg
+        return round(slope * 1000, 1)
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        weight_activities = self._storage.get_activities_by_type("weight")
+        weight_trend = self._trend(ACTIVITY_WEIGHT)
         
-        if len(weight_activities) < 2:
+        if weight_trend.slope is None:
             return {"status": "Need more weight measurements"}
         
         velocity = self.native_value
@@ -1069,10 +1239,26 @@ class GrowthVelocitySensor(BabyMonitorSensorBase):
         else:
             growth_assessment = "Concerning"
         
+        height_trend = self._trend(ACTIVITY_HEIGHT)
+        weight_spread = weight_trend.residual_std
+        height_slope = height_trend.slope
+        
         return {
             "growth_assessment": growth_assessment,
-            "measurement_count": len(weight_activities),
-            "latest_weight_kg": weight_activities[-1]["data"].get("weight", 0),
+            "measurement_count": weight_trend.count,
+            "latest_weight_kg": weight_trend.latest[1],
+            "latest_weight_outlier": weight_trend.is_outlier(*weight_trend.latest),
+            "weight_residual_std_g": (
+                round(weight_spread * 1000, 1) if weight_spread is not None else None
+            ),
+            "height_velocity_cm_per_week": (
+                round(height_slope * 7, 2) if height_slope is not None else None
+            ),
+            "height_measurement_count": height_trend.count,
+            "latest_height_outlier": (
+                height_trend.is_outlier(*height_trend.latest) if height_trend.latest else None
+            ),
+            "window_days": weight_trend.window_days,
             "normal_range": "15-30 g/day",
             "note": "Consult pediatrician for growth concerns"
         }
@@ -1083,22 +1269,22 @@ class SleepRegressionIndicatorSensor(BabyMonitorSensorBase):
     
     _sensor_name = "Sleep Pattern Status"
     _sensor_id = "sleep_pattern_status"
+    _attr_entity_registry_enabled_default = False
+    _unrecorded_attributes = frozenset({"analysis_period"})
     
     @property
     def native_value(self) -> str:
         """Analyze recent sleep patterns for regression indicators."""
-        recent_activities = self._storage.get_activities_since_days(7)
-        older_activities = self._storage.get_activities_since_days(14)
-        
-        recent_sleep = [a for a in recent_activities if a["type"] == ACTIVITY_SLEEP and a["data"].get("sleep_type") == "end"]
-        older_sleep = [a for a in older_activities[-14:-7] if a["type"] == ACTIVITY_SLEEP and a["data"].get("sleep_type") == "end"]
+        comparison = self._storage.compare_windows("sleep_duration", timedelta(days=7))
+        recent_sleep = comparison["current"]
+        older_sleep = comparison["previous"]
         
-        if len(recent_sleep) < 3 or len(older_sleep) < 3:
+        if recent_sleep["count"] < 3 or older_sleep["count"] < 3:
             return "Insufficient data"
         
         # Compare average sleep duration
-        recent_avg = sum(s["data"].get("duration", 0) for s in recent_sleep) / len(recent_sleep)
-        older_avg = sum(s["data"].get("duration", 0) for s in older_sleep) / len(older_sleep)
+        recent_avg = recent_sleep["mean"]
+        older_avg = older_sleep["mean"]
         
         # Check for significant decrease in sleep duration
         decrease_percentage = ((older_avg - recent_avg) / older_avg) * 100 if older_avg > 0 else 0
@@ -1114,22 +1300,33 @@ class SleepRegressionIndicatorSensor(BabyMonitorSensorBase):
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        recent_activities = self._storage.get_activities_since_days(7)
-        recent_sleep = [a for a in recent_activities if a["type"] == ACTIVITY_SLEEP and a["data"].get("sleep_type") == "end"]
+        recent_sleep = self._storage.get_window("sleep_sessions_7d")
         
-        if not recent_sleep:
+        if not recent_sleep.count:
             return {"analysis": "No recent sleep data"}
         
-        recent_avg = sum(s["data"].get("duration", 0) for s in recent_sleep) / len(recent_sleep)
-        night_wakings = len([s for s in recent_sleep if s["data"].get("duration", 0) < 60])  # Short sleeps indicate wakings
+        night_wakings = recent_sleep.category_count("short")  # Short sleeps indicate wakings
         
         return {
-            "recent_average_duration": f"{int(recent_avg)}min",
-            "sleep_sessions_this_week": len(recent_sleep),
+            "recent_average_duration": f"{int(recent_sleep.mean)}min",
+            "sleep_sessions_this_week": recent_sleep.count,
             "short_sleeps_this_week": night_wakings,
             "pattern_stability": "Stable" if night_wakings <= 7 else "Unstable",
             "analysis_period": "7 days vs previous 7 days"
         }
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh when a sleep session crosses a 7 or 14 day boundary."""
+        index = self._storage.get_index("sleep_duration")
+        expiries = [
+            when
+            for when in (
+                index.next_expiry(now, timedelta(days=7)),
+                index.next_expiry(now, timedelta(days=14)),
+            )
+            if when is not None
+        ]
+        return min(expiries, default=None)
 
 
 class DiaperChangeFrequencySensor(BabyMonitorSensorBase):
@@ -1137,37 +1334,38 @@ class DiaperChangeFrequencySensor(BabyMonitorSensorBase):
     
     _sensor_name = "Diaper Change Frequency"
     _sensor_id = "diaper_change_frequency"
+    _attr_entity_registry_enabled_default = False
     _attr_unit_of_measurement = "changes/day"
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _unrecorded_attributes = frozenset({"normal_range"})
     
     @property
     def native_value(self) -> float:
         """Calculate average diaper changes per day."""
-        week_activities = self._storage.get_activities_since_days(7)
-        diaper_changes = [a for a in week_activities if a["type"] == ACTIVITY_DIAPER_CHANGE]
-        
-        return round(len(diaper_changes) / 7, 1)
+        return round(self._storage.get_window("diaper_changes_7d").count / 7, 1)
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        today_activities = self._storage.get_daily_activities()
-        week_activities = self._storage.get_activities_since_days(7)
-        
-        today_changes = [a for a in today_activities if a["type"] == ACTIVITY_DIAPER_CHANGE]
-        week_changes = [a for a in week_activities if a["type"] == ACTIVITY_DIAPER_CHANGE]
+        week_changes = self._storage.get_window("diaper_changes_7d")
         
         # Analyze types
-        wet_changes = len([a for a in week_changes if a["data"].get("diaper_type") in ["wet", "both"]])
-        dirty_changes = len([a for a in week_changes if a["data"].get("diaper_type") in ["dirty", "both"]])
+        wet_changes = week_changes.category_count("wet", "both")
+        dirty_changes = week_changes.category_count("dirty", "both")
         
         return {
-            "changes_today": len(today_changes),
-            "changes_this_week": len(week_changes),
+            "changes_today": self._storage.get_today_totals().count(ACTIVITY_DIAPER_CHANGE),
+            "changes_this_week": week_changes.count,
             "wet_changes_week": wet_changes,
             "dirty_changes_week": dirty_changes,
             "frequency_status": "Normal" if 4 <= self.native_value <= 12 else ("Low" if self.native_value < 4 else "High"),
             "normal_range": "4-12 changes per day"
         }
+    
+    def next_refresh(self, now: datetime) -> datetime | None:
+        """Refresh when a change leaves the 7 day window or at midnight."""
+        expiry = self._next_window_expiry("diaper_changes_7d")
+        midnight = self._next_midnight(now)
+        return min(expiry, midnight) if expiry else midnight
 
 
 class FeedingEfficiencySensor(BabyMonitorSensorBase):
@@ -1175,57 +1373,35 @@ class FeedingEfficiencySensor(BabyMonitorSensorBase):
     
     _sensor_name = "Feeding Efficiency"
     _sensor_id = "feeding_efficiency"
+    _attr_entity_registry_enabled_default = False
     _attr_unit_of_measurement = "ml/min"
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _unrecorded_attributes = frozenset({"analysis_note", "efficiency_trend"})
     
     @property
     def native_value(self) -> float | None:
         """Calculate average feeding efficiency."""
-        feeding_activities = self._storage.get_activities_by_type(ACTIVITY_FEEDING)
-        
         # Only consider bottle feedings with amount and duration
-        bottle_feedings = []
-        for feeding in feeding_activities:
-            if (feeding["data"].get("feeding_type") == "bottle" and 
-                feeding["data"].get("feeding_amount", 0) > 0 and 
-                feeding["data"].get("feeding_duration", 0) > 0):
-                
-                amount = feeding["data"]["feeding_amount"]
-                duration = feeding["data"]["feeding_duration"]
-                efficiency = amount / duration
-                bottle_feedings.append(efficiency)
+        efficiency = self._storage.get_feeding_totals().average_ratio("bottle")
         
-        if not bottle_feedings:
+        if efficiency is None:
             return None
         
-        return round(sum(bottle_feedings) / len(bottle_feedings), 1)
+        return round(efficiency, 1)
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        feeding_activities = self._storage.get_activities_by_type(ACTIVITY_FEEDING)
-        
-        bottle_feedings = []
-        breast_feedings = 0
-        
-        for feeding in feeding_activities:
-            if feeding["data"].get("feeding_type") == "bottle":
-                if (feeding["data"].get("feeding_amount", 0) > 0 and 
-                    feeding["data"].get("feeding_duration", 0) > 0):
-                    bottle_feedings.append(feeding)
-            elif "breast" in feeding["data"].get("feeding_type", ""):
-                breast_feedings += 1
+        totals = self._storage.get_feeding_totals()
+        bottle_feedings = totals.get("ratio_samples", "bottle")
         
         if not bottle_feedings:
             return {"status": "No bottle feeding data with duration"}
         
-        total_amount = sum(f["data"]["feeding_amount"] for f in bottle_feedings)
-        total_duration = sum(f["data"]["feeding_duration"] for f in bottle_feedings)
-        
         return {
-            "bottle_feedings_analyzed": len(bottle_feedings),
-            "breast_feedings": breast_feedings,
-            "total_bottle_amount_ml": total_amount,
-            "total_bottle_duration_min": total_duration,
+            "bottle_feedings_analyzed": bottle_feedings,
+            "breast_feedings": totals.count_matching("breast"),
+            "total_bottle_amount_ml": totals.get("ratio_amount", "bottle"),
+            "total_bottle_duration_min": totals.get("ratio_duration", "bottle"),
             "efficiency_trend": "Improving" if self.native_value and self.native_value > 5 else "Normal",
             "analysis_note": "Based on bottle feedings only"
         }
\ No newline at end of file
@@ -4,15 +4,19 @@ from __future__ import annotations
 import logging
 import voluptuous as vol
 from datetime import datetime
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
 from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers.entity_component import async_update_entity
-from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
+    DATA_BABIES,
     SERVICE_LOG_DIAPER_CHANGE,
     SERVICE_LOG_FEEDING,
     SERVICE_LOG_SLEEP,
@@ -27,6 +31,13 @@ from .const import (
     SERVICE_LOG_MOOD,
     SERVICE_LOG_ENVIRONMENTAL,
     SERVICE_LOG_CAREGIVER,
+    SERVICE_GET_CRYING_HISTOGRAM,
+    SERVICE_GET_GROWTH_HISTORY,
+    SERVICE_LOG_BATCH,
+    SERVICE_IMPORT_HISTORY,
+    SERVICE_EXPORT_HISTORY,
+    SERVICE_QUERY,
+    EXPORT_DIRECTORY,
     ATTR_BABY_NAME,
     ATTR_DIAPER_TYPE,
     ATTR_FEEDING_TYPE,
@@ -47,6 +58,22 @@ from .const import (
     ATTR_HUMIDITY,
     ATTR_CAREGIVER_NAME,
     ATTR_BATH_TYPE,
+    ATTR_ACTIVITIES,
+    ATTR_ACTIVITY_TYPE,
+    ATTR_FILE_PATH,
+    ATTR_COLUMN_MAP,
+    ATTR_TYPE_MAP,
+    ATTR_FORMAT,
+    ATTR_COMPRESS,
+    ATTR_ACTIVITY_TYPES,
+    ATTR_START,
+    ATTR_END,
+    ATTR_FILENAME,
+    ATTR_FIELD,
+    ATTR_GROUP_BY,
+    ATTR_AGGREGATES,
+    ATTR_LIMIT,
+    ATTR_REQUEST_ID,
     ACTIVITY_DIAPER_CHANGE,
     ACTIVITY_FEEDING,
     ACTIVITY_SLEEP,
@@ -72,18 +99,25 @@ from .const import (
     SLEEP_START,
     SLEEP_END,
 )
+from .aggregates import MAX_QUERY_BUCKETS, QUERY_AGGREGATES, QUERY_GROUP_BY
+from .growth import birth_profile, percentile_history
+from .history import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, HistoryReader, HistoryWriter
+from .storage import local_now
+from .util import baby_id, baby_key
 
 _LOGGER = logging.getLogger(__name__)
 
 # Service schemas
 SERVICE_LOG_DIAPER_CHANGE_SCHEMA = vol.Schema({
     vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
     vol.Required(ATTR_DIAPER_TYPE): vol.In([DIAPER_WET, DIAPER_DIRTY, DIAPER_BOTH]),
     vol.Optional(ATTR_NOTES, default=""): cv.string,
 })
 
 SERVICE_LOG_FEEDING_SCHEMA = vol.Schema({
     vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
     vol.Required(ATTR_FEEDING_TYPE): vol.In([
         FEEDING_BOTTLE, FEEDING_BREAST_LEFT, FEEDING_BREAST_RIGHT, 
         FEEDING_BREAST_BOTH, FEEDING_SOLID
@@ -95,30 +129,35 @@ SERVICE_LOG_FEEDING_SCHEMA = vol.Schema({
 
 SERVICE_LOG_SLEEP_SCHEMA = vol.Schema({
     vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
     vol.Required(ATTR_SLEEP_TYPE): vol.In([SLEEP_START, SLEEP_END]),
     vol.Optional(ATTR_NOTES, default=""): cv.string,
 })
 
 SERVICE_LOG_TEMPERATURE_SCHEMA = vol.Schema({
     vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
     vol.Required(ATTR_TEMPERATURE): vol.Coerce(float),
     vol.Optional(ATTR_NOTES, default=""): cv.string,
 })
 
 SERVICE_LOG_WEIGHT_SCHEMA = vol.Schema({
     vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
     vol.Required(ATTR_WEIGHT): vol.Coerce(float),
     vol.Optional(ATTR_NOTES, default=""): cv.string,
 })
 
 SERVICE_LOG_HEIGHT_SCHEMA = vol.Schema({
     vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
     vol.Required(ATTR_HEIGHT): vol.Coerce(float),
     vol.Optional(ATTR_NOTES, default=""): cv.string,
 })
 
 SERVICE_LOG_MEDICATION_SCHEMA = vol.Schema({
     vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
     vol.Required(ATTR_MEDICATION_NAME): cv.string,
     vol.Optional(ATTR_MEDICATION_DOSAGE, default=""): cv.string,
     vol.Optional(ATTR_NOTES, default=""): cv.string,
@@ -126,24 +165,28 @@ SERVICE_LOG_MEDICATION_SCHEMA = vol.Schema({
 
 SERVICE_LOG_MILESTONE_SCHEMA = vol.Schema({
     vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
     vol.Required(ATTR_MILESTONE_NAME): cv.string,
     vol.Optional(ATTR_NOTES, default=""): cv.string,
 })
 
 SERVICE_LOG_BATH_SCHEMA = vol.Schema({
     vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
     vol.Optional(ATTR_BATH_TYPE, default="full_bath"): vol.In(["full_bath", "sponge_bath", "hair_wash"]),
     vol.Optional(ATTR_NOTES, default=""): cv.string,
 })
 
 SERVICE_LOG_TUMMY_TIME_SCHEMA = vol.Schema({
     vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
     vol.Required(ATTR_DURATION): vol.Coerce(int),
     vol.Optional(ATTR_NOTES, default=""): cv.string,
 })
 
 SERVICE_LOG_CRYING_SCHEMA = vol.Schema({
     vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
     vol.Optional(ATTR_CRYING_INTENSITY, default="moderate"): vol.In(["light", "moderate", "intense"]),
     vol.Optional(ATTR_DURATION, default=0): vol.Coerce(int),
     vol.Optional(ATTR_NOTES, default=""): cv.string,
@@ -151,23 +194,150 @@ SERVICE_LOG_CRYING_SCHEMA = vol.Schema({
 
 SERVICE_LOG_MOOD_SCHEMA = vol.Schema({
     vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
     vol.Required(ATTR_MOOD_TYPE): vol.In(["happy", "fussy", "calm", "sleepy", "alert"]),
     vol.Optional(ATTR_NOTES, default=""): cv.string,
 })
 
 SERVICE_LOG_ENVIRONMENTAL_SCHEMA = vol.Schema({
     vol.Required(ATTR_BABY_NAME): cv.string,
-    vol.Optional(ATTR_ROOM_TEMPERATURE, default=0): vol.Coerce(float),
-    vol.Optional(ATTR_HUMIDITY, default=0): vol.Coerce(int),
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
+    vol.Optional(ATTR_ROOM_TEMPERATURE): vol.Coerce(float),
+    vol.Optional(ATTR_HUMIDITY): vol.Coerce(int),
     vol.Optional(ATTR_NOTES, default=""): cv.string,
 })
 
 SERVICE_LOG_CAREGIVER_SCHEMA = vol.Schema({
     vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
     vol.Required(ATTR_CAREGIVER_NAME): cv.string,
     vol.Optional(ATTR_NOTES, default=""): cv.string,
 })
 
+SERVICE_GET_CRYING_HISTOGRAM_SCHEMA = vol.Schema({
+    vol.Required(ATTR_BABY_NAME): cv.string,
+})
+
+SERVICE_GET_GROWTH_HISTORY_SCHEMA = vol.Schema({
+    vol.Required(ATTR_BABY_NAME): cv.string,
+})
+
+# Each batch item is validated by its log_* schema, without the call-level keys
+BATCH_ITEM_SCHEMAS = {
+    activity_type: vol.Schema({
+        key: value
+        for key, value in schema.schema.items()
+        if key not in (ATTR_BABY_NAME, ATTR_REQUEST_ID)
+    })
+    for activity_type, schema in (
+        (ACTIVITY_DIAPER_CHANGE, SERVICE_LOG_DIAPER_CHANGE_SCHEMA),
+        (ACTIVITY_FEEDING, SERVICE_LOG_FEEDING_SCHEMA),
+        (ACTIVITY_SLEEP, SERVICE_LOG_SLEEP_SCHEMA),
+        (ACTIVITY_TEMPERATURE, SERVICE_LOG_TEMPERATURE_SCHEMA),
+        (ACTIVITY_WEIGHT, SERVICE_LOG_WEIGHT_SCHEMA),
+        (ACTIVITY_HEIGHT, SERVICE_LOG_HEIGHT_SCHEMA),
+        (ACTIVITY_MEDICATION, SERVICE_LOG_MEDICATION_SCHEMA),
+        (ACTIVITY_MILESTONE, SERVICE_LOG_MILESTONE_SCHEMA),
+        (ACTIVITY_BATH, SERVICE_LOG_BATH_SCHEMA),
+        (ACTIVITY_TUMMY_TIME, SERVICE_LOG_TUMMY_TIME_SCHEMA),
+        (ACTIVITY_CRYING, SERVICE_LOG_CRYING_SCHEMA),
+        (ACTIVITY_MOOD, SERVICE_LOG_MOOD_SCHEMA),
+        (ACTIVITY_ENVIRONMENTAL, SERVICE_LOG_ENVIRONMENTAL_SCHEMA),
+        (ACTIVITY_CAREGIVER, SERVICE_LOG_CAREGIVER_SCHEMA),
+    )
+}
+
+
+def _batch_item(value: Any) -> tuple[str, dict[str, Any]]:
+    """Validate one batch item and return its activity type and data."""
+    item = dict(vol.Schema(dict)(value))
+    activity_type = vol.In(BATCH_ITEM_SCHEMAS)(item.pop(ATTR_ACTIVITY_TYPE, None))
+    return activity_type, BATCH_ITEM_SCHEMAS[activity_type](item)
+
+
+# Imported rows may carry columns from other trackers; those are dropped.
+# Sleep end rows keep their recorded duration instead of computing it.
+IMPORT_ITEM_SCHEMAS = {
+    activity_type: schema.extend({}, extra=vol.REMOVE_EXTRA)
+    for activity_type, schema in BATCH_ITEM_SCHEMAS.items()
+}
+IMPORT_ITEM_SCHEMAS[ACTIVITY_SLEEP] = IMPORT_ITEM_SCHEMAS[ACTIVITY_SLEEP].extend({
+    vol.Optional(ATTR_DURATION): vol.Coerce(int),
+})
+
+SERVICE_IMPORT_HISTORY_SCHEMA = vol.Schema({
+    vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Required(ATTR_FILE_PATH): cv.string,
+    vol.Optional(ATTR_COLUMN_MAP, default={}): {cv.string: cv.string},
+    vol.Optional(ATTR_TYPE_MAP, default={}): {cv.string: cv.string},
+})
+
+# CSV exports have one column per log service field, notes last
+EXPORT_FIELDS = [
+    field
+    for field in dict.fromkeys(
+        str(key) for schema in IMPORT_ITEM_SCHEMAS.values() for key in schema.schema
+    )
+    if field != ATTR_NOTES
+] + [ATTR_NOTES]
+
+
+def _export_filename(value: Any) -> str:
+    """Validate a plain file name, without directories."""
+    value = cv.string(value)
+    if Path(value).name != value or value in (".", ".."):
+        raise vol.Invalid("filename must not contain a directory")
+    return value
+
+
+SERVICE_EXPORT_HISTORY_SCHEMA = vol.Schema({
+    vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_FORMAT, default="csv"): vol.In(EXPORT_FORMATS),
+    vol.Optional(ATTR_COMPRESS, default=False): cv.boolean,
+    vol.Optional(ATTR_ACTIVITY_TYPES): vol.All(
+        cv.ensure_list, [vol.In(BATCH_ITEM_SCHEMAS)]
+    ),
+    vol.Optional(ATTR_START): cv.datetime,
+    vol.Optional(ATTR_END): cv.datetime,
+    vol.Optional(ATTR_FILENAME): _export_filename,
+})
+
+# Numeric fields that can be summed and averaged
+QUERY_FIELDS = (
+    ATTR_FEEDING_AMOUNT,
+    ATTR_FEEDING_DURATION,
+    ATTR_DURATION,
+    ATTR_TEMPERATURE,
+    ATTR_WEIGHT,
+    ATTR_HEIGHT,
+    ATTR_ROOM_TEMPERATURE,
+    ATTR_HUMIDITY,
+)
+
+SERVICE_QUERY_SCHEMA = vol.Schema({
+    vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Required(ATTR_ACTIVITY_TYPES): vol.All(
+        cv.ensure_list, vol.Length(min=1), [vol.In(BATCH_ITEM_SCHEMAS)]
+    ),
+    vol.Optional(ATTR_FIELD): vol.In(QUERY_FIELDS),
+    vol.Optional(ATTR_START): cv.datetime,
+    vol.Optional(ATTR_END): cv.datetime,
+    vol.Optional(ATTR_GROUP_BY, default="none"): vol.In(QUERY_GROUP_BY),
+    vol.Optional(ATTR_AGGREGATES, default=["count"]): vol.All(
+        cv.ensure_list, vol.Length(min=1), [vol.In(QUERY_AGGREGATES)]
+    ),
+    vol.Optional(ATTR_LIMIT, default=MAX_QUERY_BUCKETS): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=MAX_QUERY_BUCKETS)
+    ),
+})
+
+SERVICE_LOG_BATCH_SCHEMA = vol.Schema({
+    vol.Required(ATTR_BABY_NAME): cv.string,
+    vol.Optional(ATTR_REQUEST_ID): cv.string,
+    vol.Required(ATTR_ACTIVITIES): vol.All(
+        cv.ensure_list, vol.Length(min=1), [_batch_item]
+    ),
+})
 
 async def async_setup_services(hass: HomeAssistant) -> None:
     """Set up services for Baby Monitor integration."""
@@ -229,14 +399,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             
             # If ending sleep, calculate duration from last sleep start
             if sleep_type == SLEEP_END:
-                sleep_activities = storage.get_activities_by_type(ACTIVITY_SLEEP, limit=10)
-                for activity in sleep_activities:
-                    if activity["data"].get("sleep_type") == SLEEP_START:
-                        start_time = datetime.fromisoformat(activity["timestamp"])
-                        end_time = datetime.now()
-                        duration = int((end_time - start_time).total_seconds() / 60)
-                        data["duration"] = duration
-                        break
+                _add_sleep_duration(storage, data)
             
             await storage.async_add_activity(ACTIVITY_SLEEP, data)
             _LOGGER.info(f"Logged sleep for {baby_name}: {sleep_type}")
@@ -421,21 +584,20 @@ async def async_setup_services(hass: HomeAssistant) -> None:
     async def log_environmental(call: ServiceCall) -> None:
         """Handle environmental conditions logging service call."""
         baby_name = call.data[ATTR_BABY_NAME]
-        room_temp = call.data.get(ATTR_ROOM_TEMPERATURE, 0)
-        humidity = call.data.get(ATTR_HUMIDITY, 0)
-        notes = call.data.get(ATTR_NOTES, "")
+        # Only the readings the caller sent; a missing one is not a 0 reading
+        readings = {
+            field: call.data[field]
+            for field in (ATTR_ROOM_TEMPERATURE, ATTR_HUMIDITY)
+            if field in call.data
+        }
         
         storage = await _get_storage_for_baby(hass, baby_name)
         if storage:
             await storage.async_add_activity(
                 ACTIVITY_ENVIRONMENTAL,
-                {
-                    "room_temperature": room_temp,
-                    "humidity": humidity,
-                    "notes": notes
-                }
+                {**readings, "notes": call.data.get(ATTR_NOTES, "")}
             )
-            _LOGGER.info(f"Logged environmental conditions for {baby_name}: {room_temp}°C, {humidity}%")
+            _LOGGER.info(f"Logged environmental conditions for {baby_name}: {readings}")
             # Trigger sensor updates
             await _update_sensors(hass, baby_name)
     
@@ -458,48 +620,266 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             # Trigger sensor updates
             await _update_sensors(hass, baby_name)
     
+    async def log_batch(call: ServiceCall) -> None:
+        """Handle batch logging service call."""
+        baby_name = call.data[ATTR_BABY_NAME]
+        
+        storage = await _get_storage_for_baby(hass, baby_name)
+        if storage:
+            activities = []
+            # A sleep start in this batch is stored now and is the latest start
+            batch_sleep_start = None
+            for activity_type, data in call.data[ATTR_ACTIVITIES]:
+                data = dict(data)
+                if activity_type == ACTIVITY_SLEEP:
+                    if data[ATTR_SLEEP_TYPE] == SLEEP_START:
+                        batch_sleep_start = local_now()
+                    else:
+                        _add_sleep_duration(storage, data, batch_sleep_start)
+                activities.append((activity_type, data))
+            
+            # One save and one sensor refresh for the whole batch
+            await storage.async_add_activities(activities)
+            logged = ", ".join(activity_type for activity_type, _ in activities)
+            _LOGGER.info(f"Logged batch for {baby_name}: {logged}")
+            # Trigger sensor updates
+            await _update_sensors(hass, baby_name)
+    
+    async def import_history(call: ServiceCall) -> ServiceResponse:
+        """Handle history file import service call."""
+        baby_name = call.data[ATTR_BABY_NAME]
+        file_path = call.data[ATTR_FILE_PATH]
+        
+        storage = await _get_storage_for_baby(hass, baby_name)
+        if not storage:
+            raise ServiceValidationError(f"No baby named {baby_name} is configured")
+        if not hass.config.is_allowed_path(file_path):
+            raise ServiceValidationError(
+                f"{file_path} is not in a directory listed in allowlist_external_dirs"
+            )
+        
+        try:
+            reader = await hass.async_add_executor_job(
+                HistoryReader,
+                file_path,
+                IMPORT_ITEM_SCHEMAS,
+                call.data[ATTR_COLUMN_MAP],
+                call.data[ATTR_TYPE_MAP],
+            )
+        except (OSError, ValueError) as err:
+            raise ServiceValidationError(f"Cannot import {file_path}: {err}") from err
+        
+        # Parse and validate a chunk in the executor, append it here, repeat
+        try:
+            while chunk := await hass.async_add_executor_job(reader.read_chunk):
+                storage.import_activities(chunk)
+        except (OSError, ValueError) as err:
+            raise HomeAssistantError(
+                f"Import of {file_path} stopped after {reader.imported} rows: {err}"
+            ) from err
+        finally:
+            await hass.async_add_executor_job(reader.close)
+            if reader.imported:
+                await storage.async_finish_import()
+        
+        _LOGGER.info(
+            f"Imported {reader.imported} activities for {baby_name} from {file_path} "
+            f"({reader.skipped} skipped)"
+        )
+        await _update_sensors(hass, baby_name)
+        return {
+            "imported": reader.imported,
+            "skipped": reader.skipped,
+            "errors": reader.errors,
+        }
+    
+    async def export_history(call: ServiceCall) -> ServiceResponse:
+        """Handle history file export service call."""
+        baby_name = call.data[ATTR_BABY_NAME]
+        file_format = call.data[ATTR_FORMAT]
+        compress = call.data[ATTR_COMPRESS]
+        
+        storage = await _get_storage_for_baby(hass, baby_name)
+        if not storage:
+            raise ServiceValidationError(f"No baby named {baby_name} is configured")
+        
+        filename = call.data.get(ATTR_FILENAME) or (
+            f"{baby_id(baby_name)}_{dt_util.now().strftime('%Y%m%d_%H%M%S')}.{file_format}"
+            + (".gz" if compress else "")
+        )
+        path = Path(hass.config.path(EXPORT_DIRECTORY, filename))
+        
+        try:
+            writer = await hass.async_add_executor_job(
+                HistoryWriter, path, file_format, EXPORT_FIELDS, compress
+            )
+        except OSError as err:
+            raise HomeAssistantError(f"Cannot write {path}: {err}") from err
+        
+        # Hand one chunk of references at a time to the executor
+        try:
+            for chunk in storage.iter_activity_chunks(
+                EXPORT_CHUNK_SIZE,
+                set(call.data.get(ATTR_ACTIVITY_TYPES, ())),
+                _local_naive(call.data.get(ATTR_START)),
+                _local_naive(call.data.get(ATTR_END)),
+            ):
+                await hass.async_add_executor_job(writer.write, chunk)
+        except OSError as err:
+            raise HomeAssistantError(f"Export to {path} failed: {err}") from err
+        finally:
+            await hass.async_add_executor_job(writer.close)
+        
+        _LOGGER.info(f"Exported {writer.written} activities for {baby_name} to {path}")
+        return {"path": str(path), "exported": writer.written}
+    
+    async def query(call: ServiceCall) -> ServiceResponse:
+        """Handle activity query service call."""
+        baby_name = call.data[ATTR_BABY_NAME]
+        field = call.data.get(ATTR_FIELD)
+        aggregates = tuple(dict.fromkeys(call.data[ATTR_AGGREGATES]))
+        
+        storage = await _get_storage_for_baby(hass, baby_name)
+        if not storage:
+            raise ServiceValidationError(f"No baby named {baby_name} is configured")
+        if field is None and aggregates != ("count",):
+            raise ServiceValidationError(
+                f"Set a field to compute {', '.join(aggregates)}"
+            )
+        
+        start = _local_naive(call.data.get(ATTR_START))
+        end = _local_naive(call.data.get(ATTR_END))
+        return {
+            "start": start.isoformat() if start else None,
+            "end": end.isoformat() if end else None,
+            "field": field,
+            "group_by": call.data[ATTR_GROUP_BY],
+            "results": {
+                activity_type: storage.query(
+                    activity_type,
+                    field,
+                    start,
+                    end,
+                    call.data[ATTR_GROUP_BY],
+                    aggregates,
+                    call.data[ATTR_LIMIT],
+                )
+                for activity_type in dict.fromkeys(call.data[ATTR_ACTIVITY_TYPES])
+            },
+        }
+    
+    async def get_crying_histogram(call: ServiceCall) -> ServiceResponse:
+        """Handle crying time-of-day histogram service call."""
+        baby_name = call.data[ATTR_BABY_NAME]
+        
+        storage = await _get_storage_for_baby(hass, baby_name)
+        if not storage:
+            raise ServiceValidationError(f"No baby named {baby_name} is configured")
+        
+        return storage.get_crying_histogram().as_dict()
+    
+    async def get_growth_history(call: ServiceCall) -> ServiceResponse:
+        """Handle growth percentile history service call."""
+        baby_name = call.data[ATTR_BABY_NAME]
+        
+        entry_data = await _get_entry_data_for_baby(hass, baby_name)
+        if not entry_data:
+            raise ServiceValidationError(f"No baby named {baby_name} is configured")
+        
+        profile = birth_profile(entry_data["options"])
+        if profile is None:
+            raise ServiceValidationError(
+                f"Set the birth date and sex for {baby_name} in the integration options"
+            )
+        
+        storage = entry_data["storage"]
+        return await hass.async_add_executor_job(
+            percentile_history,
+            *profile,
+            storage.get_columns(ACTIVITY_WEIGHT, "weight"),
+            storage.get_columns(ACTIVITY_HEIGHT, "height"),
+        )
+    
     # Register services
     hass.services.async_register(
-        DOMAIN, SERVICE_LOG_DIAPER_CHANGE, log_diaper_change, SERVICE_LOG_DIAPER_CHANGE_SCHEMA
+        DOMAIN, SERVICE_LOG_DIAPER_CHANGE, _skip_duplicates(hass, SERVICE_LOG_DIAPER_CHANGE, log_diaper_change), SERVICE_LOG_DIAPER_CHANGE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_LOG_FEEDING, _skip_duplicates(hass, SERVICE_LOG_FEEDING, log_feeding), SERVICE_LOG_FEEDING_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_LOG_SLEEP, _skip_duplicates(hass, SERVICE_LOG_SLEEP, log_sleep), SERVICE_LOG_SLEEP_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_LOG_TEMPERATURE, _skip_duplicates(hass, SERVICE_LOG_TEMPERATURE, log_temperature), SERVICE_LOG_TEMPERATURE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_LOG_WEIGHT, _skip_duplicates(hass, SERVICE_LOG_WEIGHT, log_weight), SERVICE_LOG_WEIGHT_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_LOG_HEIGHT, _skip_duplicates(hass, SERVICE_LOG_HEIGHT, log_height), SERVICE_LOG_HEIGHT_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_LOG_MEDICATION, _skip_duplicates(hass, SERVICE_LOG_MEDICATION, log_medication), SERVICE_LOG_MEDICATION_SCHEMA
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LOG_FEEDING, log_feeding, SERVICE_LOG_FEEDING_SCHEMA
+        DOMAIN, SERVICE_LOG_MILESTONE, _skip_duplicates(hass, SERVICE_LOG_MILESTONE, log_milestone), SERVICE_LOG_MILESTONE_SCHEMA
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LOG_SLEEP, log_sleep, SERVICE_LOG_SLEEP_SCHEMA
+        DOMAIN, SERVICE_LOG_BATH, _skip_duplicates(hass, SERVICE_LOG_BATH, log_bath), SERVICE_LOG_BATH_SCHEMA
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LOG_TEMPERATURE, log_temperature, SERVICE_LOG_TEMPERATURE_SCHEMA
+        DOMAIN, SERVICE_LOG_TUMMY_TIME, _skip_duplicates(hass, SERVICE_LOG_TUMMY_TIME, log_tummy_time), SERVICE_LOG_TUMMY_TIME_SCHEMA
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LOG_WEIGHT, log_weight, SERVICE_LOG_WEIGHT_SCHEMA
+        DOMAIN, SERVICE_LOG_CRYING, _skip_duplicates(hass, SERVICE_LOG_CRYING, log_crying), SERVICE_LOG_CRYING_SCHEMA
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LOG_HEIGHT, log_height, SERVICE_LOG_HEIGHT_SCHEMA
+        DOMAIN, SERVICE_LOG_MOOD, _skip_duplicates(hass, SERVICE_LOG_MOOD, log_mood), SERVICE_LOG_MOOD_SCHEMA
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LOG_MEDICATION, log_medication, SERVICE_LOG_MEDICATION_SCHEMA
+        DOMAIN, SERVICE_LOG_ENVIRONMENTAL, _skip_duplicates(hass, SERVICE_LOG_ENVIRONMENTAL, log_environmental), SERVICE_LOG_ENVIRONMENTAL_SCHEMA
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LOG_MILESTONE, log_milestone, SERVICE_LOG_MILESTONE_SCHEMA
+        DOMAIN, SERVICE_LOG_CAREGIVER, _skip_duplicates(hass, SERVICE_LOG_CAREGIVER, log_caregiver), SERVICE_LOG_CAREGIVER_SCHEMA
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LOG_BATH, log_bath, SERVICE_LOG_BATH_SCHEMA
+        DOMAIN, SERVICE_LOG_BATCH, _skip_duplicates(hass, SERVICE_LOG_BATCH, log_batch), SERVICE_LOG_BATCH_SCHEMA
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LOG_TUMMY_TIME, log_tummy_time, SERVICE_LOG_TUMMY_TIME_SCHEMA
+        DOMAIN,
+        SERVICE_IMPORT_HISTORY,
+        import_history,
+        SERVICE_IMPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LOG_CRYING, log_crying, SERVICE_LOG_CRYING_SCHEMA
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        export_history,
+        SERVICE_EXPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LOG_MOOD, log_mood, SERVICE_LOG_MOOD_SCHEMA
+        DOMAIN,
+        SERVICE_QUERY,
+        query,
+        SERVICE_QUERY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LOG_ENVIRONMENTAL, log_environmental, SERVICE_LOG_ENVIRONMENTAL_SCHEMA
+        DOMAIN,
+        SERVICE_GET_CRYING_HISTOGRAM,
+        get_crying_histogram,
+        SERVICE_GET_CRYING_HISTOGRAM_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LOG_CAREGIVER, log_caregiver, SERVICE_LOG_CAREGIVER_SCHEMA
+        DOMAIN,
+        SERVICE_GET_GROWTH_HISTORY,
+        get_growth_history,
+        SERVICE_GET_GROWTH_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
     )
 
 
@@ -519,29 +899,87 @@ async def async_remove_services(hass: HomeAssistant) -> None:
     hass.services.async_remove(DOMAIN, SERVICE_LOG_MOOD)
     hass.services.async_remove(DOMAIN, SERVICE_LOG_ENVIRONMENTAL)
     hass.services.async_remove(DOMAIN, SERVICE_LOG_CAREGIVER)
+    hass.services.async_remove(DOMAIN, SERVICE_LOG_BATCH)
+    hass.services.async_remove(DOMAIN, SERVICE_IMPORT_HISTORY)
+    hass.services.async_remove(DOMAIN, SERVICE_EXPORT_HISTORY)
+    hass.services.async_remove(DOMAIN, SERVICE_QUERY)
+    hass.services.async_remove(DOMAIN, SERVICE_GET_CRYING_HISTOGRAM)
+    hass.services.async_remove(DOMAIN, SERVICE_GET_GROWTH_HISTORY)
+
+
+def _local_naive(value: datetime | None) -> datetime | None:
+    """Convert a service datetime to naive local time like activity timestamps."""
+    if value is None or value.tzinfo is None:
+        return value
+    return dt_util.as_local(value).replace(tzinfo=None)
+
+
+def _add_sleep_duration(
+    storage, data: dict[str, Any], start_time: datetime | None = None
+) -> None:
+    """Add the duration since the last sleep start to sleep end data.
+    
+    A start_time, e.g. of a start earlier in the same batch, is used instead
+    of the last stored start.
+    """
+    if start_time is None:
+        sleep_activities = storage.get_activities_by_type(ACTIVITY_SLEEP, limit=10)
+        for activity in sleep_activities:
+            if activity["data"].get("sleep_type") == SLEEP_START:
+                start_time = datetime.fromisoformat(activity["timestamp"])
+                break
+        else:
+            return
+    end_time = local_now()
+    data["duration"] = int((end_time - start_time).total_seconds() / 60)
+
+
+async def _get_entry_data_for_baby(hass: HomeAssistant, baby_name: str):
+    """Get the config entry data for the specified baby."""
+    return hass.data.get(DOMAIN, {}).get(DATA_BABIES, {}).get(baby_key(baby_name))
 
 
 async def _get_storage_for_baby(hass: HomeAssistant, baby_name: str):
     """Get storage instance for the specified baby."""
-    for entry_id, data in hass.data.get(DOMAIN, {}).items():
-        if "storage" in data:
-            storage = data["storage"]
-            if storage.baby_name == baby_name:
-                return storage
-    return None
+    data = await _get_entry_data_for_baby(hass, baby_name)
+    return data["storage"] if data else None
 
 
-async def _update_sensors(hass: HomeAssistant, baby_name: str) -> None:
-    """Trigger sensor updates for the specified baby."""
-    # Get entity registry
-    ent_reg = async_get_entity_registry(hass)
+def _skip_duplicates(
+    hass: HomeAssistant,
+    service: str,
+    handler: Callable[[ServiceCall], Awaitable[None]],
+) -> Callable[[ServiceCall], Awaitable[None]]:
+    """Wrap a log service handler so repeated requests never reach storage."""
     
-    # Find all sensors for this baby
-    baby_id = baby_name.lower().replace(" ", "_")
+    async def wrapper(call: ServiceCall) -> None:
+        baby_name = call.data[ATTR_BABY_NAME]
+        entry_data = await _get_entry_data_for_baby(hass, baby_name)
+        if not entry_data:
+            await handler(call)
+            return
+        
+        deduplicator = entry_data["deduplicator"]
+        request = (
+            call.data.get(ATTR_REQUEST_ID),
+            service,
+            {key: value for key, value in call.data.items() if key != ATTR_REQUEST_ID},
+        )
+        if deduplicator.is_duplicate(*request):
+            _LOGGER.info(f"Ignored duplicate {service} request for {baby_name}")
+            return
+        try:
+            await handler(call)
+        except BaseException:
+            # The request may not have been stored, so let a retry through
+            deduplicator.forget(*request)
+            raise
     
-    # Update all entities for this baby
-    for entity in ent_reg.entities.values():
-        if entity.unique_id and entity.unique_id.startswith(f"{baby_id}_"):
-            if entity.domain == "sensor":
-                # Trigger entity update
-                await async_update_entity(hass, entity.entity_id)
\ No newline at end of file
+    return wrapper
+
+
+async def _update_sensors(hass: HomeAssistant, baby_name: str) -> None:
+    """Queue a sensor refresh for the specified baby without waiting for it."""
+    entry_data = await _get_entry_data_for_baby(hass, baby_name)
+    if entry_data:
+        entry_data["refresher"].async_schedule()
\ No newline at end of file
@@ -1,21 +1,69 @@
 """Data storage helper for Baby Monitor integration."""
 from __future__ import annotations
 
+import heapq
 import json
 import logging
+import uuid
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterator
 from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .aggregates import (
+    INDEX_SPECS,
+    MAX_QUERY_BUCKETS,
+    ROOM_RANGES,
+    WINDOW_SPECS,
+    CryingHistogram,
+    EnvironmentSeries,
+    FeedingModel,
+    FeedingTotals,
+    GrowthTrend,
+    SlidingWindow,
+    TimeInRange,
+    TimestampIndex,
+    TodayTotals,
+    group_reduce,
+    to_seconds,
+)
+from .analytics import PRECISION
+from .const import (
+    ACTIVITY_CRYING,
+    ACTIVITY_DIAPER_CHANGE,
+    ACTIVITY_ENVIRONMENTAL,
+    ACTIVITY_FEEDING,
+    ACTIVITY_SLEEP,
+    DOMAIN,
+)
+from .util import baby_id
 
 _LOGGER = logging.getLogger(__name__)
 
 STORAGE_VERSION = 1
 
+# Seconds to wait before writing room readings, which can arrive every minute
+ENVIRONMENT_SAVE_DELAY = 300
+# Seconds to batch statistics progress with other writes; a lost update only
+# means the same hours are imported again
+STATISTICS_SAVE_DELAY = 300
+
+
+def local_now() -> datetime:
+    """Return the current naive wall-clock time in Home Assistant's time zone."""
+    return dt_util.now().replace(tzinfo=None)
+
+
+def to_aware(value: datetime) -> datetime:
+    """Attach Home Assistant's time zone to a naive activity timestamp."""
+    return value.replace(tzinfo=dt_util.now().tzinfo)
+
 
 class BabyMonitorStorage:
     """Storage helper for baby monitor data."""
@@ -27,9 +75,26 @@ class BabyMonitorStorage:
         self._store = Store(
             hass, 
             STORAGE_VERSION, 
-            f"{DOMAIN}_{baby_name.lower().replace(' ', '_')}_data"
+            f"{DOMAIN}_{baby_id(baby_name)}_data"
         )
         self._data: dict[str, Any] = {}
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._environment_listeners: list[CALLBACK_TYPE] = []
+        self._today = TodayTotals(local_now().date())
+        self._windows: dict[str, SlidingWindow] = {}
+        self._indexes: dict[str, TimestampIndex] = {}
+        # Built on first use, so features only disabled sensors need cost nothing
+        self._feeding_model: FeedingModel | None = None
+        self._crying_histogram: CryingHistogram | None = None
+        self._columns: dict[tuple[str, str], tuple[list[float], list[float]]] = {}
+        self._trends: dict[tuple[str, str, float], GrowthTrend] = {}
+        self._feeding_totals = FeedingTotals()
+        # Running sum and count of sleep durations for the average
+        self._sleep_duration_total = 0.0
+        self._sleep_duration_count = 0
+        self._environment = EnvironmentSeries([])
+        self._time_in_range: dict[str, TimeInRange] = {}
+        self._latest: dict[str, dict[str, Any]] = {}
     
     async def async_load(self) -> None:
         """Load data from storage."""
@@ -50,22 +115,515 @@ class BabyMonitorStorage:
             }
         else:
             self._data = data
+        
+        # Records from before activity ids existed get one on load
+        for activity in self._data["activities"]:
+            activity.setdefault("id", uuid.uuid4().hex)
+        
+        # Room readings are kept as a downsampled series, not as activities
+        self._environment = EnvironmentSeries(
+            self._data.setdefault("environment", []),
+            self._data.setdefault("environment_readings", {}),
+            self._data.get("environment_keep_before"),
+        )
+        moved = self._move_environment_readings()
+        
+        self._rebuild_derived()
+        if moved:
+            await self.async_save()
+    
+    def _move_environment_readings(self) -> bool:
+        """Fold environmental activities into the series and drop them.
+        
+        The moved readings are history the user logged, so they are exempt
+        from the series retention.
+        """
+        activities = self._data["activities"]
+        newest = max(
+            (
+                activity["timestamp"]
+                for activity in activities
+                if activity["type"] == ACTIVITY_ENVIRONMENTAL
+            ),
+            default=None,
+        )
+        if newest is None:
+            return False
+        
+        keep_before = max(newest, self._data.get("environment_keep_before") or "")
+        self._data["environment_keep_before"] = keep_before
+        self._environment.keep_before = keep_before
+        kept = []
+        for activity in activities:
+            if activity["type"] == ACTIVITY_ENVIRONMENTAL:
+                self._environment.add(
+                    datetime.fromisoformat(activity["timestamp"]), activity["data"]
+                )
+            else:
+                kept.append(activity)
+        self._data["activities"] = kept
+        return True
+    
+    def _rebuild_derived(self) -> None:
+        """Rebuild every structure derived from the activity list."""
+        # Activities are in time order, so the last of each type wins
+        self._latest = {activity["type"]: activity for activity in self._data["activities"]}
+        self._rebuild_today()
+        self._rebuild_windows()
+        self._rebuild_indexes()
+        self._feeding_model = None
+        self._crying_histogram = None
+        self._columns = {}
+        self._trends = {}
+        self._feeding_totals = FeedingTotals()
+        self._sleep_duration_total = 0.0
+        self._sleep_duration_count = 0
+        for activity in self._data["activities"]:
+            if activity["type"] == ACTIVITY_FEEDING:
+                self._feeding_totals.add(activity["data"])
+            elif activity["type"] == ACTIVITY_SLEEP:
+                self._add_sleep_duration(activity["data"])
+        self._rebuild_time_in_range()
+    
+    def _rebuild_time_in_range(self) -> None:
+        """Replay the last week of room buckets, one reading per bucket mean."""
+        self._time_in_range = {
+            field: TimeInRange(low, high) for field, (low, high) in ROOM_RANGES.items()
+        }
+        buckets = self._environment.buckets
+        cutoff = (local_now() - timedelta(seconds=TimeInRange.SPANS["7d"])).isoformat()
+        start = bisect_left(buckets, cutoff, key=lambda bucket: bucket["start"])
+        for bucket in buckets[start:]:
+            when = datetime.fromisoformat(bucket["start"])
+            for field, stats in self._time_in_range.items():
+                if field in bucket:
+                    count, total, _, _ = bucket[field]
+                    stats.add(when, total / count)
+    
+    def _add_environment(self, when: datetime, data: dict[str, Any]) -> None:
+        """Add a room reading to the series and the time-in-range stats."""
+        self._environment.add(when, data)
+        for field, stats in self._time_in_range.items():
+            value = data.get(field)
+            if value is not None:
+                stats.add(when, float(value))
     
     async def async_save(self) -> None:
         """Save data to storage."""
         await self._store.async_save(self._data)
     
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for activity changes and return a callback to stop listening."""
+        self._listeners.append(update_callback)
+        
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+        
+        return remove_listener
+    
+    @callback
+    def _async_notify_listeners(self) -> None:
+        """Notify listeners that activities changed."""
+        for update_callback in list(self._listeners):
+            update_callback()
+    
     async def async_add_activity(self, activity_type: str, data: dict[str, Any]) -> None:
         """Add a new activity."""
+        if activity_type == ACTIVITY_ENVIRONMENTAL:
+            self.async_add_environment_reading(data)
+            return
+        await self._add_activity(activity_type, data)
+        self._async_notify_listeners()
+        await self.async_save()
+    
+    @callback
+    def async_add_environment_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for room readings and return a callback to stop listening."""
+        self._environment_listeners.append(update_callback)
+        
+        @callback
+        def remove_listener() -> None:
+            self._environment_listeners.remove(update_callback)
+        
+        return remove_listener
+    
+    @callback
+    def async_add_environment_reading(self, data: dict[str, Any]) -> None:
+        """Add a room reading to the environment series.
+        
+        No derived structure uses room readings, so activity listeners are
+        not told and the write is delayed to batch frequent readings.
+        """
+        self._add_environment(local_now(), data)
+        for update_callback in list(self._environment_listeners):
+            update_callback()
+        self._store.async_delay_save(lambda: self._data, ENVIRONMENT_SAVE_DELAY)
+    
+    async def async_add_activities(
+        self, activities: list[tuple[str, dict[str, Any]]]
+    ) -> None:
+        """Add several activities with a single save and listener notification."""
+        for activity_type, data in activities:
+            await self._add_activity(activity_type, data)
+        self._async_notify_listeners()
+        await self.async_save()
+    
+    def import_activities(self, activities: list[tuple[str, str, dict[str, Any]]]) -> None:
+        """Append a chunk of (type, timestamp, data) records from an import.
+        
+        Derived structures are not touched; call async_finish_import once
+        after the last chunk.
+        """
+        self._data["activities"].extend(
+            {
+                "id": uuid.uuid4().hex,
+                "type": activity_type,
+                "timestamp": timestamp,
+                "data": data,
+            }
+            for activity_type, timestamp, data in activities
+        )
+    
+    async def async_finish_import(self) -> None:
+        """Order imported records and rebuild stats and derived structures once."""
+        self._data["activities"].sort(key=lambda activity: activity["timestamp"])
+        self._move_environment_readings()
+        self._data.pop("statistics", None)
+        self._rebuild_derived()
+        self._rebuild_stats()
+        self._async_notify_listeners()
+        await self.async_save()
+    
+    def _rebuild_stats(self) -> None:
+        """Recompute the stored statistics from the activity list."""
+        stats = self._data["stats"]
+        stats.update(
+            total_diaper_changes=0,
+            total_feedings=0,
+            total_sleep_sessions=0,
+            last_diaper_change=None,
+            last_feeding=None,
+            last_sleep=None,
+        )
+        for activity in self._data["activities"]:
+            if activity["type"] == ACTIVITY_DIAPER_CHANGE:
+                stats["total_diaper_changes"] += 1
+                stats["last_diaper_change"] = activity["timestamp"]
+            elif activity["type"] == ACTIVITY_FEEDING:
+                stats["total_feedings"] += 1
+                stats["last_feeding"] = activity["timestamp"]
+            elif activity["type"] == ACTIVITY_SLEEP and activity["data"].get("sleep_type") == "end":
+                stats["total_sleep_sessions"] += 1
+                stats["last_sleep"] = activity["timestamp"]
+        
+        stats["average_feeding_amount"] = self._feeding_totals.average_amount() or 0
+        stats["average_sleep_duration"] = self._average_sleep_duration()
+    
+    def _add_sleep_duration(self, data: dict[str, Any]) -> None:
+        """Count a sleep record's duration towards the average."""
+        duration = data.get("duration")
+        if duration is not None:
+            self._sleep_duration_total += duration
+            self._sleep_duration_count += 1
+    
+    def _average_sleep_duration(self) -> float:
+        """Return the mean duration over sleep records that have one, or 0."""
+        if not self._sleep_duration_count:
+            return 0
+        return round(self._sleep_duration_total / self._sleep_duration_count, PRECISION)
+    
+    async def _add_activity(self, activity_type: str, data: dict[str, Any]) -> None:
+        """Add an activity to memory and every derived structure."""
+        if activity_type == ACTIVITY_ENVIRONMENTAL:
+            self._add_environment(local_now(), data)
+            return
+        
         activity = {
+            "id": uuid.uuid4().hex,
             "type": activity_type,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": local_now().isoformat(),
             "data": data
         }
         
         self._data["activities"].append(activity)
+        self._latest[activity_type] = activity
+        self.get_today_totals().add(activity)
+        self._add_to_windows(activity)
+        self._add_to_indexes(activity)
+        if activity_type == ACTIVITY_FEEDING:
+            if self._feeding_model is not None:
+                self._feeding_model.add(datetime.fromisoformat(activity["timestamp"]))
+            self._feeding_totals.add(data)
+        elif activity_type == ACTIVITY_SLEEP:
+            self._add_sleep_duration(data)
+        elif activity_type == ACTIVITY_CRYING and self._crying_histogram is not None:
+            self._crying_histogram.add(activity)
+        self._add_to_columns(activity)
+        self._add_to_trends(activity)
         await self._update_stats(activity_type, data)
-        await self.async_save()
+    
+    def _rebuild_today(self) -> None:
+        """Rebuild today's totals, e.g. after a restart in the middle of the day."""
+        today = local_now().date()
+        today_start = datetime.combine(today, datetime.min.time()).isoformat()
+        totals = TodayTotals(today)
+        
+        # Activities are appended in time order, so today's are at the end
+        for activity in reversed(self._data["activities"]):
+            if activity["timestamp"] < today_start:
+                break
+            totals.add(activity)
+        
+        self._today = totals
+    
+    def get_today_totals(self) -> TodayTotals:
+        """Get running totals for today's activities."""
+        if self._today.day != local_now().date():
+            self._rebuild_today()
+        return self._today
+    
+    def _rebuild_windows(self, names: list[str] | None = None) -> None:
+        """Rebuild sliding windows from the tail of the activity list.
+        
+        Only windows already in use are rebuilt unless names are given.
+        """
+        names = list(self._windows) if names is None else names
+        if not names:
+            return
+        
+        windows = {
+            name: SlidingWindow(timedelta(days=WINDOW_SPECS[name].days)) for name in names
+        }
+        longest = max(WINDOW_SPECS[name].days for name in names)
+        cutoff = (local_now() - timedelta(days=longest)).isoformat()
+        
+        recent = []
+        for activity in reversed(self._data["activities"]):
+            if activity["timestamp"] < cutoff:
+                break
+            recent.append(activity)
+        
+        for activity in reversed(recent):
+            self._add_to_windows(activity, windows)
+        
+        self._windows.update(windows)
+    
+    def _add_to_windows(
+        self,
+        activity: dict[str, Any],
+        windows: dict[str, SlidingWindow] | None = None,
+    ) -> None:
+        """Add an activity to every window metric that tracks it."""
+        data = activity["data"]
+        when = None
+        for name, window in (self._windows if windows is None else windows).items():
+            spec = WINDOW_SPECS[name]
+            if spec.activity_type != activity["type"]:
+                continue
+            if spec.include is not None and not spec.include(data):
+                continue
+            if when is None:
+                when = datetime.fromisoformat(activity["timestamp"])
+            window.add(
+                when,
+                (data.get(spec.value_field) or 0) if spec.value_field else 0,
+                spec.category(data) if spec.category else None,
+            )
+    
+    def get_window(self, name: str) -> SlidingWindow:
+        """Get a sliding-window metric advanced to the current time."""
+        if name not in self._windows:
+            self._rebuild_windows([name])
+        window = self._windows[name]
+        window.advance(local_now())
+        return window
+    
+    def _rebuild_indexes(self, metrics: list[str] | None = None) -> None:
+        """Build timestamp indexes over the full history.
+        
+        Only indexes already in use are rebuilt unless metrics are given.
+        """
+        metrics = list(self._indexes) if metrics is None else metrics
+        if not metrics:
+            return
+        
+        indexes = {metric: TimestampIndex() for metric in metrics}
+        for activity in self._data["activities"]:
+            self._add_to_indexes(activity, indexes)
+        
+        self._indexes.update(indexes)
+    
+    def _add_to_indexes(
+        self,
+        activity: dict[str, Any],
+        indexes: dict[str, TimestampIndex] | None = None,
+    ) -> None:
+        """Add an activity to every timestamp index that tracks it."""
+        data = activity["data"]
+        when = None
+        for name, index in (self._indexes if indexes is None else indexes).items():
+            spec = INDEX_SPECS[name]
+            if spec.activity_type != activity["type"]:
+                continue
+            if spec.include is not None and not spec.include(data):
+                continue
+            if when is None:
+                when = datetime.fromisoformat(activity["timestamp"])
+            index.add(when, (data.get(spec.value_field) or 0) if spec.value_field else 0)
+    
+    def get_index(self, metric: str) -> TimestampIndex:
+        """Get the timestamp index for a metric."""
+        if metric not in self._indexes:
+            self._rebuild_indexes([metric])
+        return self._indexes[metric]
+    
+    def get_feeding_model(self) -> FeedingModel:
+        """Get the incrementally updated feeding interval model."""
+        if self._feeding_model is None:
+            self._feeding_model = FeedingModel()
+            for activity in self._data["activities"]:
+                if activity["type"] == ACTIVITY_FEEDING:
+                    self._feeding_model.add(datetime.fromisoformat(activity["timestamp"]))
+        return self._feeding_model
+    
+    def get_crying_histogram(self) -> CryingHistogram:
+        """Get crying episodes and minutes per hour of day and weekday."""
+        if self._crying_histogram is None:
+            self._crying_histogram = CryingHistogram()
+            for activity in self._data["activities"]:
+                if activity["type"] == ACTIVITY_CRYING:
+                    self._crying_histogram.add(activity)
+        return self._crying_histogram
+    
+    def _add_to_columns(
+        self,
+        activity: dict[str, Any],
+        columns: dict[tuple[str, str], tuple[list[float], list[float]]] | None = None,
+    ) -> None:
+        """Append an activity to every exported column that tracks it."""
+        columns = self._columns if columns is None else columns
+        for (activity_type, field), (timestamps, values) in columns.items():
+            if activity["type"] != activity_type:
+                continue
+            value = 1 if field is None else activity["data"].get(field)
+            if value is not None:
+                timestamps.append(to_seconds(datetime.fromisoformat(activity["timestamp"])))
+                values.append(value)
+    
+    def _column(
+        self, activity_type: str, field: str | None
+    ) -> tuple[list[float], list[float]]:
+        """Return the cached columns for a field, building them on first use."""
+        key = (activity_type, field)
+        if key not in self._columns:
+            column = {key: ([], [])}
+            for activity in self._data["activities"]:
+                self._add_to_columns(activity, column)
+            self._columns.update(column)
+        return self._columns[key]
+    
+    def get_columns(
+        self,
+        activity_type: str,
+        field: str | None,
+        since: datetime | None = None,
+    ) -> tuple[list[float], list[float]]:
+        """Export one numeric field as time-ordered timestamp and value columns.
+        
+        Timestamps are in seconds (see aggregates.to_seconds); records without
+        the field are left out. A field of None gives every record with value
+        1. The columns are cached and extended on insert.
+        """
+        timestamps, values = self._column(activity_type, field)
+        if since is None:
+            return list(timestamps), list(values)
+        start = bisect_left(timestamps, to_seconds(since))
+        return timestamps[start:], values[start:]
+    
+    def query(
+        self,
+        activity_type: str,
+        field: str | None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        group_by: str = "none",
+        aggregates: tuple[str, ...] = ("count",),
+        limit: int = MAX_QUERY_BUCKETS,
+    ) -> dict[str, Any]:
+        """Aggregate a field (or record counts) over a time range.
+        
+        Reads the cached columns in place; see aggregates.group_reduce. Room
+        readings are answered from the 5-minute means of the environment
+        series, so counts are numbers of 5-minute periods.
+        """
+        if activity_type == ACTIVITY_ENVIRONMENTAL:
+            timestamps, values = self._environment.columns(field)
+        else:
+            timestamps, values = self._column(activity_type, field)
+        return group_reduce(timestamps, values, start, end, group_by, aggregates, limit)
+    
+    def _add_to_trends(self, activity: dict[str, Any]) -> None:
+        """Add a new measurement to every trend that follows it."""
+        when = None
+        for (activity_type, field, _), trend in self._trends.items():
+            value = activity["data"].get(field)
+            if activity["type"] != activity_type or value is None:
+                continue
+            if when is None:
+                when = to_seconds(datetime.fromisoformat(activity["timestamp"]))
+            trend.add(when, value)
+    
+    def get_growth_trend(
+        self, activity_type: str, field: str, window_days: float
+    ) -> GrowthTrend:
+        """Get the least-squares trend of a measurement over a window."""
+        key = (activity_type, field, window_days)
+        if key not in self._trends:
+            trend = GrowthTrend(window_days)
+            for when, value in zip(*self.get_columns(activity_type, field)):
+                trend.add(when, value)
+            self._trends[key] = trend
+        return self._trends[key]
+    
+    def get_environment(self) -> EnvironmentSeries:
+        """Get the downsampled room temperature and humidity series."""
+        return self._environment
+    
+    def get_time_in_range(self) -> dict[str, dict[str, dict[str, float] | None]]:
+        """Get time-weighted room statistics per reading and window."""
+        now = local_now()
+        return {field: stats.summary(now) for field, stats in self._time_in_range.items()}
+    
+    def get_feeding_totals(self) -> FeedingTotals:
+        """Get running sums and counts per feeding type."""
+        return self._feeding_totals
+    
+    def compare_windows(
+        self,
+        metric: str,
+        window: timedelta,
+        offset: timedelta | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """Compare a metric over the latest window and an earlier one.
+        
+        The current window ends now; the previous window is the same length
+        and ends offset earlier (by default the two windows are adjacent).
+        """
+        index = self.get_index(metric)
+        now = local_now()
+        previous_end = now - (window if offset is None else offset)
+        return {
+            "current": index.aggregate(now - window, now),
+            "previous": index.aggregate(previous_end - window, previous_end),
+        }
+    
+    @callback
+    def async_roll_over_day(self, _now: datetime | None = None) -> None:
+        """Start a new day of totals; scheduled at midnight."""
+        self._rebuild_today()
+        self._async_notify_listeners()
     
     async def _update_stats(self, activity_type: str, data: dict[str, Any]) -> None:
         """Update statistics."""
@@ -73,38 +631,23 @@ class BabyMonitorStorage:
         
         if activity_type == "diaper_change":
             stats["total_diaper_changes"] += 1
-            stats["last_diaper_change"] = datetime.now().isoformat()
+            stats["last_diaper_change"] = local_now().isoformat()
         
         elif activity_type == "feeding":
             stats["total_feedings"] += 1
-            stats["last_feeding"] = datetime.now().isoformat()
-            
-            # Update average feeding amount
-            total_amount = 0
-            feeding_count = 0
-            for activity in self._data["activities"]:
-                if (activity["type"] == "feeding" and 
-                    "feeding_amount" in activity["data"]):
-                    total_amount += activity["data"]["feeding_amount"]
-                    feeding_count += 1
+            stats["last_feeding"] = local_now().isoformat()
             
-            if feeding_count > 0:
-                stats["average_feeding_amount"] = total_amount / feeding_count
+            # Average feeding amount comes from the running totals
+            stats["average_feeding_amount"] = self._feeding_totals.average_amount() or 0
         
         elif activity_type == "sleep":
             if data.get("sleep_type") == "end":
                 stats["total_sleep_sessions"] += 1
-                stats["last_sleep"] = datetime.now().isoformat()
-                
-                # Calculate average sleep duration
-                sleep_durations = []
-                for activity in self._data["activities"]:
-                    if (activity["type"] == "sleep" and 
-                        "duration" in activity["data"]):
-                        sleep_durations.append(activity["data"]["duration"])
+                stats["last_sleep"] = local_now().isoformat()
                 
-                if sleep_durations:
-                    stats["average_sleep_duration"] = sum(sleep_durations) / len(sleep_durations)
+                # Average sleep duration comes from the running sum and count
+                if self._sleep_duration_count:
+                    stats["average_sleep_duration"] = self._average_sleep_duration()
     
     def get_activities_by_type(self, activity_type: str, limit: int = None) -> list[dict]:
         """Get activities filtered by type."""
@@ -123,6 +666,35 @@ class BabyMonitorStorage:
         
         return activities
     
+    def get_latest_activity(self, activity_type: str) -> dict[str, Any] | None:
+        """Get the newest activity of a type in O(1)."""
+        return self._latest.get(activity_type)
+    
+    def get_activities_between(self, start: str | None, end: str) -> list[dict]:
+        """Get activities with start <= timestamp < end in time order.
+        
+        A start of None means from the beginning of the history.
+        """
+        # Activities are kept in time order
+        activities = self._data["activities"]
+        first = 0
+        if start is not None:
+            first = bisect_left(activities, start, key=lambda activity: activity["timestamp"])
+        last = bisect_left(activities, end, key=lambda activity: activity["timestamp"])
+        return activities[first:last]
+    
+    def get_statistics_progress(self) -> dict[str, Any]:
+        """Get how far activities were imported into long-term statistics."""
+        return self._data.get("statistics", {"imported_until": None, "sums": {}})
+    
+    @callback
+    def async_set_statistics_progress(
+        self, imported_until: str, sums: dict[str, float]
+    ) -> None:
+        """Record how far activities were imported into long-term statistics."""
+        self._data["statistics"] = {"imported_until": imported_until, "sums": sums}
+        self._store.async_delay_save(lambda: self._data, STATISTICS_SAVE_DELAY)
+    
     def get_activities_by_date_range(self, start_date: str, end_date: str) -> list[dict]:
         """Get activities within a date range."""
         return [
@@ -130,6 +702,51 @@ class BabyMonitorStorage:
             if start_date <= activity["timestamp"] <= end_date
         ]
     
+    def iter_activity_chunks(
+        self,
+        size: int,
+        activity_types: set[str] | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """Yield activities in time order, at most size per chunk.
+        
+        Only one chunk of references exists at a time, so a consumer can hand
+        each chunk to the executor without copying the whole history. Room
+        readings are merged in as one environmental record per 5-minute
+        period holding the period's means.
+        """
+        activities = self._data["activities"]
+        first = 0
+        last = len(activities)
+        # Activities are kept in time order
+        if start is not None:
+            first = bisect_left(
+                activities, start.isoformat(), key=lambda activity: activity["timestamp"]
+            )
+        if end is not None:
+            last = bisect_right(
+                activities, end.isoformat(), key=lambda activity: activity["timestamp"]
+            )
+        
+        records: Iterator[dict[str, Any]] = (
+            activities[position]
+            for position in range(first, last)
+            if not activity_types or activities[position]["type"] in activity_types
+        )
+        if not activity_types or ACTIVITY_ENVIRONMENTAL in activity_types:
+            records = heapq.merge(
+                records,
+                (
+                    {"type": ACTIVITY_ENVIRONMENTAL, "timestamp": timestamp, "data": data}
+                    for timestamp, data in self._environment.means(start, end)
+                ),
+                key=lambda activity: activity["timestamp"],
+            )
+        
+        while chunk := list(islice(records, size)):
+            yield chunk
+    
     def get_stats(self) -> dict[str, Any]:
         """Get current statistics."""
         return self._data["stats"].copy()
@@ -142,7 +759,7 @@ class BabyMonitorStorage:
     
     def get_activities_since_days(self, days: int) -> list[dict]:
         """Get activities from the last N days."""
-        cutoff_date = datetime.now() - timedelta(days=days)
+        cutoff_date = local_now() - timedelta(days=days)
         return [
             activity for activity in self._data["activities"]
             if datetime.fromisoformat(activity["timestamp"]) >= cutoff_date
@@ -150,7 +767,7 @@ class BabyMonitorStorage:
     
     def get_daily_activities(self) -> list[dict]:
         """Get all activities from today (since 00:00:00)."""
-        today = datetime.now().date()
+        today = local_now().date()
         today_start = datetime.combine(today, datetime.min.time())
         today_end = datetime.combine(today, datetime.max.time())
         
@@ -0,0 +1,521 @@
+"""Tests for aggregates.py"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.babymonitor.const import (
+    ACTIVITY_CRYING,
+    ACTIVITY_FEEDING,
+    ACTIVITY_SLEEP,
+)
+
+from custom_components.babymonitor.aggregates import (
+    CryingHistogram,
+    EnvironmentSeries,
+    FeedingModel,
+    FeedingTotals,
+    GrowthTrend,
+    SlidingWindow,
+    TimeInRange,
+    TimestampIndex,
+    group_reduce,
+    hourly_totals,
+    to_seconds,
+)
+
+
+class TestSlidingWindow:
+    """Test SlidingWindow class."""
+
+    def test_running_aggregates(self):
+        """Test count, sum, mean, min and max while adding entries."""
+        start = datetime(2026, 3, 1, 8, 0)
+        window = SlidingWindow(timedelta(days=7))
+
+        window.add(start, 40, "short")
+        window.add(start + timedelta(hours=1), 90, "long")
+        window.add(start + timedelta(hours=2), 20, "short")
+        window.advance(start + timedelta(hours=3))
+
+        assert window.count == 3
+        assert window.total == 150
+        assert window.mean == 50
+        assert window.minimum == 20
+        assert window.maximum == 90
+        assert window.category_count("short") == 2
+
+    def test_eviction(self):
+        """Test that expired entries leave every aggregate."""
+        start = datetime(2026, 3, 1, 8, 0)
+        window = SlidingWindow(timedelta(days=1))
+
+        window.add(start, 90, "long")
+        window.add(start + timedelta(hours=12), 20, "short")
+        window.add(start + timedelta(hours=18), 50, "short")
+
+        assert window.expires_at() == start + timedelta(days=1)
+
+        window.advance(start + timedelta(days=1, hours=1))
+
+        assert window.count == 2
+        assert window.total == 70
+        assert window.minimum == 20
+        assert window.maximum == 50
+        assert window.categories() == {"short": 2}
+        assert window.expires_at() == start + timedelta(days=1, hours=12)
+
+        window.advance(start + timedelta(days=3))
+
+        assert window.count == 0
+        assert window.mean is None
+        assert window.minimum is None
+        assert window.maximum is None
+        assert window.expires_at() is None
+
+
+class TestTimestampIndex:
+    """Test TimestampIndex class."""
+
+    def test_range_aggregates(self):
+        """Test count, sum and mean over half-open ranges."""
+        start = datetime(2026, 3, 1, 8, 0)
+        index = TimestampIndex()
+
+        for hours, value in ((0, 30), (1, 60), (2, 90)):
+            index.add(start + timedelta(hours=hours), value)
+
+        result = index.aggregate(start, start + timedelta(hours=2))
+        assert result["count"] == 2
+        assert result["sum"] == 150
+        assert result["mean"] == 75
+
+        empty = index.aggregate(start + timedelta(hours=3), start + timedelta(hours=4))
+        assert empty["count"] == 0
+        assert empty["mean"] is None
+
+    def test_out_of_order_insert(self):
+        """Test that a backdated entry lands in the right position."""
+        start = datetime(2026, 3, 1, 8, 0)
+        index = TimestampIndex()
+
+        index.add(start + timedelta(hours=2), 10)
+        index.add(start, 5)
+
+        assert index.aggregate(start - timedelta(hours=1), start)["sum"] == 5
+        assert index.aggregate(start, start + timedelta(hours=2))["sum"] == 10
+        assert index.next_expiry(start, timedelta(hours=1)) == start + timedelta(hours=1)
+
+
+class TestFeedingModel:
+    """Test FeedingModel class."""
+
+    def test_needs_two_intervals(self):
+        """Test that a prediction needs at least three feedings."""
+        start = datetime(2026, 3, 1, 8, 0)
+        model = FeedingModel()
+
+        model.add(start)
+        model.add(start + timedelta(hours=3))
+        assert model.predicted_next() is None
+        assert model.confidence == "Low"
+
+        model.add(start + timedelta(hours=6))
+        assert model.predicted_next() == start + timedelta(hours=9)
+
+    def test_regular_intervals_give_high_confidence(self):
+        """Test that steady intervals are predicted with high confidence."""
+        start = datetime(2026, 3, 1, 0, 0)
+        model = FeedingModel()
+
+        for feeding in range(6):
+            model.add(start + timedelta(hours=3 * feeding))
+
+        assert model.interval_hours == 3
+        assert model.confidence == "High"
+        assert not model.uses_profile
+
+    def test_long_gaps_are_ignored(self):
+        """Test that gaps beyond the maximum interval do not skew the estimate."""
+        start = datetime(2026, 3, 1, 8, 0)
+        model = FeedingModel()
+
+        for when in (start, start + timedelta(hours=2), start + timedelta(hours=4)):
+            model.add(when)
+        model.add(start + timedelta(hours=20))
+        model.add(start + timedelta(hours=22))
+
+        assert model.interval_hours == 2
+        assert model.predicted_next() == start + timedelta(hours=24)
+
+    def test_out_of_order_feeding_ignored(self):
+        """Test that a backdated feeding does not move the last feeding back."""
+        start = datetime(2026, 3, 1, 8, 0)
+        model = FeedingModel()
+
+        for hours in (0, 3, 6):
+            model.add(start + timedelta(hours=hours))
+        model.add(start + timedelta(hours=1))
+        assert model.last == start + timedelta(hours=6)
+
+        model.add(start + timedelta(hours=9))
+        assert model.interval_hours == 3
+        assert model.samples == 3
+        assert model.predicted_next() == start + timedelta(hours=12)
+
+    def test_time_of_day_profile(self):
+        """Test that an hour with enough history uses its own interval."""
+        model = FeedingModel()
+
+        for day in range(3):
+            night = datetime(2026, 3, 1 + day, 22, 0)
+            for hours in (-6, -4, -2):
+                model.add(night + timedelta(hours=hours))
+            model.add(night)
+            model.add(night + timedelta(hours=5))
+
+        model.add(datetime(2026, 3, 4, 22, 0))
+
+        assert model.uses_profile
+        assert model.predicted_next() == datetime(2026, 3, 5, 3, 0)
+
+
+class TestFeedingTotals:
+    """Test FeedingTotals class."""
+
+    def test_running_sums(self):
+        """Test running sums per feeding type."""
+        totals = FeedingTotals()
+
+        totals.add({"feeding_type": "bottle", "feeding_amount": 120, "feeding_duration": 20})
+        totals.add({"feeding_type": "bottle", "feeding_amount": 60, "feeding_duration": 15})
+        totals.add({"feeding_type": "breast_left", "feeding_duration": 10})
+
+        assert totals.average_amount() == 90
+        assert totals.average_ratio("bottle") == 5
+        assert totals.get("ratio_amount", "bottle") == 180
+        assert totals.count_matching("breast") == 1
+        assert totals.average_ratio("breast_left") is None
+
+
+def test_hourly_totals():
+    """Test that statistics are bucketed per clock hour."""
+    activities = [
+        {
+            "type": ACTIVITY_FEEDING,
+            "timestamp": "2026-03-01T08:10:00",
+            "data": {"feeding_amount": 100}
+        },
+        {
+            "type": ACTIVITY_FEEDING,
+            "timestamp": "2026-03-01T08:50:00",
+            "data": {"feeding_amount": 20}
+        },
+        {
+            "type": ACTIVITY_SLEEP,
+            "timestamp": "2026-03-01T09:30:00",
+            "data": {"sleep_type": "start"}
+        },
+        {
+            "type": ACTIVITY_SLEEP,
+            "timestamp": "2026-03-01T11:05:00",
+            "data": {"sleep_type": "end", "duration": 95}
+        },
+    ]
+
+    totals = hourly_totals(activities)
+
+    assert totals["feedings"] == {datetime(2026, 3, 1, 8): 2}
+    assert totals["feeding_amount"] == {datetime(2026, 3, 1, 8): 120}
+    assert totals["sleep_minutes"] == {datetime(2026, 3, 1, 11): 95}
+    assert "diaper_changes" not in totals
+
+
+class TestCryingHistogram:
+    """Test CryingHistogram class."""
+
+    @staticmethod
+    def _crying(timestamp, **data):
+        """Create a crying activity."""
+        return {"type": ACTIVITY_CRYING, "timestamp": timestamp, "data": data}
+
+    def test_episodes_binned_by_start_hour(self):
+        """Test that episodes land in the hour they started."""
+        histogram = CryingHistogram()
+
+        # 2026-03-02 is a Monday
+        histogram.add(self._crying("2026-03-02T18:10:00", duration=5))
+        histogram.add(self._crying("2026-03-02T19:05:00", duration=20))
+        histogram.add(self._crying("2026-03-03T18:30:00", duration=0))
+
+        assert histogram.hourly_episodes()[18] == 3
+        assert histogram.hourly_minutes()[18] == 25
+        assert histogram.peak_hour() == 18
+        weekly = histogram.as_dict()["weekly"]
+        assert weekly["monday"]["episodes"][18] == 2
+        assert weekly["tuesday"]["episodes"][18] == 1
+
+    def test_camera_start_marker_skipped(self):
+        """Test that a camera episode counts once."""
+        histogram = CryingHistogram()
+
+        histogram.add(self._crying("2026-03-02T02:50:00", duration=0, camera_phase="start"))
+        histogram.add(self._crying("2026-03-02T03:20:00", duration=30, camera_phase="end"))
+
+        assert sum(histogram.hourly_episodes()) == 1
+        assert histogram.hourly_minutes()[2] == 30
+
+
+class TestGrowthTrend:
+    """Test GrowthTrend class."""
+
+    DAY = 86400
+
+    def test_linear_series(self):
+        """Test that a straight line is fitted exactly."""
+        trend = GrowthTrend(30)
+        for day in range(5):
+            trend.add(day * self.DAY, 4.0 + 0.025 * day)
+
+        assert trend.count == 5
+        assert trend.slope == pytest.approx(0.025)
+        assert trend.predict(10 * self.DAY) == pytest.approx(4.25)
+        assert trend.residual_std == pytest.approx(0, abs=1e-6)
+        assert trend.is_outlier(4 * self.DAY, 4.1) is False
+
+    def test_needs_spread_in_time(self):
+        """Test that a single day of measurements gives no slope."""
+        trend = GrowthTrend(30)
+        trend.add(0, 4.0)
+        assert trend.slope is None
+        trend.add(0, 4.1)
+        assert trend.slope is None
+
+    def test_window_follows_latest_measurement(self):
+        """Test that points older than the window before the newest are dropped."""
+        trend = GrowthTrend(10)
+        trend.add(0, 100.0)
+        trend.add(20 * self.DAY, 5.0)
+        trend.add(25 * self.DAY, 5.5)
+
+        assert trend.count == 2
+        assert trend.slope == pytest.approx(0.1)
+
+        # An older measurement outside the window is kept out of the fit
+        trend.add(5 * self.DAY, 50.0)
+        assert trend.count == 2
+        assert trend.latest == (25 * self.DAY, 5.5)
+
+    def test_out_of_order_matches_ordered(self):
+        """Test that backdated measurements give the same fit as ordered ones."""
+        points = [(day * self.DAY, 3.5 + 0.03 * day + (day % 3) * 0.01) for day in range(12)]
+        trend = GrowthTrend(30)
+        for when, value in reversed(points):
+            trend.add(when, value)
+
+        expected = GrowthTrend(30)
+        for when, value in points:
+            expected.add(when, value)
+
+        assert trend.count == expected.count
+        assert trend.slope == pytest.approx(expected.slope)
+        assert trend.residual_std == pytest.approx(expected.residual_std)
+
+    def test_outlier_flag(self):
+        """Test that a measurement far from the fit is flagged."""
+        trend = GrowthTrend(30)
+        for day, value in enumerate((4.00, 4.03, 4.05, 4.08, 4.10, 4.13, 4.15, 4.18)):
+            trend.add(day * self.DAY, value)
+
+        assert trend.is_outlier(8 * self.DAY, 4.20) is False
+        assert trend.is_outlier(8 * self.DAY, 5.5) is True
+
+
+class TestGroupReduce:
+    """Test group_reduce function."""
+
+    @pytest.fixture
+    def columns(self):
+        """Create a feeding every 8 hours for two weeks, 100 ml rising by 10."""
+        # 2026-03-02 is a Monday
+        start = datetime(2026, 3, 2, 2, 0)
+        times = [to_seconds(start + timedelta(hours=8 * i)) for i in range(42)]
+        return times, [100.0 + 10 * i for i in range(42)]
+
+    def test_range_totals(self, columns):
+        """Test aggregates over an inclusive time range."""
+        result = group_reduce(
+            *columns,
+            datetime(2026, 3, 2, 10, 0),
+            datetime(2026, 3, 3, 2, 0),
+            aggregates=("count", "sum", "mean", "min", "max"),
+        )
+
+        assert result == {"count": 3, "sum": 360.0, "mean": 120.0, "min": 110.0, "max": 130.0}
+
+    def test_daily_and_weekly_buckets(self, columns):
+        """Test that buckets start at midnight and on Mondays."""
+        daily = group_reduce(*columns, None, None, "day", ("count", "sum"))
+        weekly = group_reduce(*columns, None, None, "week", ("count",))
+
+        assert len(daily["buckets"]) == 14
+        assert daily["buckets"][0] == {"start": "2026-03-02T00:00:00", "count": 3, "sum": 330.0}
+        assert weekly["buckets"] == [
+            {"start": "2026-03-02T00:00:00", "count": 21},
+            {"start": "2026-03-09T00:00:00", "count": 21},
+        ]
+        assert weekly["truncated"] is False
+
+    def test_limit_keeps_latest_buckets(self, columns):
+        """Test that the result is bounded to the most recent buckets."""
+        result = group_reduce(*columns, None, None, "hour", ("max",), limit=2)
+
+        assert result["truncated"] is True
+        assert result["max"] == 510.0
+        assert [bucket["start"] for bucket in result["buckets"]] == [
+            "2026-03-15T10:00:00",
+            "2026-03-15T18:00:00",
+        ]
+
+    def test_empty_range(self, columns):
+        """Test that a range without entries gives empty aggregates."""
+        result = group_reduce(
+            *columns, datetime(2026, 4, 1), None, "day", ("count", "mean")
+        )
+
+        assert result == {"count": 0, "mean": None, "truncated": False, "buckets": []}
+
+
+class TestEnvironmentSeries:
+    """Test EnvironmentSeries class."""
+
+    def test_readings_share_five_minute_buckets(self):
+        """Test that readings are folded into min, mean and max per bucket."""
+        series = EnvironmentSeries([])
+        start = datetime(2026, 3, 1, 9, 0)
+        for minute, temperature in enumerate([20.0, 21.0, 22.0, 23.0, 24.0, 19.0]):
+            series.add(
+                start + timedelta(minutes=minute),
+                {"room_temperature": temperature, "humidity": 50},
+            )
+
+        assert len(series.buckets) == 2
+        assert series.latest() == {
+            "start": "2026-03-01T09:05:00",
+            "last_reading": "2026-03-01T09:05:00",
+            "room_temperature": {"mean": 19.0, "min": 19.0, "max": 19.0, "count": 1},
+            "humidity": {"mean": 50.0, "min": 50, "max": 50, "count": 1},
+        }
+        assert series.buckets[0]["room_temperature"] == [5, 110.0, 20.0, 24.0]
+
+    def test_backdated_reading(self):
+        """Test that an older reading lands in its own bucket, in order."""
+        series = EnvironmentSeries([])
+        series.add(datetime(2026, 3, 1, 10, 0), {"humidity": 40})
+        series.add(datetime(2026, 3, 1, 9, 0), {"humidity": 60})
+        series.add(datetime(2026, 3, 1, 10, 3), {"humidity": 50})
+
+        assert [bucket["start"] for bucket in series.buckets] == [
+            "2026-03-01T09:00:00",
+            "2026-03-01T10:00:00",
+        ]
+        assert series.latest()["humidity"]["mean"] == 45.0
+        assert "room_temperature" not in series.latest()
+
+    def test_readings_seeded_from_stored_buckets(self):
+        """Test that a series stored without newest readings falls back to bucket means."""
+        series = EnvironmentSeries([
+            {
+                "start": "2026-03-01T09:00:00",
+                "last_reading": "2026-03-01T09:02:00",
+                "room_temperature": [2, 41.0, 20.0, 21.0],
+            },
+            {
+                "start": "2026-03-01T09:05:00",
+                "last_reading": "2026-03-01T09:06:00",
+                "humidity": [1, 50, 50, 50],
+            },
+        ])
+
+        assert series.readings == {
+            "room_temperature": {"value": 20.5, "timestamp": "2026-03-01T09:02:00"},
+            "humidity": {"value": 50.0, "timestamp": "2026-03-01T09:06:00"},
+        }
+
+    def test_retention_bounds_growth(self):
+        """Test that buckets older than the retention period are dropped."""
+        series = EnvironmentSeries([])
+        start = datetime(2026, 1, 1)
+        for hour in range(24 * 40):
+            series.add(start + timedelta(hours=hour), {"room_temperature": 20})
+
+        assert len(series.buckets) == 24 * EnvironmentSeries.RETENTION_DAYS + 1
+        assert series.buckets[0]["start"] == "2026-01-10T23:00:00"
+
+    def test_kept_buckets_survive_retention(self):
+        """Test that buckets before keep_before are not dropped, later ones are."""
+        series = EnvironmentSeries([], keep_before="2026-01-01T00:02:00")
+        series.add(datetime(2026, 1, 1, 0, 2), {"humidity": 50})
+        series.add(datetime(2026, 1, 1, 12, 0), {"humidity": 50})
+        series.add(datetime(2026, 3, 1), {"humidity": 50})
+
+        assert [bucket["start"] for bucket in series.buckets] == [
+            "2026-01-01T00:00:00",
+            "2026-03-01T00:00:00",
+        ]
+
+
+class TestTimeInRange:
+    """Test TimeInRange class."""
+
+    def test_time_weighted_statistics(self):
+        """Test in-range share, mean and longest excursion for a day."""
+        stats = TimeInRange(18, 22)
+        start = datetime(2026, 3, 2, 0, 0)
+        # Readings every 30 minutes: 20 °C, then 24 °C from 6:00 to 8:00
+        for minute in range(0, 12 * 60, 30):
+            stats.add(start + timedelta(minutes=minute), 24.0 if 360 <= minute < 480 else 20.0)
+
+        summary = stats.summary(start + timedelta(hours=12))
+
+        assert summary["today"] == {
+            "in_range": round(100 * 10 / 12, 1),
+            "mean": round((20 * 10 + 24 * 2) / 12, 1),
+            "longest_excursion": 120,
+        }
+        assert summary["24h"] == summary["today"]
+
+    def test_ongoing_excursion_and_gap(self):
+        """Test that the latest reading is held for at most MAX_HOLD."""
+        stats = TimeInRange(30, 60)
+        start = datetime(2026, 3, 2, 8, 0)
+        stats.add(start, 70.0)
+
+        summary = stats.summary(start + timedelta(hours=3))
+
+        assert summary["7d"]["in_range"] == 0.0
+        assert summary["7d"]["longest_excursion"] == TimeInRange.MAX_HOLD // 60
+
+    def test_windows_move(self):
+        """Test that old time drops out of the rolling windows."""
+        stats = TimeInRange(18, 22)
+        start = datetime(2026, 3, 1, 12, 0)
+        for minute in range(0, 48 * 60, 10):
+            stats.add(start + timedelta(minutes=minute), 25.0 if minute < 60 else 20.0)
+
+        summary = stats.summary(start + timedelta(hours=48))
+
+        assert summary["24h"]["in_range"] == 100.0
+        assert summary["24h"]["longest_excursion"] == 0
+        assert summary["today"]["in_range"] == 100.0
+        assert summary["7d"]["longest_excursion"] == 60
+        assert summary["7d"]["in_range"] == round(100 * 47 / 48, 1)
+
+    def test_backdated_readings_ignored(self):
+        """Test that a reading older than the newest one is skipped."""
+        stats = TimeInRange(18, 22)
+        stats.add(datetime(2026, 3, 2, 10, 0), 20.0)
+        stats.add(datetime(2026, 3, 2, 9, 0), 30.0)
+
+        assert stats.summary(datetime(2026, 3, 2, 10, 30))["today"]["mean"] == 20.0
@@ -0,0 +1,52 @@
+"""Tests for analytics.py"""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.babymonitor import analytics
+from custom_components.babymonitor.analytics import summarize
+
+DAY = 86400
+
+
+class TestSummarize:
+    """Test summarize function."""
+
+    def test_empty_columns(self):
+        """Test that empty columns give no summary."""
+        assert summarize([], []) is None
+
+    def test_python_backend(self):
+        """Test reductions with the pure-Python backend."""
+        timestamps = [DAY * 20000 + 3600, DAY * 20000 + 7200, DAY * 20001 + 60, DAY * 20003]
+        values = [90.0, 30.0, 60.0, 120.0]
+
+        result = summarize(timestamps, values, use_numpy=False)
+
+        assert result["count"] == 4
+        assert result["total"] == 300
+        assert result["mean"] == 75
+        assert result["median"] == 75
+        assert result["p90"] == 111
+        assert result["per_day"] == {
+            "2024-10-04": 120,
+            "2024-10-05": 60,
+            "2024-10-07": 120,
+        }
+        assert result["daily_mean"] == 100
+
+    def test_backends_agree(self):
+        """Test that NumPy and Python produce identical results."""
+        pytest.importorskip("numpy")
+        timestamps = [DAY * 20000 + 977 * step for step in range(500)]
+        values = [(step * 37 % 101) / 3 for step in range(500)]
+
+        assert summarize(timestamps, values, use_numpy=True) == summarize(
+            timestamps, values, use_numpy=False
+        )
+
+    def test_default_backend(self, monkeypatch):
+        """Test that the Python backend is used when NumPy is absent."""
+        monkeypatch.setattr(analytics, "np", None)
+
+        assert summarize([0.0], [5.0])["per_day"] == {"1970-01-01": 5}
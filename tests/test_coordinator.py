@@ -0,0 +1,121 @@
+"""Tests for the analytics coordinator."""
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from custom_components.babymonitor.const import ACTIVITY_FEEDING
+from custom_components.babymonitor.coordinator import AnalyticsCoordinator
+from custom_components.babymonitor.storage import BabyMonitorStorage
+
+
+class TestAnalyticsCoordinator:
+    """Test AnalyticsCoordinator class."""
+
+    @pytest.fixture
+    def hass(self, mock_hass):
+        """Run executor jobs in a thread and background tasks on the loop."""
+        mock_hass.async_create_background_task = (
+            lambda coro, name: asyncio.get_running_loop().create_task(coro)
+        )
+        mock_hass.async_add_executor_job = (
+            lambda target, *args: asyncio.get_running_loop().run_in_executor(
+                None, target, *args
+            )
+        )
+        return mock_hass
+
+    @pytest.fixture(autouse=True)
+    def track_point_in_time(self):
+        """Patch the window expiry timer."""
+        with patch(
+            "custom_components.babymonitor.coordinator.async_track_point_in_time"
+        ) as mock:
+            yield mock
+
+    @pytest.mark.asyncio
+    async def test_results_computed_off_the_loop(
+        self, hass, mock_storage_load, mock_storage_save
+    ):
+        """Test that results are computed in a worker thread and applied."""
+        storage = BabyMonitorStorage(hass, "TestBaby")
+        await storage.async_load()
+        await storage.async_add_activity(ACTIVITY_FEEDING, {"feeding_amount": 120})
+
+        threads = []
+        coordinator = AnalyticsCoordinator(hass, storage)
+        coordinator.async_add_listener(
+            lambda: threads.append(threading.current_thread())
+        )
+        coordinator.async_start()
+        await coordinator._task
+
+        assert coordinator.results["feeding_amount"]["total"] == 120
+        assert coordinator.results["sleep_duration"] is None
+        # Listeners run on the loop thread after the executor job
+        assert threads == [threading.current_thread()]
+        coordinator.async_stop()
+
+    @pytest.mark.asyncio
+    async def test_one_computation_in_flight(
+        self, hass, mock_storage_load, mock_storage_save
+    ):
+        """Test that changes during a computation cause a single rerun."""
+        storage = BabyMonitorStorage(hass, "TestBaby")
+        await storage.async_load()
+
+        updates = MagicMock()
+        coordinator = AnalyticsCoordinator(hass, storage)
+        coordinator.async_add_listener(updates)
+        coordinator.async_start()
+        task = coordinator._task
+        # Let the first computation take its snapshot and enter the executor
+        await asyncio.sleep(0)
+
+        await storage.async_add_activity(ACTIVITY_FEEDING, {"feeding_amount": 60})
+        await storage.async_add_activity(ACTIVITY_FEEDING, {"feeding_amount": 90})
+        assert coordinator._task is task
+
+        await task
+
+        assert updates.call_count == 2
+        assert coordinator.results["feeding_amount"]["count"] == 2
+        coordinator.async_stop()
+
+    @pytest.mark.asyncio
+    async def test_recomputed_when_oldest_record_expires(
+        self, hass, mock_storage_load, mock_storage_save, track_point_in_time
+    ):
+        """Test that the window slides without new data."""
+        oldest = datetime.now().replace(microsecond=0) - timedelta(days=20)
+        mock_storage_load.return_value = {
+            "activities": [
+                {
+                    "type": ACTIVITY_FEEDING,
+                    "timestamp": (oldest + timedelta(days=day)).isoformat(),
+                    "data": {"feeding_amount": 100}
+                }
+                for day in (0, 5)
+            ],
+            "stats": {},
+        }
+        storage = BabyMonitorStorage(hass, "TestBaby")
+        await storage.async_load()
+
+        coordinator = AnalyticsCoordinator(hass, storage)
+        coordinator.async_start()
+        await coordinator._task
+
+        expires = track_point_in_time.call_args.args[2]
+        assert expires.replace(tzinfo=None) == oldest + timedelta(days=30, seconds=1)
+
+        track_point_in_time.call_args.args[1](expires)
+        await coordinator._task
+        assert track_point_in_time.call_count == 2
+
+        coordinator.async_stop()
+        track_point_in_time.return_value.assert_called()
@@ -0,0 +1,82 @@
+"""Tests for dedupe.py"""
+from __future__ import annotations
+
+from custom_components.babymonitor.dedupe import (
+    DuplicateFilter,
+    LogDeduplicator,
+    payload_key,
+)
+
+
+class TestDuplicateFilter:
+    """Test DuplicateFilter class."""
+
+    def test_repeat_within_ttl(self):
+        """Test that a key is a duplicate until its time is up."""
+        duplicates = DuplicateFilter(10)
+
+        assert duplicates.seen("a", now=100) is False
+        assert duplicates.seen("a", now=109) is True
+        assert duplicates.seen("a", now=110) is False
+        assert duplicates.seen("a", now=115) is True
+
+    def test_expired_keys_forgotten(self):
+        """Test that expired keys do not accumulate."""
+        duplicates = DuplicateFilter(10)
+        for second in range(100):
+            duplicates.seen(second, now=second)
+
+        assert len(duplicates) == 10
+
+    def test_size_bound(self):
+        """Test that the oldest keys are dropped beyond max_size."""
+        duplicates = DuplicateFilter(3600, max_size=2)
+        duplicates.seen("a", now=0)
+        duplicates.seen("b", now=1)
+        duplicates.seen("c", now=2)
+
+        assert len(duplicates) == 2
+        assert duplicates.seen("a", now=3) is False
+
+    def test_forget(self):
+        """Test that a forgotten key is new again and its old entry is skipped."""
+        duplicates = DuplicateFilter(10, max_size=2)
+        duplicates.seen("a", now=0)
+        duplicates.forget("a")
+
+        assert duplicates.seen("a", now=5) is False
+        assert duplicates.seen("a", now=12) is True
+        duplicates.seen("b", now=13)
+        duplicates.seen("c", now=14)
+        assert len(duplicates) == 2
+        assert duplicates.seen("b", now=14) is True
+
+    def test_zero_ttl_disables(self):
+        """Test that a ttl of 0 lets everything through."""
+        duplicates = DuplicateFilter(0)
+
+        assert duplicates.seen("a") is False
+        assert duplicates.seen("a") is False
+
+
+class TestLogDeduplicator:
+    """Test LogDeduplicator class."""
+
+    def test_identical_payloads(self):
+        """Test that identical payloads are dropped regardless of key order."""
+        deduplicator = LogDeduplicator(10)
+
+        assert deduplicator.is_duplicate(None, "feeding", {"a": 1, "b": 2}) is False
+        assert deduplicator.is_duplicate(None, "feeding", {"b": 2, "a": 1}) is True
+        assert deduplicator.is_duplicate(None, "feeding", {"a": 1, "b": 3}) is False
+        assert payload_key({"a": 1, "b": 2}) == payload_key({"b": 2, "a": 1})
+
+    def test_request_ids(self):
+        """Test that request ids decide alone, even with a disabled window."""
+        deduplicator = LogDeduplicator(0)
+
+        assert deduplicator.is_duplicate("tag-1", "feeding", {"a": 1}) is False
+        assert deduplicator.is_duplicate("tag-1", "feeding", {"a": 2}) is True
+        assert deduplicator.is_duplicate("tag-2", "feeding", {"a": 1}) is False
+        assert deduplicator.is_duplicate(None, "feeding", {"a": 1}) is False
+        assert deduplicator.is_duplicate(None, "feeding", {"a": 1}) is False
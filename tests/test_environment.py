@@ -0,0 +1,100 @@
+"""Tests for room sensor tracking."""
+from __future__ import annotations
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import State
+
+from custom_components.babymonitor.environment import (
+    MIN_SAMPLE_INTERVAL,
+    RESAMPLE_INTERVAL,
+    EnvironmentTracker,
+)
+
+
+class TestEnvironmentTracker:
+    """Test EnvironmentTracker class."""
+
+    @pytest.fixture
+    def storage(self):
+        """Create a storage mock."""
+        storage = MagicMock()
+        storage.baby_name = "Test Baby"
+        return storage
+
+    @pytest.fixture
+    def tracker(self, mock_hass, storage):
+        """Create a tracker for a temperature and a humidity sensor."""
+        return EnvironmentTracker(
+            mock_hass, storage, "sensor.nursery_temperature", "sensor.nursery_humidity"
+        )
+
+    def test_samples_rate_limited_per_entity(self, tracker, storage):
+        """Test that each entity is sampled at most once per interval."""
+        tracker._sample(State("sensor.nursery_temperature", "21.5"), now=0)
+        tracker._sample(State("sensor.nursery_humidity", "48"), now=1)
+        tracker._sample(State("sensor.nursery_temperature", "21.7"), now=30)
+        tracker._sample(State("sensor.nursery_temperature", "21.9"), now=MIN_SAMPLE_INTERVAL)
+
+        assert [call.args[0] for call in storage.async_add_environment_reading.call_args_list] == [
+            {"room_temperature": 21.5},
+            {"humidity": 48.0},
+            {"room_temperature": 21.9},
+        ]
+
+    def test_fahrenheit_converted(self, tracker, storage):
+        """Test that temperatures are stored in °C."""
+        tracker._sample(
+            State("sensor.nursery_temperature", "71.6", {"unit_of_measurement": "°F"}), now=0
+        )
+
+        storage.async_add_environment_reading.assert_called_once_with(
+            {"room_temperature": 22.0}
+        )
+
+    @pytest.mark.parametrize("value", ["unavailable", "unknown", "nan"])
+    def test_invalid_states_ignored(self, tracker, storage, value):
+        """Test that states without a number are skipped and don't use up the interval."""
+        tracker._sample(State("sensor.nursery_humidity", value), now=0)
+        tracker._sample(State("sensor.nursery_humidity", "50"), now=1)
+
+        storage.async_add_environment_reading.assert_called_once_with({"humidity": 50.0})
+
+    def test_steady_sensor_resampled(self, mock_hass, tracker, storage):
+        """Test that a sensor without state changes is sampled again from its state."""
+        mock_hass.states.get.side_effect = lambda entity_id: State(entity_id, "21")
+        interval = RESAMPLE_INTERVAL.total_seconds()
+        tracker._sample(State("sensor.nursery_temperature", "21"), now=0)
+        tracker._sample(State("sensor.nursery_humidity", "48"), now=interval - 60)
+
+        tracker._async_resample(None, now=interval)
+
+        assert [call.args[0] for call in storage.async_add_environment_reading.call_args_list] == [
+            {"room_temperature": 21.0},
+            {"humidity": 48.0},
+            {"room_temperature": 21.0},
+        ]
+
+    def test_start_and_stop(self, mock_hass, tracker, storage):
+        """Test that one subscription covers both sensors and current states are sampled."""
+        mock_hass.states.get.side_effect = lambda entity_id: State(entity_id, "40")
+        with patch(
+            "custom_components.babymonitor.environment.async_track_state_change_event"
+        ) as mock_track, patch(
+            "custom_components.babymonitor.environment.async_track_time_interval"
+        ) as mock_interval:
+            tracker.async_start()
+
+            mock_track.assert_called_once()
+            assert mock_track.call_args.args[1] == [
+                "sensor.nursery_temperature",
+                "sensor.nursery_humidity",
+            ]
+            assert storage.async_add_environment_reading.call_count == 2
+
+            assert mock_interval.call_args.args[2] == RESAMPLE_INTERVAL
+
+            tracker.async_stop()
+            mock_track.return_value.assert_called_once()
+            mock_interval.return_value.assert_called_once()
@@ -0,0 +1,136 @@
+"""Tests for growth.py"""
+from __future__ import annotations
+
+import pytest
+from datetime import date, datetime
+
+from custom_components.babymonitor.aggregates import to_seconds
+from custom_components.babymonitor.growth import (
+    birth_profile,
+    get_table,
+    percentile,
+    percentile_history,
+    z_score,
+)
+
+BIRTH = date(2024, 1, 1)
+
+
+def _at(day: int, hour: int = 9) -> float:
+    """Return the timestamp in seconds for a day of age."""
+    return to_seconds(datetime(2024, 1, 1, hour)) + day * 86400
+
+
+class TestLmsTables:
+    """Test the expanded WHO tables."""
+
+    def test_one_step_per_day(self):
+        """Test that age tables cover every day up to their last row."""
+        assert len(get_table("weight_for_age", "male")) == 1827
+        assert len(get_table("length_for_age", "female")) == 731
+
+    def test_one_step_per_millimetre(self):
+        """Test that weight-for-length covers 45 to 110 cm in 1 mm steps."""
+        assert len(get_table("weight_for_length", "male")) == 651
+
+    def test_interpolates_between_rows(self):
+        """Test that days between weekly rows are interpolated."""
+        table = get_table("weight_for_age", "male")
+
+        # Published medians at birth and one week
+        assert table.m[0] == 3.3464
+        assert table.m[7] == 3.4879
+        assert table.m[3] == pytest.approx(3.3464 + (3.4879 - 3.3464) * 3 / 7)
+
+    def test_tables_are_built_once(self):
+        """Test that lookups share one expanded table."""
+        assert get_table("weight_for_age", "female") is get_table("weight_for_age", "female")
+
+
+class TestZScores:
+    """Test z-score and percentile calculation."""
+
+    def test_median_is_50th_percentile(self):
+        """Test that the WHO median weight at birth scores 0."""
+        z = z_score("weight_for_age", "male", 0, 3.3464)
+
+        assert z == pytest.approx(0)
+        assert percentile(z) == 50.0
+
+    def test_published_sd_lines(self):
+        """Test values against the published +2 SD rounded to 0.1 kg."""
+        # WHO weight-for-age girls at 6 months: +2 SD is 9.3 kg
+        assert z_score("weight_for_age", "female", 183, 9.3) == pytest.approx(2, abs=0.05)
+        # WHO length-for-age boys at 12 months: median 75.7 cm
+        assert z_score("length_for_age", "male", 365, 75.7487) == pytest.approx(0, abs=1e-3)
+
+    def test_restricted_adjustment_beyond_3_sd(self):
+        """Test that weight z-scores beyond +3 SD use the SD2-SD3 distance."""
+        table = get_table("weight_for_age", "male")
+        l, m, s = table.l[0], table.m[0], table.s[0]
+        sd2 = m * (1 + l * s * 2) ** (1 / l)
+        sd3 = m * (1 + l * s * 3) ** (1 / l)
+
+        assert z_score("weight_for_age", "male", 0, sd3 + (sd3 - sd2)) == pytest.approx(4)
+
+    def test_out_of_range(self):
+        """Test that keys outside the tables give no z-score."""
+        assert z_score("length_for_age", "male", 800, 85) is None
+        assert z_score("weight_for_length", "male", 40, 2.5) is None
+        assert percentile(None) is None
+
+    def test_birth_profile(self):
+        """Test reading birth date and sex from options."""
+        assert birth_profile({"birth_date": "2024-01-01", "sex": "female"}) == (BIRTH, "female")
+        assert birth_profile({"birth_date": "2024-01-01"}) is None
+        assert birth_profile({"birth_date": "soon", "sex": "male"}) is None
+
+
+class TestPercentileHistory:
+    """Test the percentile backfill."""
+
+    @pytest.fixture
+    def columns(self):
+        """Create weight and height columns."""
+        weights = ([_at(0), _at(30), _at(61)], [3.3, 4.5, 5.6])
+        heights = ([_at(1), _at(60)], [50.0, 58.0])
+        return weights, heights
+
+    def test_python_backend(self, columns):
+        """Test history with the pure-Python backend."""
+        weights, heights = columns
+
+        history = percentile_history(BIRTH, "male", weights, heights, use_numpy=False)
+
+        assert [record["age_days"] for record in history["weight"]] == [0, 30, 61]
+        assert history["weight"][0]["percentile"] == percentile(
+            z_score("weight_for_age", "male", 0, 3.3)
+        )
+        # No length was measured before the first weight
+        assert history["weight"][0]["length_cm"] is None
+        assert history["weight"][0]["weight_for_length_percentile"] is None
+        assert history["weight"][1]["length_cm"] == 50.0
+        assert history["weight"][2]["length_cm"] == 58.0
+        assert history["weight"][2]["weight_for_length_percentile"] == percentile(
+            z_score("weight_for_length", "male", 58.0, 5.6)
+        )
+        assert history["height"][1]["percentile"] == percentile(
+            z_score("length_for_age", "male", 60, 58.0)
+        )
+        assert history["weight"][1]["timestamp"] == "2024-01-31T09:00:00"
+
+    def test_backends_agree(self, columns):
+        """Test that NumPy and Python produce identical results."""
+        pytest.importorskip("numpy")
+        weights, heights = columns
+
+        assert percentile_history(
+            BIRTH, "female", weights, heights, use_numpy=True
+        ) == percentile_history(BIRTH, "female", weights, heights, use_numpy=False)
+
+    def test_empty_columns(self):
+        """Test that no measurements give empty history."""
+        assert percentile_history(BIRTH, "male", ([], []), ([], []), use_numpy=False) == {
+            "weight": [],
+            "height": [],
+        }
@@ -0,0 +1,162 @@
+"""Tests for history.py"""
+from __future__ import annotations
+
+import gzip
+import json
+
+import pytest
+from unittest.mock import patch
+
+from custom_components.babymonitor import history
+from custom_components.babymonitor.const import (
+    ACTIVITY_DIAPER_CHANGE,
+    ACTIVITY_FEEDING,
+    ACTIVITY_SLEEP,
+)
+from custom_components.babymonitor.history import HistoryReader, HistoryWriter
+from custom_components.babymonitor.services import EXPORT_FIELDS, IMPORT_ITEM_SCHEMAS
+
+
+def _read_all(reader: HistoryReader, size: int = 2) -> list:
+    """Read every chunk from a reader."""
+    rows = []
+    while chunk := reader.read_chunk(size):
+        assert len(chunk) <= size
+        rows.extend(chunk)
+    reader.close()
+    return rows
+
+
+class TestHistoryReader:
+    """Test HistoryReader class."""
+
+    def test_csv_with_mapping(self, tmp_path):
+        """Test that columns and types from another tracker are mapped."""
+        path = tmp_path / "export.csv"
+        path.write_text(
+            "Kind,Time,diaper_type,feeding_type,Amount,app_id\n"
+            "Diaper,2024-03-01T08:00:00,wet,,,1\n"
+            "Bottle,2024-03-01T09:00:00,,bottle,120,2\n"
+        )
+
+        reader = HistoryReader(
+            str(path),
+            IMPORT_ITEM_SCHEMAS,
+            column_map={"Kind": "type", "Time": "timestamp", "Amount": "feeding_amount"},
+            type_map={"Diaper": ACTIVITY_DIAPER_CHANGE, "Bottle": ACTIVITY_FEEDING},
+        )
+
+        assert _read_all(reader) == [
+            (ACTIVITY_DIAPER_CHANGE, "2024-03-01T08:00:00", {"diaper_type": "wet", "notes": ""}),
+            (
+                ACTIVITY_FEEDING,
+                "2024-03-01T09:00:00",
+                {"feeding_type": "bottle", "feeding_amount": 120, "feeding_duration": 0, "notes": ""},
+            ),
+        ]
+        assert reader.imported == 2
+
+    def test_invalid_rows_are_skipped(self, tmp_path):
+        """Test that bad rows are counted and reported, not fatal."""
+        path = tmp_path / "export.jsonl"
+        path.write_text(
+            '{"type": "sleep", "timestamp": "2024-03-01T20:00:00", "sleep_type": "end", "duration": 95}\n'
+            "not json\n"
+            '{"type": "walk", "timestamp": "2024-03-01T21:00:00"}\n'
+            '{"type": "sleep", "timestamp": "yesterday", "sleep_type": "start"}\n'
+            "\n"
+            '{"type": "diaper_change", "timestamp": "2024-03-01T22:00:00Z", "diaper_type": "dirty"}\n'
+        )
+
+        reader = HistoryReader(str(path), IMPORT_ITEM_SCHEMAS)
+        rows = _read_all(reader)
+
+        assert rows[0] == (
+            ACTIVITY_SLEEP, "2024-03-01T20:00:00", {"sleep_type": "end", "duration": 95, "notes": ""}
+        )
+        assert rows[1][0] == ACTIVITY_DIAPER_CHANGE
+        assert reader.skipped == 3
+        assert [error.split(":")[0] for error in reader.errors] == ["row 2", "row 3", "row 4"]
+
+    def test_json_array_streamed_in_small_reads(self, tmp_path):
+        """Test that a gzipped JSON array is decoded across read boundaries."""
+        path = tmp_path / "export.json.gz"
+        items = [
+            {"type": "diaper_change", "timestamp": f"2024-03-01T{hour:02}:00:00", "diaper_type": "wet"}
+            for hour in range(24)
+        ]
+        with gzip.open(path, "wt", encoding="utf-8") as handle:
+            json.dump(items, handle, indent=2)
+
+        with patch.object(history, "_READ_SIZE", 7):
+            rows = _read_all(HistoryReader(str(path), IMPORT_ITEM_SCHEMAS), size=5)
+
+        assert len(rows) == 24
+        assert rows[-1][1] == "2024-03-01T23:00:00"
+
+    def test_truncated_json_array(self, tmp_path):
+        """Test that a truncated array stops the import with an error."""
+        path = tmp_path / "export.json"
+        path.write_text('[{"type": "diaper_change", "timestamp": "2024-03-01T08:00:00", "dia')
+
+        with pytest.raises(ValueError):
+            _read_all(HistoryReader(str(path), IMPORT_ITEM_SCHEMAS))
+
+    def test_unsupported_file_type(self, tmp_path):
+        """Test that unknown file types are rejected up front."""
+        path = tmp_path / "export.xlsx"
+        path.write_text("")
+
+        with pytest.raises(ValueError):
+            HistoryReader(str(path), IMPORT_ITEM_SCHEMAS)
+
+
+class TestHistoryWriter:
+    """Test HistoryWriter class."""
+
+    ACTIVITIES = [
+        {
+            "id": "a1",
+            "type": ACTIVITY_FEEDING,
+            "timestamp": "2024-03-01T09:00:00",
+            "data": {"feeding_type": "bottle", "feeding_amount": 120, "feeding_duration": 0, "notes": ""},
+        },
+        {
+            "id": "a2",
+            "type": ACTIVITY_SLEEP,
+            "timestamp": "2024-03-01T11:00:00",
+            "data": {"sleep_type": "end", "duration": 45, "notes": "nap, short"},
+        },
+    ]
+
+    @pytest.mark.parametrize("name", ["export.csv", "export.jsonl.gz"])
+    def test_export_can_be_imported(self, tmp_path, name):
+        """Test that an export round-trips through the importer."""
+        path = tmp_path / "exports" / name
+        writer = HistoryWriter(
+            path, "csv" if ".csv" in name else "jsonl", EXPORT_FIELDS, name.endswith(".gz")
+        )
+        writer.write(self.ACTIVITIES[:1])
+        writer.write(self.ACTIVITIES[1:])
+        writer.close()
+
+        assert writer.written == 2
+        assert _read_all(HistoryReader(str(path), IMPORT_ITEM_SCHEMAS)) == [
+            (activity["type"], activity["timestamp"], activity["data"])
+            for activity in self.ACTIVITIES
+        ]
+
+    def test_jsonl_keeps_every_field(self, tmp_path):
+        """Test that JSON Lines exports keep fields outside the CSV columns."""
+        path = tmp_path / "export.jsonl"
+        writer = HistoryWriter(path, "jsonl", EXPORT_FIELDS)
+        writer.write([{**self.ACTIVITIES[0], "data": {"camera_phase": "end"}}])
+        writer.close()
+
+        assert json.loads(path.read_text()) == {
+            "camera_phase": "end",
+            "type": ACTIVITY_FEEDING,
+            "timestamp": "2024-03-01T09:00:00",
+            "id": "a1",
+        }
+
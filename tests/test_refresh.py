@@ -0,0 +1,162 @@
+"""Tests for the coalesced sensor refresh."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from custom_components.babymonitor.refresh import SensorRefresher
+
+
+def _entries(*entity_ids, disabled=()):
+    """Create fake registry entries for the config entry."""
+    return [
+        MagicMock(
+            entity_id=entity_id,
+            domain=entity_id.split(".")[0],
+            disabled=entity_id in disabled,
+        )
+        for entity_id in entity_ids
+    ]
+
+
+class TestSensorRefresher:
+    """Test SensorRefresher class."""
+
+    @pytest.fixture
+    def hass(self, mock_hass):
+        """Run background tasks on the loop."""
+        mock_hass.async_create_background_task = (
+            lambda coro, name: asyncio.get_running_loop().create_task(coro)
+        )
+        return mock_hass
+
+    @pytest.fixture(autouse=True)
+    def entity_registry(self):
+        """Patch the entity registry lookup."""
+        with patch(
+            "custom_components.babymonitor.refresh.async_get_entity_registry"
+        ) as mock:
+            yield mock
+
+    @pytest.fixture
+    def call_later(self):
+        """Patch the refresh timer."""
+        with patch("custom_components.babymonitor.refresh.async_call_later") as mock:
+            yield mock
+
+    def test_burst_arms_one_timer(self, hass, call_later):
+        """Test that several writes share one delayed refresh."""
+        refresher = SensorRefresher(hass, "entry1", "Test Baby")
+
+        refresher.async_schedule()
+        refresher.async_schedule()
+        refresher.async_schedule()
+
+        assert call_later.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_sensors_updated_concurrently(self, hass, call_later):
+        """Test that the baby's sensors are updated once, all at the same time."""
+        entries = _entries(
+            "sensor.test_baby_feedings",
+            "sensor.test_baby_sleep",
+            "sensor.test_baby_growth_velocity",
+            "button.test_baby_quick_bath",
+            disabled=("sensor.test_baby_growth_velocity",),
+        )
+        running = []
+        overlap = []
+
+        async def update(_hass, entity_id):
+            running.append(entity_id)
+            await asyncio.sleep(0)
+            overlap.append(len(running))
+            running.remove(entity_id)
+
+        refresher = SensorRefresher(hass, "entry1", "Test Baby")
+        with patch(
+            "custom_components.babymonitor.refresh.async_entries_for_config_entry",
+            return_value=entries,
+        ) as mock_entries, patch(
+            "custom_components.babymonitor.refresh.async_update_entity", side_effect=update
+        ) as mock_update:
+            refresher.async_schedule()
+            call_later.call_args[0][2](None)
+            await refresher._task
+
+        assert sorted(call.args[1] for call in mock_update.call_args_list) == [
+            "sensor.test_baby_feedings",
+            "sensor.test_baby_sleep",
+        ]
+        assert max(overlap) == 2
+        assert mock_entries.call_args.args[1] == "entry1"
+
+    @pytest.mark.asyncio
+    async def test_write_during_refresh_queues_one_more(self, hass, call_later):
+        """Test that writes during a refresh lead to a single follow-up."""
+        refresher = SensorRefresher(hass, "entry1", "Test Baby")
+
+        async def update(_hass, _entity_id):
+            refresher.async_schedule()
+            refresher.async_schedule()
+
+        with patch(
+            "custom_components.babymonitor.refresh.async_entries_for_config_entry",
+            return_value=_entries("sensor.test_baby_feedings"),
+        ), patch(
+            "custom_components.babymonitor.refresh.async_update_entity", side_effect=update
+        ):
+            refresher.async_schedule()
+            call_later.call_args[0][2](None)
+            await refresher._task
+
+        assert call_later.call_count == 2
+
+    def test_entity_list_cached_until_registry_changes(self, hass):
+        """Test that the registry is only searched again after it changes."""
+        refresher = SensorRefresher(hass, "entry1", "Test Baby")
+        refresher.async_start()
+        handler = hass.bus.async_listen.call_args.args[1]
+
+        with patch(
+            "custom_components.babymonitor.refresh.async_entries_for_config_entry",
+            return_value=_entries("sensor.test_baby_feedings"),
+        ) as mock_entries:
+            refresher._sensor_entity_ids()
+            refresher._sensor_entity_ids()
+            assert mock_entries.call_count == 1
+
+            handler(MagicMock())
+            assert refresher._sensor_entity_ids() == ["sensor.test_baby_feedings"]
+            assert mock_entries.call_count == 2
+
+        refresher.async_stop()
+        hass.bus.async_listen.return_value.assert_called_once()
+
+    def test_only_own_registry_changes_clear_the_cache(self, hass, entity_registry):
+        """Test that registry changes for other integrations are filtered out."""
+        refresher = SensorRefresher(hass, "entry1", "Test Baby")
+        refresher.async_start()
+        event_filter = hass.bus.async_listen.call_args.kwargs["event_filter"]
+        refresher._entity_ids = ["sensor.test_baby_feedings"]
+        registry = entity_registry.return_value
+        registry.async_get.side_effect = lambda entity_id: {
+            "sensor.test_baby_mood": MagicMock(config_entry_id="entry1"),
+            "light.kitchen": MagicMock(config_entry_id="other"),
+        }.get(entity_id)
+
+        assert event_filter(MagicMock(data={"action": "update", "entity_id": "sensor.test_baby_feedings"}))
+        assert event_filter(MagicMock(data={"action": "update", "entity_id": "sensor.test_baby_mood"}))
+        assert not event_filter(MagicMock(data={"action": "update", "entity_id": "light.kitchen"}))
+        assert not event_filter(MagicMock(data={"action": "remove", "entity_id": "light.gone"}))
+
+    def test_stop_cancels_timer(self, hass, call_later):
+        """Test that stopping cancels a scheduled refresh."""
+        refresher = SensorRefresher(hass, "entry1", "Test Baby")
+        refresher.async_schedule()
+
+        refresher.async_stop()
+
+        call_later.return_value.assert_called_once()
@@ -0,0 +1,78 @@
+"""Tests for the refresh scheduler."""
+from __future__ import annotations
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from custom_components.babymonitor.scheduler import RefreshScheduler
+
+
+def _entity(next_refresh):
+    """Create a fake time-dependent entity."""
+    entity = MagicMock()
+    entity.next_refresh.side_effect = next_refresh
+    return entity
+
+
+class TestRefreshScheduler:
+    """Test RefreshScheduler class."""
+
+    @pytest.fixture
+    def scheduler(self, mock_hass):
+        """Create a scheduler instance."""
+        return RefreshScheduler(mock_hass, MagicMock())
+
+    def test_arms_single_timer_for_earliest_change(self, scheduler):
+        """Test that only the earliest due time is armed."""
+        with patch(
+            "custom_components.babymonitor.scheduler.async_track_point_in_time"
+        ) as mock_track:
+            start = datetime.now()
+            scheduler.async_register(_entity(lambda now: start + timedelta(hours=2)))
+            scheduler.async_register(_entity(lambda now: start + timedelta(minutes=1)))
+            scheduler.async_register(_entity(lambda now: None))
+
+            assert mock_track.call_count == 2
+            assert mock_track.call_args[0][2] == (start + timedelta(minutes=1)).astimezone()
+            # The two hour timer was cancelled when the sooner one was armed
+            assert mock_track.return_value.call_count == 1
+
+    def test_fires_only_due_entities(self, scheduler):
+        """Test that the timer refreshes due entities and re-arms."""
+        soon = _entity(lambda now: now + timedelta(microseconds=1))
+        later = _entity(lambda now: now + timedelta(hours=1))
+
+        with patch(
+            "custom_components.babymonitor.scheduler.async_track_point_in_time"
+        ) as mock_track:
+            scheduler.async_register(soon)
+            scheduler.async_register(later)
+
+            handler = mock_track.call_args[0][1]
+            handler(None)
+
+            soon.async_write_ha_state.assert_called_once()
+            later.async_write_ha_state.assert_not_called()
+
+    def test_past_due_times_are_ignored(self, scheduler):
+        """Test that an entity reporting a past instant does not spin."""
+        with patch(
+            "custom_components.babymonitor.scheduler.async_track_point_in_time"
+        ) as mock_track:
+            scheduler.async_register(_entity(lambda now: now - timedelta(minutes=1)))
+
+            mock_track.assert_not_called()
+
+    def test_unregister_and_stop(self, scheduler):
+        """Test that unregistering the last entity cancels the timer."""
+        with patch(
+            "custom_components.babymonitor.scheduler.async_track_point_in_time"
+        ) as mock_track:
+            unsub = mock_track.return_value
+            remove = scheduler.async_register(_entity(lambda now: now + timedelta(hours=1)))
+
+            remove()
+
+            unsub.assert_called_once()
+            scheduler.async_stop()
@@ -7,17 +7,23 @@ from unittest.mock import MagicMock, patch
 
 from homeassistant.components.sensor import SensorStateClass
 
+from custom_components.babymonitor.aggregates import EnvironmentSeries, TodayTotals
 from custom_components.babymonitor.sensor import (
     TotalCryingEpisodesToday,
     CurrentTemperatureSensor,
     LastDiaperChangeSensor,
+    GrowthPercentileSensor,
+    EnvironmentalConditionsSensor,
 )
 from custom_components.babymonitor.const import (
     ACTIVITY_CRYING,
     ACTIVITY_TEMPERATURE,
     ACTIVITY_DIAPER_CHANGE,
+    ACTIVITY_WEIGHT,
+    ACTIVITY_HEIGHT,
     CRYING_MODERATE,
     CRYING_INTENSE,
+    MAX_ATTRIBUTE_STRING_LENGTH,
 )
 
 
@@ -43,12 +49,30 @@ class TestTotalCryingEpisodesToday:
         """Test sensor basic properties."""
         assert sensor._sensor_name == "Total Crying Episodes"
         assert sensor._sensor_id == "total_crying_episodes"
-        assert sensor._attr_state_class == SensorStateClass.TOTAL_INCREASING
+        assert sensor._attr_state_class == SensorStateClass.TOTAL
         assert sensor._attr_icon == "mdi:emoticon-sad-outline"
 
+    @staticmethod
+    def _set_today(mock_storage, activities):
+        """Feed today's activities into the storage's running totals."""
+        totals = TodayTotals(datetime.now().date())
+        for activity in activities:
+            totals.add(activity)
+        mock_storage.get_today_totals.return_value = totals
+
+    def test_last_reset_is_midnight(self, sensor, mock_storage):
+        """Test that the daily count resets at midnight."""
+        self._set_today(mock_storage, [])
+
+        last_reset = sensor.last_reset
+
+        assert last_reset.date() == datetime.now().date()
+        assert (last_reset.hour, last_reset.minute) == (0, 0)
+        assert last_reset.tzinfo is not None
+
     def test_native_value_no_crying(self, sensor, mock_storage):
         """Test native value when no crying episodes."""
-        mock_storage.get_daily_activities.return_value = []
+        self._set_today(mock_storage, [])
         
         value = sensor.native_value
         
@@ -57,7 +81,7 @@ class TestTotalCryingEpisodesToday:
     def test_native_value_with_crying(self, sensor, mock_storage):
         """Test native value with crying episodes."""
         today = datetime.now()
-        mock_storage.get_daily_activities.return_value = [
+        self._set_today(mock_storage, [
             {
                 "type": ACTIVITY_CRYING,
                 "timestamp": today.isoformat(),
@@ -73,7 +97,7 @@ class TestTotalCryingEpisodesToday:
                 "timestamp": today.isoformat(),
                 "data": {}
             },
-        ]
+        ])
         
         value = sensor.native_value
         
@@ -83,7 +107,7 @@ class TestTotalCryingEpisodesToday:
     def test_extra_state_attributes(self, sensor, mock_storage):
         """Test extra state attributes calculation."""
         today = datetime.now()
-        mock_storage.get_daily_activities.return_value = [
+        self._set_today(mock_storage, [
             {
                 "type": ACTIVITY_CRYING,
                 "timestamp": (today - timedelta(hours=2)).isoformat(),
@@ -94,7 +118,7 @@ class TestTotalCryingEpisodesToday:
                 "timestamp": (today - timedelta(hours=1)).isoformat(),
                 "data": {"crying_intensity": CRYING_INTENSE, "duration": 20}
             },
-        ]
+        ])
         
         attrs = sensor.extra_state_attributes
         
@@ -228,6 +252,145 @@ class TestLastDiaperChangeSensor:
         assert "ago" in value or "minute" in value
 
 
+class TestEnvironmentalConditionsSensor:
+    """Test EnvironmentalConditionsSensor."""
+
+    def test_reads_latest_readings(self):
+        """Test that the state is the newest reading of each sensor."""
+        series = EnvironmentSeries([])
+        series.add(datetime(2024, 3, 1, 9, 0), {"room_temperature": 25.0, "humidity": 70})
+        series.add(datetime(2024, 3, 1, 9, 5), {"room_temperature": 20.0, "humidity": 40})
+        series.add(datetime(2024, 3, 1, 9, 6), {"room_temperature": 21.0, "humidity": 50})
+        storage = MagicMock()
+        storage.get_environment.return_value = series
+        storage.get_time_in_range.return_value = {
+            "humidity": {
+                "today": {"in_range": 75.0, "mean": 52.3, "longest_excursion": 30},
+                "24h": None,
+            },
+        }
+
+        sensor = EnvironmentalConditionsSensor("TestBaby", storage, {})
+
+        assert sensor.native_value == "21.0°C, 50%"
+        attributes = sensor.extra_state_attributes
+        assert attributes["overall_comfort"] == "Good"
+        assert attributes["room_temperature_max"] == 21.0
+        assert attributes["last_update"] == "2024-03-01T09:06:00"
+        assert attributes["humidity_in_range_today"] == 75.0
+        assert attributes["humidity_longest_excursion_today"] == 30
+        assert "humidity_mean_24h" not in attributes
+
+    def test_quiet_sensor_keeps_its_reading(self):
+        """Test that a field missing from the newest bucket still shows its last reading."""
+        series = EnvironmentSeries([])
+        series.add(datetime(2024, 3, 1, 9, 0), {"room_temperature": 20.0, "humidity": 45})
+        series.add(datetime(2024, 3, 1, 9, 40), {"humidity": 50})
+        storage = MagicMock()
+        storage.get_environment.return_value = series
+        storage.get_time_in_range.return_value = {}
+
+        sensor = EnvironmentalConditionsSensor("TestBaby", storage, {})
+
+        assert sensor.native_value == "20.0°C, 50%"
+        attributes = sensor.extra_state_attributes
+        assert attributes["temperature_status"] == "optimal"
+        assert attributes["room_temperature_last_update"] == "2024-03-01T09:00:00"
+        assert attributes["last_update"] == "2024-03-01T09:40:00"
+
+    def test_humidity_only(self):
+        """Test a room with only a humidity sensor."""
+        series = EnvironmentSeries([])
+        series.add(datetime(2024, 3, 1, 9, 0), {"humidity": 70})
+        storage = MagicMock()
+        storage.get_environment.return_value = series
+        storage.get_time_in_range.return_value = {}
+
+        sensor = EnvironmentalConditionsSensor("TestBaby", storage, {})
+
+        assert sensor.native_value == "70%"
+        attributes = sensor.extra_state_attributes
+        assert "room_temperature" not in attributes
+        assert attributes["humidity_status"] == "too_humid"
+
+    def test_not_monitored(self):
+        """Test the state before any reading."""
+        storage = MagicMock()
+        storage.get_environment.return_value = EnvironmentSeries([])
+
+        assert EnvironmentalConditionsSensor("TestBaby", storage, {}).native_value == "Not monitored"
+
+
+class TestGrowthPercentileSensor:
+    """Test GrowthPercentileSensor."""
+
+    @pytest.fixture
+    def mock_storage(self):
+        """Create mock storage with newest-first weights and heights."""
+        storage = MagicMock()
+        measurements = {
+            ACTIVITY_WEIGHT: [
+                {"timestamp": "2024-01-01T10:00:00", "data": {"weight": 3.3464}},
+                {"timestamp": "2023-12-31T10:00:00", "data": {"weight": 9.9}},
+            ],
+            ACTIVITY_HEIGHT: [
+                {"timestamp": "2024-01-01T10:00:00", "data": {"height": 49.8842}},
+            ],
+        }
+        storage.get_activities_by_type.side_effect = (
+            lambda activity_type, limit=None: measurements[activity_type][:limit]
+        )
+        return storage
+
+    def test_uses_latest_measurement(self, mock_storage):
+        """Test that the newest weight is scored against the WHO median."""
+        sensor = GrowthPercentileSensor(
+            "TestBaby", mock_storage, {"birth_date": "2024-01-01", "sex": "male"}
+        )
+
+        assert sensor.native_value == 50.0
+        attributes = sensor.extra_state_attributes
+        assert attributes["latest_weight_kg"] == 3.3464
+        assert attributes["length_for_age_percentile"] == 50.0
+        assert attributes["age_days"] == 0
+
+    def test_requires_birth_profile(self, mock_storage):
+        """Test that no percentile is reported without birth date and sex."""
+        sensor = GrowthPercentileSensor("TestBaby", mock_storage, {})
+
+        assert sensor.native_value is None
+        assert "birth date" in sensor.extra_state_attributes["note"]
+
+
+class TestRecorderWrites:
+    """Test attribute budget and write deduplication."""
+
+    @pytest.fixture
+    def sensor(self):
+        """Create sensor instance."""
+        storage = MagicMock()
+        storage.get_activities_by_type.return_value = [
+            {
+                "type": ACTIVITY_TEMPERATURE,
+                "timestamp": datetime.now().isoformat(),
+                "data": {"temperature": 37.5, "notes": "x" * 10000}
+            }
+        ]
+        return CurrentTemperatureSensor("TestBaby", storage, {})
+
+    def test_notes_are_not_recorded(self, sensor):
+        """Test that free text and derived attributes are excluded."""
+        assert {"notes", "time_ago"} <= sensor._unrecorded_attributes
+
+    def test_attributes_stay_within_budget(self, sensor):
+        """Test that oversized attributes are shortened."""
+        attrs = sensor.extra_state_attributes
+
+        assert len(attrs["notes"]) == MAX_ATTRIBUTE_STRING_LENGTH
+        assert attrs["truncated"] is True
+        assert "last_recorded" in attrs
+
+
 class TestSensorIntegration:
     """Integration tests for sensors."""
 
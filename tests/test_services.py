@@ -0,0 +1,328 @@
+"""Tests for services.py"""
+from __future__ import annotations
+
+import pytest
+import voluptuous as vol
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.babymonitor.const import (
+    ACTIVITY_CAREGIVER,
+    ACTIVITY_DIAPER_CHANGE,
+    ACTIVITY_ENVIRONMENTAL,
+    ACTIVITY_FEEDING,
+    ACTIVITY_SLEEP,
+    DATA_BABIES,
+    DOMAIN,
+    SERVICE_LOG_BATCH,
+    SERVICE_QUERY,
+)
+from custom_components.babymonitor.dedupe import LogDeduplicator
+from custom_components.babymonitor.services import (
+    SERVICE_LOG_BATCH_SCHEMA,
+    SERVICE_QUERY_SCHEMA,
+    _add_sleep_duration,
+    async_setup_services,
+)
+from custom_components.babymonitor.util import baby_key
+
+
+def _handler(hass, service):
+    """Return the handler registered for a service."""
+    for call in hass.services.async_register.call_args_list:
+        if call.args[1] == service:
+            return call.args[2]
+    raise KeyError(service)
+
+
+class TestLogBatch:
+    """Test the log_batch service."""
+
+    def test_items_use_per_type_schemas(self):
+        """Test that each item is validated and filled in by its own schema."""
+        data = SERVICE_LOG_BATCH_SCHEMA({
+            "baby_name": "Anika",
+            "activities": [
+                {"type": ACTIVITY_DIAPER_CHANGE, "diaper_type": "wet"},
+                {"type": ACTIVITY_FEEDING, "feeding_type": "bottle", "feeding_amount": 90},
+            ],
+        })
+
+        assert data["activities"] == [
+            (ACTIVITY_DIAPER_CHANGE, {"diaper_type": "wet", "notes": ""}),
+            (
+                ACTIVITY_FEEDING,
+                {"feeding_type": "bottle", "feeding_amount": 90, "feeding_duration": 0, "notes": ""},
+            ),
+        ]
+
+    def test_missing_room_readings_not_filled(self):
+        """Test that a room reading the caller left out is not stored as 0."""
+        data = SERVICE_LOG_BATCH_SCHEMA({
+            "baby_name": "Anika",
+            "activities": [{"type": ACTIVITY_ENVIRONMENTAL, "humidity": 50}],
+        })
+
+        assert data["activities"] == [(ACTIVITY_ENVIRONMENTAL, {"humidity": 50, "notes": ""})]
+
+    @pytest.mark.parametrize(
+        "item",
+        [
+            {"type": ACTIVITY_FEEDING},
+            {"type": "unknown"},
+            {"diaper_type": "wet"},
+            {"type": ACTIVITY_DIAPER_CHANGE, "diaper_type": "soggy"},
+        ],
+    )
+    def test_invalid_items_rejected(self, item):
+        """Test that one invalid item rejects the whole batch."""
+        with pytest.raises(vol.Invalid):
+            SERVICE_LOG_BATCH_SCHEMA({
+                "baby_name": "Anika",
+                "activities": [{"type": ACTIVITY_DIAPER_CHANGE, "diaper_type": "wet"}, item],
+            })
+
+    @pytest.mark.asyncio
+    async def test_single_save_and_refresh(self, mock_hass):
+        """Test that a batch is stored and refreshed once."""
+        storage = MagicMock()
+        storage.async_add_activities = AsyncMock()
+        mock_hass.data = {
+            DOMAIN: {
+                DATA_BABIES: {
+                    baby_key("Anika"): {
+                        "storage": storage,
+                        "deduplicator": LogDeduplicator(10),
+                    }
+                }
+            }
+        }
+        await async_setup_services(mock_hass)
+
+        call = MagicMock()
+        call.data = SERVICE_LOG_BATCH_SCHEMA({
+            "baby_name": "Anika",
+            "activities": [
+                {"type": ACTIVITY_DIAPER_CHANGE, "diaper_type": "both"},
+                {"type": ACTIVITY_CAREGIVER, "caregiver_name": "Dad"},
+            ],
+        })
+        with patch(
+            "custom_components.babymonitor.services._update_sensors", new_callable=AsyncMock
+        ) as mock_update:
+            await _handler(mock_hass, SERVICE_LOG_BATCH)(call)
+
+        storage.async_add_activities.assert_awaited_once_with([
+            (ACTIVITY_DIAPER_CHANGE, {"diaper_type": "both", "notes": ""}),
+            (ACTIVITY_CAREGIVER, {"caregiver_name": "Dad", "notes": ""}),
+        ])
+        mock_update.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_sleep_end_uses_start_in_batch(self, mock_hass):
+        """Test that an end after a start in the same batch measures from that start."""
+        storage = MagicMock()
+        storage.async_add_activities = AsyncMock()
+        storage.get_activities_by_type.return_value = [
+            {"timestamp": "2024-03-01T08:00:00", "data": {"sleep_type": "start"}}
+        ]
+        mock_hass.data = {
+            DOMAIN: {
+                DATA_BABIES: {
+                    baby_key("Anika"): {
+                        "storage": storage,
+                        "deduplicator": LogDeduplicator(10),
+                    }
+                }
+            }
+        }
+        await async_setup_services(mock_hass)
+
+        call = MagicMock()
+        call.data = SERVICE_LOG_BATCH_SCHEMA({
+            "baby_name": "Anika",
+            "activities": [
+                {"type": ACTIVITY_SLEEP, "sleep_type": "end"},
+                {"type": ACTIVITY_SLEEP, "sleep_type": "start"},
+                {"type": ACTIVITY_SLEEP, "sleep_type": "end"},
+            ],
+        })
+        with patch(
+            "custom_components.babymonitor.services._update_sensors", new_callable=AsyncMock
+        ), patch(
+            "custom_components.babymonitor.services.local_now",
+            return_value=datetime(2024, 3, 1, 10, 0),
+        ):
+            await _handler(mock_hass, SERVICE_LOG_BATCH)(call)
+
+        activities = storage.async_add_activities.call_args.args[0]
+        assert [data.get("duration") for _, data in activities] == [120, None, 0]
+
+
+class TestDuplicateRequests:
+    """Test that repeated log requests are dropped."""
+
+    @pytest.fixture
+    async def log_batch(self, mock_hass):
+        """Set up services and return the log_batch handler and storage."""
+        storage = MagicMock()
+        storage.async_add_activities = AsyncMock()
+        mock_hass.data = {
+            DOMAIN: {
+                DATA_BABIES: {
+                    baby_key("Anika"): {
+                        "storage": storage,
+                        "deduplicator": LogDeduplicator(10),
+                    }
+                }
+            }
+        }
+        await async_setup_services(mock_hass)
+        return _handler(mock_hass, SERVICE_LOG_BATCH), storage
+
+    def _call(self, request_id=None, diaper_type="wet"):
+        """Create a log_batch call."""
+        call = MagicMock()
+        data = {
+            "baby_name": "Anika",
+            "activities": [{"type": ACTIVITY_DIAPER_CHANGE, "diaper_type": diaper_type}],
+        }
+        if request_id:
+            data["request_id"] = request_id
+        call.data = SERVICE_LOG_BATCH_SCHEMA(data)
+        return call
+
+    @pytest.mark.asyncio
+    async def test_identical_payload_dropped(self, log_batch):
+        """Test that a double tap is stored once."""
+        handler, storage = log_batch
+        with patch(
+            "custom_components.babymonitor.services._update_sensors", new_callable=AsyncMock
+        ):
+            await handler(self._call())
+            await handler(self._call())
+            await handler(self._call(diaper_type="dirty"))
+
+        assert storage.async_add_activities.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_request_id_replay_dropped(self, log_batch):
+        """Test that a retried request id is stored once."""
+        handler, storage = log_batch
+        with patch(
+            "custom_components.babymonitor.services._update_sensors", new_callable=AsyncMock
+        ):
+            await handler(self._call("nfc-1"))
+            await handler(self._call("nfc-1", diaper_type="dirty"))
+            await handler(self._call("nfc-2"))
+
+        assert storage.async_add_activities.await_count == 2
+
+    @pytest.mark.parametrize("request_id", [None, "nfc-1"])
+    @pytest.mark.asyncio
+    async def test_failed_request_can_be_retried(self, log_batch, request_id):
+        """Test that a request whose handler failed is not a duplicate."""
+        handler, storage = log_batch
+        storage.async_add_activities.side_effect = [OSError("disk full"), None]
+        with patch(
+            "custom_components.babymonitor.services._update_sensors", new_callable=AsyncMock
+        ):
+            with pytest.raises(OSError):
+                await handler(self._call(request_id))
+            await handler(self._call(request_id))
+
+        assert storage.async_add_activities.await_count == 2
+
+
+class TestQuery:
+    """Test the query service."""
+
+    @pytest.fixture
+    async def query(self, mock_hass):
+        """Set up services with a mocked storage and return the handler."""
+        storage = MagicMock()
+        storage.query.return_value = {"count": 2}
+        mock_hass.data = {DOMAIN: {DATA_BABIES: {baby_key("Anika"): {"storage": storage}}}}
+        await async_setup_services(mock_hass)
+        return _handler(mock_hass, SERVICE_QUERY), storage
+
+    @pytest.mark.asyncio
+    async def test_answers_from_storage(self, query):
+        """Test that each activity type is answered by storage.query."""
+        handler, storage = query
+        call = MagicMock()
+        call.data = SERVICE_QUERY_SCHEMA({
+            "baby_name": "Anika",
+            "activity_types": [ACTIVITY_FEEDING, ACTIVITY_DIAPER_CHANGE],
+            "field": "feeding_amount",
+            "start": "2026-03-01 00:00:00",
+            "group_by": "day",
+            "aggregates": ["sum", "mean"],
+        })
+
+        response = await handler(call)
+
+        assert response["start"] == "2026-03-01T00:00:00"
+        assert response["results"] == {
+            ACTIVITY_FEEDING: {"count": 2},
+            ACTIVITY_DIAPER_CHANGE: {"count": 2},
+        }
+        storage.query.assert_any_call(
+            ACTIVITY_FEEDING,
+            "feeding_amount",
+            datetime(2026, 3, 1),
+            None,
+            "day",
+            ("sum", "mean"),
+            500,
+        )
+
+    @pytest.mark.asyncio
+    async def test_value_aggregates_need_a_field(self, query):
+        """Test that sums and means without a field are rejected."""
+        handler, _ = query
+        call = MagicMock()
+        call.data = SERVICE_QUERY_SCHEMA({
+            "baby_name": "Anika",
+            "activity_types": ACTIVITY_FEEDING,
+            "aggregates": ["count", "sum"],
+        })
+
+        with pytest.raises(ServiceValidationError):
+            await handler(call)
+
+    @pytest.mark.parametrize(
+        "changes",
+        [{"field": "notes"}, {"group_by": "month"}, {"limit": 501}, {"activity_types": []}],
+    )
+    def test_invalid_queries_rejected(self, changes):
+        """Test schema limits on fields, grouping and result size."""
+        with pytest.raises(vol.Invalid):
+            SERVICE_QUERY_SCHEMA({
+                "baby_name": "Anika",
+                "activity_types": [ACTIVITY_FEEDING],
+                **changes,
+            })
+
+
+
+class TestSleepDuration:
+    """Test the duration added to sleep ends."""
+
+    def test_duration_uses_home_assistant_time_zone(self):
+        """Test that the end time is local_now, not the OS clock."""
+        storage = MagicMock()
+        storage.get_activities_by_type.return_value = [
+            {"timestamp": "2024-03-01T20:00:00", "data": {"sleep_type": "start"}}
+        ]
+        data = {"sleep_type": "end"}
+
+        with patch(
+            "custom_components.babymonitor.services.local_now",
+            return_value=datetime(2024, 3, 1, 21, 30),
+        ):
+            _add_sleep_duration(storage, data)
+
+        assert data["duration"] == 90
@@ -8,9 +8,12 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from custom_components.babymonitor.storage import BabyMonitorStorage
 from custom_components.babymonitor.const import (
     ACTIVITY_DIAPER_CHANGE,
+    ACTIVITY_ENVIRONMENTAL,
     ACTIVITY_FEEDING,
     ACTIVITY_CRYING,
+    ACTIVITY_SLEEP,
     ACTIVITY_TEMPERATURE,
+    ACTIVITY_WEIGHT,
 )
 
 
@@ -231,3 +234,562 @@ class TestBabyMonitorStorage:
         # Should be in descending order (newest first)
         timestamps = [a["timestamp"] for a in activities]
         assert timestamps == sorted(timestamps, reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_today_totals_restored_after_restart(self, mock_hass, mock_storage_load):
+        """Test that today's running totals are rebuilt on load."""
+        now = datetime.now()
+        yesterday = now - timedelta(days=1)
+
+        mock_storage_load.return_value = {
+            "activities": [
+                {
+                    "type": ACTIVITY_FEEDING,
+                    "timestamp": yesterday.isoformat(),
+                    "data": {"feeding_type": "bottle", "feeding_amount": 90}
+                },
+                {
+                    "type": ACTIVITY_FEEDING,
+                    "timestamp": now.isoformat(),
+                    "data": {"feeding_type": "bottle", "feeding_amount": 120}
+                },
+                {
+                    "type": ACTIVITY_DIAPER_CHANGE,
+                    "timestamp": now.isoformat(),
+                    "data": {"diaper_type": "both"}
+                },
+            ],
+            "stats": {},
+        }
+
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+
+        today = storage.get_today_totals()
+        assert today.count(ACTIVITY_FEEDING) == 1
+        assert today.total(ACTIVITY_FEEDING, "feeding_amount") == 120
+        assert today.count_where(ACTIVITY_DIAPER_CHANGE, "wet", "both") == 1
+
+    @pytest.mark.asyncio
+    async def test_today_totals_update_and_roll_over(
+        self, mock_hass, mock_storage_load, mock_storage_save
+    ):
+        """Test that inserts update today's totals and midnight resets them."""
+        mock_storage_load.return_value = None
+
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+        await storage.async_add_activity(ACTIVITY_CRYING, {"duration": 5})
+        await storage.async_add_activity(ACTIVITY_CRYING, {"duration": 10})
+
+        today = storage.get_today_totals()
+        assert today.count(ACTIVITY_CRYING) == 2
+        assert today.total(ACTIVITY_CRYING, "duration") == 15
+
+        tomorrow = datetime.now() + timedelta(days=1)
+        with patch(
+            "custom_components.babymonitor.storage.local_now", return_value=tomorrow
+        ):
+            storage.async_roll_over_day()
+            assert storage.get_today_totals().count(ACTIVITY_CRYING) == 0
+
+    @pytest.mark.asyncio
+    async def test_windows_rebuilt_on_load(self, mock_hass, mock_storage_load):
+        """Test that sliding windows only hold activities inside their span."""
+        now = datetime.now()
+
+        mock_storage_load.return_value = {
+            "activities": [
+                {
+                    "type": ACTIVITY_DIAPER_CHANGE,
+                    "timestamp": (now - timedelta(days=days)).isoformat(),
+                    "data": {"diaper_type": "wet"}
+                }
+                for days in (10, 6, 2)
+            ],
+            "stats": {},
+        }
+
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+
+        window = storage.get_window("diaper_changes_7d")
+        assert window.count == 2
+        assert window.category_count("wet") == 2
+
+    @pytest.mark.asyncio
+    async def test_compare_windows(self, mock_hass, mock_storage_load):
+        """Test period-over-period comparison by time rather than record count."""
+        now = datetime.now()
+
+        mock_storage_load.return_value = {
+            "activities": [
+                {
+                    "type": ACTIVITY_SLEEP,
+                    "timestamp": (now - timedelta(days=days)).isoformat(),
+                    "data": {"sleep_type": sleep_type, "duration": duration}
+                }
+                for days, sleep_type, duration in (
+                    (20, "end", 300),
+                    (12, "end", 120),
+                    (10, "end", 60),
+                    (9, "start", 0),
+                    (3, "end", 40),
+                )
+            ],
+            "stats": {},
+        }
+
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+
+        comparison = storage.compare_windows("sleep_duration", timedelta(days=7))
+        assert comparison["current"]["count"] == 1
+        assert comparison["current"]["mean"] == 40
+        assert comparison["previous"]["count"] == 2
+        assert comparison["previous"]["mean"] == 90
+
+        shifted = storage.compare_windows(
+            "sleep_duration", timedelta(days=7), timedelta(days=14)
+        )
+        assert shifted["previous"]["sum"] == 300
+
+    @pytest.mark.asyncio
+    async def test_feeding_totals(
+        self, mock_hass, mock_storage_load, mock_storage_save
+    ):
+        """Test that feeding averages are kept as feedings are added."""
+        mock_storage_load.return_value = None
+
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+        await storage.async_add_activity(
+            ACTIVITY_FEEDING, {"feeding_type": "bottle", "feeding_amount": 100}
+        )
+        await storage.async_add_activity(
+            ACTIVITY_FEEDING, {"feeding_type": "bottle", "feeding_amount": 60}
+        )
+
+        assert storage.get_feeding_totals().average_amount() == 80
+        assert storage.get_today_totals().total(ACTIVITY_FEEDING, "feeding_amount") == 160
+        assert storage.get_stats()["total_feedings"] == 2
+        assert storage.get_stats()["average_feeding_amount"] == 80
+
+    @pytest.mark.asyncio
+    async def test_add_activities_saves_once(
+        self, mock_hass, mock_storage_load, mock_storage_save
+    ):
+        """Test that a batch is added with one save and one notification."""
+        mock_storage_load.return_value = None
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+        listener = MagicMock()
+        storage.async_add_listener(listener)
+
+        await storage.async_add_activities([
+            (ACTIVITY_DIAPER_CHANGE, {"diaper_type": "wet"}),
+            (ACTIVITY_FEEDING, {"feeding_type": "bottle", "feeding_amount": 120}),
+        ])
+
+        assert mock_storage_save.await_count == 1
+        listener.assert_called_once()
+        assert storage.get_stats()["total_diaper_changes"] == 1
+        assert storage.get_stats()["average_feeding_amount"] == 120
+
+    @pytest.mark.asyncio
+    async def test_import_rebuilds_once(
+        self, mock_hass, mock_storage_load, mock_storage_save
+    ):
+        """Test that imported chunks are ordered and stats rebuilt at the end."""
+        mock_storage_load.return_value = None
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+        await storage.async_add_activity(ACTIVITY_DIAPER_CHANGE, {"diaper_type": "wet"})
+
+        storage.import_activities([
+            (ACTIVITY_SLEEP, "2023-05-02T07:00:00", {"sleep_type": "end", "duration": 90}),
+            (ACTIVITY_FEEDING, "2023-05-01T09:00:00", {"feeding_type": "bottle", "feeding_amount": 80}),
+        ])
+        storage.import_activities([
+            (ACTIVITY_DIAPER_CHANGE, "2023-05-01T08:00:00", {"diaper_type": "dirty"}),
+        ])
+        assert mock_storage_save.await_count == 1
+
+        await storage.async_finish_import()
+
+        assert mock_storage_save.await_count == 2
+        timestamps = [activity["timestamp"] for activity in storage._data["activities"]]
+        assert timestamps == sorted(timestamps)
+        stats = storage.get_stats()
+        assert stats["total_diaper_changes"] == 2
+        assert stats["total_feedings"] == 1
+        assert stats["last_feeding"] == "2023-05-01T09:00:00"
+        assert stats["average_sleep_duration"] == 90
+        assert stats["average_feeding_amount"] == 80
+
+    @pytest.mark.asyncio
+    async def test_average_sleep_duration_is_running(
+        self, mock_hass, mock_storage_load, mock_storage_save
+    ):
+        """Test that the average sleep duration doesn't read the duration column."""
+        mock_storage_load.return_value = {
+            "activities": [
+                {
+                    "type": ACTIVITY_SLEEP,
+                    "timestamp": "2024-03-01T07:00:00",
+                    "data": {"sleep_type": "end", "duration": 60},
+                }
+            ],
+            "stats": {"total_sleep_sessions": 1},
+        }
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+
+        with patch.object(storage, "get_columns") as mock_columns:
+            await storage.async_add_activity(ACTIVITY_SLEEP, {"sleep_type": "start"})
+            await storage.async_add_activity(ACTIVITY_SLEEP, {"sleep_type": "end", "duration": 90})
+
+        mock_columns.assert_not_called()
+        assert storage.get_stats()["average_sleep_duration"] == 75
+
+    @pytest.mark.asyncio
+    async def test_iter_activity_chunks(self, mock_hass, mock_storage_load):
+        """Test chunked iteration filtered by type and time range."""
+        mock_storage_load.return_value = {
+            "activities": [
+                {
+                    "type": ACTIVITY_FEEDING if hour % 2 else ACTIVITY_DIAPER_CHANGE,
+                    "timestamp": datetime(2024, 3, 1, hour).isoformat(),
+                    "data": {}
+                }
+                for hour in range(10)
+            ],
+            "stats": {},
+        }
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+
+        chunks = list(storage.iter_activity_chunks(3))
+        assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+
+        chunks = list(storage.iter_activity_chunks(
+            3,
+            {ACTIVITY_FEEDING},
+            datetime(2024, 3, 1, 2),
+            datetime(2024, 3, 1, 7),
+        ))
+        assert [
+            [datetime.fromisoformat(activity["timestamp"]).hour for activity in chunk]
+            for chunk in chunks
+        ] == [[3, 5, 7]]
+
+    @pytest.mark.asyncio
+    async def test_query_counts_and_values(self, mock_hass, mock_storage_load):
+        """Test queries over record counts and a value field."""
+        mock_storage_load.return_value = {
+            "activities": [
+                {
+                    "type": ACTIVITY_FEEDING,
+                    "timestamp": datetime(2024, 3, day, 9).isoformat(),
+                    "data": {"feeding_amount": 100 + day} if day % 2 else {}
+                }
+                for day in range(1, 5)
+            ],
+            "stats": {},
+        }
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+
+        assert storage.query(ACTIVITY_FEEDING, None)["count"] == 4
+        result = storage.query(
+            ACTIVITY_FEEDING, "feeding_amount", group_by="day", aggregates=("sum",)
+        )
+        assert result["sum"] == 204
+        assert [bucket["start"] for bucket in result["buckets"]] == [
+            "2024-03-01T00:00:00",
+            "2024-03-03T00:00:00",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_room_readings_queried_and_exported(self, mock_hass, mock_storage_load):
+        """Test that query and export read room readings from the series."""
+        mock_storage_load.return_value = {
+            "activities": [
+                {
+                    "type": ACTIVITY_FEEDING,
+                    "timestamp": datetime(2024, 3, 1, 9, 7).isoformat(),
+                    "data": {}
+                }
+            ],
+            "stats": {},
+            "environment": [
+                {
+                    "start": datetime(2024, 3, 1, 9, minute).isoformat(),
+                    "last_reading": datetime(2024, 3, 1, 9, minute).isoformat(),
+                    "humidity": [2, 80 + 2 * minute, 0, 0],
+                }
+                for minute in (0, 5, 10)
+            ],
+        }
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+        
+        result = storage.query(ACTIVITY_ENVIRONMENTAL, "humidity", aggregates=("count", "max"))
+        assert result["count"] == 3
+        assert result["max"] == 50.0
+        
+        chunks = list(storage.iter_activity_chunks(2, start=datetime(2024, 3, 1, 9, 5)))
+        assert [[activity["type"] for activity in chunk] for chunk in chunks] == [
+            [ACTIVITY_ENVIRONMENTAL, ACTIVITY_FEEDING],
+            [ACTIVITY_ENVIRONMENTAL],
+        ]
+        assert chunks[0][0]["data"] == {"humidity": 45.0}
+    
+    @pytest.mark.asyncio
+    async def test_environment_readings_are_downsampled(
+        self, mock_hass, mock_storage_load, mock_storage_save
+    ):
+        """Test that room readings go to the series with a delayed write."""
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+        
+        with patch(
+            "homeassistant.helpers.storage.Store.async_delay_save"
+        ) as mock_delay_save:
+            for temperature in (20.0, 22.0):
+                await storage.async_add_activity(
+                    ACTIVITY_ENVIRONMENTAL, {"room_temperature": temperature, "humidity": 45}
+                )
+        
+        assert storage.get_activities_by_type(ACTIVITY_ENVIRONMENTAL) == []
+        assert storage.get_environment().latest()["room_temperature"]["mean"] == 21.0
+        assert mock_delay_save.call_count == 2
+        mock_storage_save.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_environment_listeners(self, mock_hass, mock_storage_load):
+        """Test that room readings notify environment listeners only."""
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+        environment_listener = MagicMock()
+        activity_listener = MagicMock()
+        remove = storage.async_add_environment_listener(environment_listener)
+        storage.async_add_listener(activity_listener)
+        
+        with patch("homeassistant.helpers.storage.Store.async_delay_save"):
+            storage.async_add_environment_reading({"humidity": 50})
+            remove()
+            storage.async_add_environment_reading({"humidity": 52})
+        
+        environment_listener.assert_called_once()
+        activity_listener.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_environment_activities_moved_on_load(
+        self, mock_hass, mock_storage_load, mock_storage_save
+    ):
+        """Test that stored environmental activities become series buckets."""
+        mock_storage_load.return_value = {
+            "activities": [
+                {
+                    "type": ACTIVITY_ENVIRONMENTAL,
+                    "timestamp": datetime(2024, 3, 1, 9, minute).isoformat(),
+                    "data": {"room_temperature": 20 + minute}
+                }
+                for minute in range(3)
+            ] + [
+                {
+                    "type": ACTIVITY_FEEDING,
+                    "timestamp": datetime(2024, 3, 1, 10).isoformat(),
+                    "data": {"feeding_amount": 100}
+                }
+            ],
+            "stats": {},
+        }
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+        
+        assert [activity["type"] for activity in storage._data["activities"]] == [ACTIVITY_FEEDING]
+        assert storage._data["environment"] == [
+            {
+                "start": "2024-03-01T09:00:00",
+                "last_reading": "2024-03-01T09:02:00",
+                "room_temperature": [3, 63, 20, 22],
+            }
+        ]
+        mock_storage_save.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_moved_environment_readings_kept_past_retention(
+        self, mock_hass, mock_storage_load, mock_storage_save
+    ):
+        """Test that old environmental activities survive the move and later readings."""
+        mock_storage_load.return_value = {
+            "activities": [
+                {
+                    "type": ACTIVITY_ENVIRONMENTAL,
+                    "timestamp": datetime(2023, month, 1, 9).isoformat(),
+                    "data": {"humidity": 50}
+                }
+                for month in (1, 6)
+            ],
+            "stats": {},
+        }
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+        
+        with patch(
+            "custom_components.babymonitor.storage.local_now",
+            return_value=datetime(2024, 3, 1, 9),
+        ), patch("homeassistant.helpers.storage.Store.async_delay_save"):
+            storage.async_add_environment_reading({"humidity": 45})
+        
+        assert [bucket["start"] for bucket in storage._data["environment"]] == [
+            "2023-01-01T09:00:00",
+            "2023-06-01T09:00:00",
+            "2024-03-01T09:00:00",
+        ]
+        assert storage._data["environment_keep_before"] == "2023-06-01T09:00:00"
+    
+    @pytest.mark.asyncio
+    async def test_time_in_range_rebuilt_on_load(self, mock_hass, mock_storage_load):
+        """Test that the last week of room buckets is replayed on load."""
+        mock_storage_load.return_value = {
+            "activities": [],
+            "stats": {},
+            "environment": [
+                {
+                    "start": datetime(2024, 3, 1, 9, minute).isoformat(),
+                    "last_reading": datetime(2024, 3, 1, 9, minute).isoformat(),
+                    "humidity": [1, 50 if minute < 30 else 70, 0, 0],
+                }
+                for minute in range(0, 60, 5)
+            ],
+        }
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        with patch(
+            "custom_components.babymonitor.storage.local_now",
+            return_value=datetime(2024, 3, 1, 10, 0),
+        ):
+            await storage.async_load()
+            summary = storage.get_time_in_range()["humidity"]["today"]
+        
+        assert summary["in_range"] == 50.0
+        assert summary["longest_excursion"] == 30
+    
+    @pytest.mark.asyncio
+    async def test_growth_trend_follows_inserts(
+        self, mock_hass, mock_storage_load, mock_storage_save
+    ):
+        """Test that the weight trend is updated when a weight is logged."""
+        start = datetime.now() - timedelta(days=10)
+        mock_storage_load.return_value = {
+            "activities": [
+                {
+                    "id": f"w{day}",
+                    "type": ACTIVITY_WEIGHT,
+                    "timestamp": (start + timedelta(days=day)).isoformat(),
+                    "data": {"weight": 4.0 + 0.03 * day}
+                }
+                for day in (0, 2, 4)
+            ],
+            "stats": {},
+        }
+
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+        trend = storage.get_growth_trend(ACTIVITY_WEIGHT, "weight", 30)
+        assert trend.slope == pytest.approx(0.03)
+
+        await storage.async_add_activity(ACTIVITY_WEIGHT, {"weight": 4.3})
+        assert trend.count == 4
+        assert trend.slope == pytest.approx(0.03)
+        assert storage.get_growth_trend(ACTIVITY_WEIGHT, "weight", 30) is trend
+
+    @pytest.mark.asyncio
+    async def test_analytics_built_on_first_use(
+        self, mock_hass, mock_storage_load, mock_storage_save
+    ):
+        """Test that windows and indexes are only maintained once requested."""
+        mock_storage_load.return_value = None
+
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+        await storage.async_add_activity(ACTIVITY_DIAPER_CHANGE, {"diaper_type": "wet"})
+
+        assert storage._windows == {}
+        assert storage._indexes == {}
+        assert storage._feeding_model is None
+
+        assert storage.get_window("diaper_changes_7d").count == 1
+        assert list(storage._windows) == ["diaper_changes_7d"]
+
+        await storage.async_add_activity(ACTIVITY_DIAPER_CHANGE, {"diaper_type": "dirty"})
+        assert storage.get_window("diaper_changes_7d").count == 2
+        assert len(storage.get_index("diaper_changes")) == 2
+
+    @pytest.mark.asyncio
+    async def test_get_activities_between(self, mock_hass, mock_storage_load):
+        """Test the half-open time range used for statistics imports."""
+        mock_storage_load.return_value = {
+            "activities": [
+                {
+                    "type": ACTIVITY_FEEDING,
+                    "timestamp": f"2026-03-01T{hour:02d}:00:00",
+                    "data": {}
+                }
+                for hour in (6, 9, 12)
+            ],
+            "stats": {},
+        }
+
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+
+        assert len(storage.get_activities_between(None, "2026-03-01T12:00:00")) == 2
+        between = storage.get_activities_between(
+            "2026-03-01T09:00:00", "2026-03-01T13:00:00"
+        )
+        assert [a["timestamp"][11:13] for a in between] == ["09", "12"]
+
+    @pytest.mark.asyncio
+    async def test_latest_activity_per_type(
+        self, mock_hass, mock_storage_load, mock_storage_save
+    ):
+        """Test that the newest activity of each type is kept on load and add."""
+        mock_storage_load.return_value = {
+            "activities": [
+                {
+                    "type": "bath",
+                    "timestamp": f"2026-03-0{day}T19:00:00",
+                    "data": {"bath_type": "full_bath"}
+                }
+                for day in (1, 2)
+            ],
+            "stats": {},
+        }
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+
+        assert storage.get_latest_activity("bath")["timestamp"] == "2026-03-02T19:00:00"
+        assert storage.get_latest_activity(ACTIVITY_FEEDING) is None
+
+        await storage.async_add_activity("bath", {"bath_type": "sponge_bath"})
+        assert storage.get_latest_activity("bath")["data"] == {"bath_type": "sponge_bath"}
+
+    @pytest.mark.asyncio
+    async def test_statistics_progress_saved_later(
+        self, mock_hass, mock_storage_load, mock_storage_save
+    ):
+        """Test that statistics progress is batched with a delayed write."""
+        storage = BabyMonitorStorage(mock_hass, "TestBaby")
+        await storage.async_load()
+
+        with patch(
+            "homeassistant.helpers.storage.Store.async_delay_save"
+        ) as mock_delay_save:
+            storage.async_set_statistics_progress("2026-03-01T12:00:00", {"feedings": 3})
+
+        assert storage.get_statistics_progress()["sums"] == {"feedings": 3}
+        mock_delay_save.assert_called_once()
+        mock_storage_save.assert_not_called()
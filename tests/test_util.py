@@ -0,0 +1,34 @@
+"""Tests for util.py and baby lookup."""
+from __future__ import annotations
+
+import pytest
+from unittest.mock import MagicMock
+
+from custom_components.babymonitor.const import DATA_BABIES, DOMAIN
+from custom_components.babymonitor.services import _get_storage_for_baby
+from custom_components.babymonitor.util import baby_id, baby_key
+
+
+class TestBabyNames:
+    """Test baby name helpers."""
+
+    def test_baby_id_keeps_existing_form(self):
+        """Test that ids match the unique ids entities were created with."""
+        assert baby_id("Anika") == "anika"
+        assert baby_id("Baby  Boy") == "baby__boy"
+
+    def test_baby_key_ignores_case_and_spacing(self):
+        """Test that lookup keys normalize case and whitespace."""
+        assert baby_key("Anika") == baby_key(" anika ")
+        assert baby_key("Baby  Boy") == baby_key("baby boy") == "baby_boy"
+
+    @pytest.mark.asyncio
+    async def test_service_lookup(self, mock_hass):
+        """Test that services find a baby regardless of case and spacing."""
+        storage = MagicMock()
+        mock_hass.data = {
+            DOMAIN: {DATA_BABIES: {baby_key("Baby Boy"): {"storage": storage}}}
+        }
+
+        assert await _get_storage_for_baby(mock_hass, "baby  BOY") is storage
+        assert await _get_storage_for_baby(mock_hass, "Anika") is None
@@ -0,0 +1,16 @@
+"""Helpers shared across the Baby Monitor integration."""
+from __future__ import annotations
+
+
+def baby_id(baby_name: str) -> str:
+    """Return the id used in unique ids and storage keys for a baby.
+
+    Existing entities and storage files are keyed by this exact form, so it
+    must not change.
+    """
+    return baby_name.lower().replace(" ", "_")
+
+
+def baby_key(baby_name: str) -> str:
+    """Return the lookup key for a baby name, ignoring case and spacing."""
+    return "_".join(baby_name.casefold().split())
@@ -0,0 +1,504 @@
+"""WHO Child Growth Standards LMS parameters.
+
+Box-Cox (L), median (M) and coefficient of variation (S) values from the WHO
+Child Growth Standards (2006). Age tables are keyed by age in days: weekly
+rows for the first 13 weeks, then monthly rows from 4 months, converted with
+the WHO month length of 30.4375 days. Weight-for-length is keyed by
+recumbent length in cm. Length-for-age covers birth to 24 months (recumbent
+length), weight-for-age birth to 60 months. Rows are (key, L, M, S).
+"""
+
+WEIGHT_FOR_AGE = {
+    "male": (
+        (0, 0.3487, 3.3464, 0.14602),
+        (7, 0.2776, 3.4879, 0.14483),
+        (14, 0.2581, 3.7529, 0.14142),
+        (21, 0.2442, 4.0603, 0.13807),
+        (28, 0.2331, 4.3671, 0.13497),
+        (35, 0.2237, 4.6590, 0.13215),
+        (42, 0.2155, 4.9303, 0.12960),
+        (49, 0.2081, 5.1817, 0.12729),
+        (56, 0.2014, 5.4149, 0.12520),
+        (63, 0.1952, 5.6319, 0.12330),
+        (70, 0.1894, 5.8346, 0.12157),
+        (77, 0.1840, 6.0242, 0.12001),
+        (84, 0.1789, 6.2019, 0.11860),
+        (91, 0.1740, 6.3690, 0.11732),
+        (122, 0.1553, 7.0023, 0.11316),
+        (152, 0.1395, 7.5105, 0.1108),
+        (183, 0.1257, 7.934, 0.10958),
+        (213, 0.1134, 8.297, 0.10902),
+        (244, 0.1021, 8.6151, 0.10882),
+        (274, 0.0917, 8.9014, 0.10881),
+        (304, 0.082, 9.1649, 0.10891),
+        (335, 0.073, 9.4122, 0.10906),
+        (365, 0.0644, 9.6479, 0.10925),
+        (396, 0.0563, 9.8749, 0.10949),
+        (426, 0.0487, 10.0953, 0.10976),
+        (457, 0.0413, 10.3108, 0.11007),
+        (487, 0.0343, 10.5228, 0.11041),
+        (517, 0.0275, 10.7319, 0.11079),
+        (548, 0.0211, 10.9385, 0.11119),
+        (578, 0.0148, 11.143, 0.11164),
+        (609, 0.0087, 11.3462, 0.11211),
+        (639, 0.0029, 11.5486, 0.11261),
+        (670, -0.0028, 11.7504, 0.11314),
+        (700, -0.0083, 11.9514, 0.11369),
+        (730, -0.0137, 12.1515, 0.11426),
+        (761, -0.0189, 12.3502, 0.11485),
+        (791, -0.024, 12.5466, 0.11544),
+        (822, -0.0289, 12.7401, 0.11604),
+        (852, -0.0337, 12.9303, 0.11664),
+        (883, -0.0385, 13.1169, 0.11723),
+        (913, -0.0431, 13.3, 0.11781),
+        (944, -0.0476, 13.4798, 0.11839),
+        (974, -0.052, 13.6567, 0.11896),
+        (1004, -0.0564, 13.8309, 0.11953),
+        (1035, -0.0606, 14.0031, 0.12008),
+        (1065, -0.0648, 14.1736, 0.12062),
+        (1096, -0.0689, 14.3429, 0.12116),
+        (1126, -0.0729, 14.5113, 0.12168),
+        (1157, -0.0769, 14.6791, 0.1222),
+        (1187, -0.0808, 14.8466, 0.12271),
+        (1218, -0.0846, 15.014, 0.12322),
+        (1248, -0.0883, 15.1813, 0.12373),
+        (1278, -0.092, 15.3486, 0.12425),
+        (1309, -0.0957, 15.5158, 0.12478),
+        (1339, -0.0993, 15.6828, 0.12531),
+        (1370, -0.1028, 15.8497, 0.12586),
+        (1400, -0.1063, 16.0163, 0.12643),
+        (1431, -0.1097, 16.1827, 0.127),
+        (1461, -0.1131, 16.3489, 0.12759),
+        (1491, -0.1165, 16.515, 0.12819),
+        (1522, -0.1198, 16.6811, 0.1288),
+        (1552, -0.123, 16.8471, 0.12943),
+        (1583, -0.1262, 17.0132, 0.13005),
+        (1613, -0.1294, 17.1792, 0.13069),
+        (1644, -0.1325, 17.3452, 0.13133),
+        (1674, -0.1356, 17.5111, 0.13197),
+        (1704, -0.1387, 17.6768, 0.13261),
+        (1735, -0.1417, 17.8422, 0.13325),
+        (1765, -0.1447, 18.0073, 0.13389),
+        (1796, -0.1477, 18.1722, 0.13453),
+        (1826, -0.1506, 18.3366, 0.13517),
+    ),
+    "female": (
+        (0, 0.3809, 3.2322, 0.14171),
+        (7, 0.2671, 3.3388, 0.14600),
+        (14, 0.2304, 3.5693, 0.14339),
+        (21, 0.2024, 3.8352, 0.14060),
+        (28, 0.1789, 4.0987, 0.13805),
+        (35, 0.1582, 4.3476, 0.13583),
+        (42, 0.1395, 4.5793, 0.13392),
+        (49, 0.1224, 4.7950, 0.13228),
+        (56, 0.1065, 4.9959, 0.13087),
+        (63, 0.0918, 5.1842, 0.12966),
+        (70, 0.0779, 5.3618, 0.12861),
+        (77, 0.0648, 5.5295, 0.12770),
+        (84, 0.0525, 5.6883, 0.12691),
+        (91, 0.0407, 5.8393, 0.12622),
+        (122, -0.005, 6.4237, 0.12402),
+        (152, -0.043, 6.8985, 0.12274),
+        (183, -0.0756, 7.297, 0.12204),
+        (213, -0.1039, 7.6422, 0.12178),
+        (244, -0.1288, 7.9487, 0.12181),
+        (274, -0.1507, 8.2254, 0.12199),
+        (304, -0.17, 8.48, 0.12223),
+        (335, -0.1872, 8.7192, 0.12247),
+        (365, -0.2024, 8.9481, 0.12268),
+        (396, -0.2158, 9.1699, 0.12283),
+        (426, -0.2278, 9.387, 0.12294),
+        (457, -0.2384, 9.6008, 0.12299),
+        (487, -0.2478, 9.8124, 0.12303),
+        (517, -0.2562, 10.0226, 0.12306),
+        (548, -0.2637, 10.2315, 0.12309),
+        (578, -0.2703, 10.4393, 0.12315),
+        (609, -0.2762, 10.6464, 0.12323),
+        (639, -0.2815, 10.8534, 0.12335),
+        (670, -0.2862, 11.0608, 0.1235),
+        (700, -0.2903, 11.2688, 0.12369),
+        (730, -0.2941, 11.4775, 0.1239),
+        (761, -0.2975, 11.6864, 0.12414),
+        (791, -0.3005, 11.8947, 0.12441),
+        (822, -0.3032, 12.1015, 0.12472),
+        (852, -0.3057, 12.3059, 0.12506),
+        (883, -0.308, 12.5073, 0.12545),
+        (913, -0.3101, 12.7055, 0.12587),
+        (944, -0.312, 12.9006, 0.12633),
+        (974, -0.3138, 13.093, 0.12683),
+        (1004, -0.3155, 13.2837, 0.12737),
+        (1035, -0.3171, 13.4731, 0.12794),
+        (1065, -0.3186, 13.6618, 0.12855),
+        (1096, -0.3201, 13.8503, 0.12919),
+        (1126, -0.3216, 14.0385, 0.12988),
+        (1157, -0.323, 14.2265, 0.13059),
+        (1187, -0.3243, 14.414, 0.13135),
+        (1218, -0.3257, 14.601, 0.13213),
+        (1248, -0.327, 14.7873, 0.13293),
+        (1278, -0.3283, 14.9727, 0.13376),
+        (1309, -0.3296, 15.1573, 0.1346),
+        (1339, -0.3309, 15.341, 0.13545),
+        (1370, -0.3322, 15.524, 0.1363),
+        (1400, -0.3335, 15.7064, 0.13716),
+        (1431, -0.3348, 15.8882, 0.138),
+        (1461, -0.3361, 16.0697, 0.13884),
+        (1491, -0.3374, 16.2511, 0.13968),
+        (1522, -0.3387, 16.4322, 0.14051),
+        (1552, -0.34, 16.6133, 0.14132),
+        (1583, -0.3414, 16.7942, 0.14213),
+        (1613, -0.3427, 16.9748, 0.14293),
+        (1644, -0.344, 17.1551, 0.14371),
+        (1674, -0.3453, 17.3347, 0.14448),
+        (1704, -0.3466, 17.5136, 0.14525),
+        (1735, -0.3479, 17.6916, 0.146),
+        (1765, -0.3492, 17.8686, 0.14675),
+        (1796, -0.3505, 18.0445, 0.14748),
+        (1826, -0.3518, 18.2193, 0.14821),
+    ),
+}
+
+LENGTH_FOR_AGE = {
+    "male": (
+        (0, 1, 49.8842, 0.03795),
+        (7, 1, 51.1152, 0.03723),
+        (14, 1, 52.3461, 0.03652),
+        (21, 1, 53.3905, 0.03609),
+        (28, 1, 54.3881, 0.03570),
+        (35, 1, 55.3374, 0.03534),
+        (42, 1, 56.2357, 0.03501),
+        (49, 1, 57.0851, 0.03470),
+        (56, 1, 57.8889, 0.03442),
+        (63, 1, 58.6536, 0.03416),
+        (70, 1, 59.3872, 0.03392),
+        (77, 1, 60.0894, 0.03369),
+        (84, 1, 60.7605, 0.03348),
+        (91, 1, 61.4013, 0.03329),
+        (122, 1, 63.886, 0.03257),
+        (152, 1, 65.9026, 0.03204),
+        (183, 1, 67.6236, 0.03165),
+        (213, 1, 69.1645, 0.03139),
+        (244, 1, 70.5994, 0.03124),
+        (274, 1, 71.9687, 0.03117),
+        (304, 1, 73.2812, 0.03118),
+        (335, 1, 74.5388, 0.03125),
+        (365, 1, 75.7488, 0.03137),
+        (396, 1, 76.9186, 0.03154),
+        (426, 1, 78.0497, 0.03174),
+        (457, 1, 79.1458, 0.03197),
+        (487, 1, 80.2113, 0.03222),
+        (517, 1, 81.2487, 0.0325),
+        (548, 1, 82.2587, 0.03279),
+        (578, 1, 83.2418, 0.0331),
+        (609, 1, 84.1996, 0.03342),
+        (639, 1, 85.1348, 0.03376),
+        (670, 1, 86.0477, 0.0341),
+        (700, 1, 86.941, 0.03445),
+        (730, 1, 87.8161, 0.03479),
+    ),
+    "female": (
+        (0, 1, 49.1477, 0.03790),
+        (7, 1, 50.3298, 0.03742),
+        (14, 1, 51.5120, 0.03694),
+        (21, 1, 52.4695, 0.03669),
+        (28, 1, 53.3809, 0.03647),
+        (35, 1, 54.2454, 0.03627),
+        (42, 1, 55.0642, 0.03609),
+        (49, 1, 55.8406, 0.03593),
+        (56, 1, 56.5767, 0.03578),
+        (63, 1, 57.2761, 0.03564),
+        (70, 1, 57.9436, 0.03552),
+        (77, 1, 58.5816, 0.03540),
+        (84, 1, 59.1922, 0.03530),
+        (91, 1, 59.7773, 0.03520),
+        (122, 1, 62.0899, 0.03486),
+        (152, 1, 64.0301, 0.03463),
+        (183, 1, 65.7311, 0.03448),
+        (213, 1, 67.2873, 0.03441),
+        (244, 1, 68.7498, 0.0344),
+        (274, 1, 70.1435, 0.03444),
+        (304, 1, 71.4818, 0.03452),
+        (335, 1, 72.771, 0.03464),
+        (365, 1, 74.015, 0.03479),
+        (396, 1, 75.2176, 0.03496),
+        (426, 1, 76.3817, 0.03514),
+        (457, 1, 77.5099, 0.03534),
+        (487, 1, 78.6055, 0.03555),
+        (517, 1, 79.671, 0.03576),
+        (548, 1, 80.7079, 0.03598),
+        (578, 1, 81.7182, 0.0362),
+        (609, 1, 82.7036, 0.03643),
+        (639, 1, 83.6654, 0.03666),
+        (670, 1, 84.604, 0.03688),
+        (700, 1, 85.5202, 0.03711),
+        (730, 1, 86.4153, 0.03734),
+    ),
+}
+
+WEIGHT_FOR_LENGTH = {
+    "male": (
+        (45, -0.3521, 2.441, 0.09182),
+        (45.5, -0.3521, 2.5244, 0.09153),
+        (46, -0.3521, 2.6077, 0.09124),
+        (46.5, -0.3521, 2.6913, 0.09094),
+        (47, -0.3521, 2.7755, 0.09065),
+        (47.5, -0.3521, 2.8609, 0.09036),
+        (48, -0.3521, 2.948, 0.09007),
+        (48.5, -0.3521, 3.0377, 0.08977),
+        (49, -0.3521, 3.1308, 0.08948),
+        (49.5, -0.3521, 3.2276, 0.08919),
+        (50, -0.3521, 3.3278, 0.0889),
+        (50.5, -0.3521, 3.4311, 0.08861),
+        (51, -0.3521, 3.5376, 0.08831),
+        (51.5, -0.3521, 3.6477, 0.08801),
+        (52, -0.3521, 3.762, 0.08771),
+        (52.5, -0.3521, 3.8814, 0.08741),
+        (53, -0.3521, 4.006, 0.08711),
+        (53.5, -0.3521, 4.1354, 0.08681),
+        (54, -0.3521, 4.2693, 0.08651),
+        (54.5, -0.3521, 4.4066, 0.08621),
+        (55, -0.3521, 4.5467, 0.08592),
+        (55.5, -0.3521, 4.6892, 0.08563),
+        (56, -0.3521, 4.8338, 0.08535),
+        (56.5, -0.3521, 4.9796, 0.08507),
+        (57, -0.3521, 5.1259, 0.08481),
+        (57.5, -0.3521, 5.2721, 0.08455),
+        (58, -0.3521, 5.418, 0.0843),
+        (58.5, -0.3521, 5.5632, 0.08406),
+        (59, -0.3521, 5.7074, 0.08383),
+        (59.5, -0.3521, 5.8501, 0.08362),
+        (60, -0.3521, 5.9907, 0.08342),
+        (60.5, -0.3521, 6.1284, 0.08324),
+        (61, -0.3521, 6.2632, 0.08308),
+        (61.5, -0.3521, 6.3954, 0.08292),
+        (62, -0.3521, 6.5251, 0.08279),
+        (62.5, -0.3521, 6.6527, 0.08266),
+        (63, -0.3521, 6.7786, 0.08255),
+        (63.5, -0.3521, 6.9028, 0.08245),
+        (64, -0.3521, 7.0255, 0.08236),
+        (64.5, -0.3521, 7.1467, 0.08229),
+        (65, -0.3521, 7.2666, 0.08223),
+        (65.5, -0.3521, 7.3854, 0.08218),
+        (66, -0.3521, 7.5034, 0.08215),
+        (66.5, -0.3521, 7.6206, 0.08213),
+        (67, -0.3521, 7.737, 0.08212),
+        (67.5, -0.3521, 7.8526, 0.08212),
+        (68, -0.3521, 7.9674, 0.08214),
+        (68.5, -0.3521, 8.0816, 0.08216),
+        (69, -0.3521, 8.1955, 0.08219),
+        (69.5, -0.3521, 8.3092, 0.08224),
+        (70, -0.3521, 8.4227, 0.08229),
+        (70.5, -0.3521, 8.5358, 0.08235),
+        (71, -0.3521, 8.648, 0.08241),
+        (71.5, -0.3521, 8.7594, 0.08248),
+        (72, -0.3521, 8.8697, 0.08254),
+        (72.5, -0.3521, 8.9788, 0.08262),
+        (73, -0.3521, 9.0865, 0.08269),
+        (73.5, -0.3521, 9.1927, 0.08276),
+        (74, -0.3521, 9.2974, 0.08283),
+        (74.5, -0.3521, 9.401, 0.08289),
+        (75, -0.3521, 9.5032, 0.08295),
+        (75.5, -0.3521, 9.6041, 0.08301),
+        (76, -0.3521, 9.7033, 0.08307),
+        (76.5, -0.3521, 9.8007, 0.08311),
+        (77, -0.3521, 9.8963, 0.08314),
+        (77.5, -0.3521, 9.9902, 0.08317),
+        (78, -0.3521, 10.0827, 0.08318),
+        (78.5, -0.3521, 10.1741, 0.08318),
+        (79, -0.3521, 10.2649, 0.08316),
+        (79.5, -0.3521, 10.3558, 0.08313),
+        (80, -0.3521, 10.4475, 0.08308),
+        (80.5, -0.3521, 10.5405, 0.08301),
+        (81, -0.3521, 10.6352, 0.08293),
+        (81.5, -0.3521, 10.7322, 0.08284),
+        (82, -0.3521, 10.8321, 0.08273),
+        (82.5, -0.3521, 10.935, 0.0826),
+        (83, -0.3521, 11.0415, 0.08246),
+        (83.5, -0.3521, 11.1516, 0.08231),
+        (84, -0.3521, 11.2651, 0.08215),
+        (84.5, -0.3521, 11.3817, 0.08198),
+        (85, -0.3521, 11.5007, 0.08181),
+        (85.5, -0.3521, 11.6218, 0.08163),
+        (86, -0.3521, 11.7444, 0.08145),
+        (86.5, -0.3521, 11.8678, 0.08128),
+        (87, -0.3521, 11.9916, 0.08111),
+        (87.5, -0.3521, 12.1152, 0.08096),
+        (88, -0.3521, 12.2382, 0.08082),
+        (88.5, -0.3521, 12.3603, 0.08069),
+        (89, -0.3521, 12.4815, 0.08058),
+        (89.5, -0.3521, 12.6017, 0.08048),
+        (90, -0.3521, 12.7209, 0.08041),
+        (90.5, -0.3521, 12.8392, 0.08034),
+        (91, -0.3521, 12.9569, 0.0803),
+        (91.5, -0.3521, 13.0742, 0.08026),
+        (92, -0.3521, 13.191, 0.08025),
+        (92.5, -0.3521, 13.3075, 0.08025),
+        (93, -0.3521, 13.4239, 0.08026),
+        (93.5, -0.3521, 13.5404, 0.08029),
+        (94, -0.3521, 13.6572, 0.08034),
+        (94.5, -0.3521, 13.7746, 0.0804),
+        (95, -0.3521, 13.8928, 0.08047),
+        (95.5, -0.3521, 14.012, 0.08056),
+        (96, -0.3521, 14.1325, 0.08067),
+        (96.5, -0.3521, 14.2544, 0.08078),
+        (97, -0.3521, 14.3782, 0.08092),
+        (97.5, -0.3521, 14.5038, 0.08106),
+        (98, -0.3521, 14.6316, 0.08122),
+        (98.5, -0.3521, 14.7614, 0.08139),
+        (99, -0.3521, 14.8934, 0.08157),
+        (99.5, -0.3521, 15.0275, 0.08177),
+        (100, -0.3521, 15.1637, 0.08198),
+        (100.5, -0.3521, 15.3018, 0.0822),
+        (101, -0.3521, 15.4419, 0.08243),
+        (101.5, -0.3521, 15.5838, 0.08267),
+        (102, -0.3521, 15.7276, 0.08292),
+        (102.5, -0.3521, 15.8732, 0.08317),
+        (103, -0.3521, 16.0206, 0.08343),
+        (103.5, -0.3521, 16.1697, 0.0837),
+        (104, -0.3521, 16.3204, 0.08397),
+        (104.5, -0.3521, 16.4728, 0.08425),
+        (105, -0.3521, 16.6268, 0.08453),
+        (105.5, -0.3521, 16.7826, 0.08481),
+        (106, -0.3521, 16.9401, 0.0851),
+        (106.5, -0.3521, 17.0995, 0.08539),
+        (107, -0.3521, 17.2607, 0.08568),
+        (107.5, -0.3521, 17.4237, 0.08599),
+        (108, -0.3521, 17.5885, 0.08629),
+        (108.5, -0.3521, 17.7553, 0.0866),
+        (109, -0.3521, 17.9242, 0.08691),
+        (109.5, -0.3521, 18.0954, 0.08723),
+        (110, -0.3521, 18.2689, 0.08755),
+    ),
+    "female": (
+        (45, -0.3833, 2.4607, 0.09029),
+        (45.5, -0.3833, 2.5457, 0.09033),
+        (46, -0.3833, 2.6306, 0.09037),
+        (46.5, -0.3833, 2.7155, 0.0904),
+        (47, -0.3833, 2.8007, 0.09044),
+        (47.5, -0.3833, 2.8867, 0.09048),
+        (48, -0.3833, 2.9741, 0.09052),
+        (48.5, -0.3833, 3.0636, 0.09056),
+        (49, -0.3833, 3.156, 0.0906),
+        (49.5, -0.3833, 3.252, 0.09064),
+        (50, -0.3833, 3.3518, 0.09068),
+        (50.5, -0.3833, 3.4557, 0.09072),
+        (51, -0.3833, 3.5636, 0.09076),
+        (51.5, -0.3833, 3.6754, 0.0908),
+        (52, -0.3833, 3.7911, 0.09085),
+        (52.5, -0.3833, 3.9105, 0.09089),
+        (53, -0.3833, 4.0332, 0.09093),
+        (53.5, -0.3833, 4.1591, 0.09098),
+        (54, -0.3833, 4.2875, 0.09102),
+        (54.5, -0.3833, 4.4179, 0.09106),
+        (55, -0.3833, 4.5498, 0.0911),
+        (55.5, -0.3833, 4.6827, 0.09114),
+        (56, -0.3833, 4.8162, 0.09118),
+        (56.5, -0.3833, 4.95, 0.09121),
+        (57, -0.3833, 5.0837, 0.09125),
+        (57.5, -0.3833, 5.2173, 0.09128),
+        (58, -0.3833, 5.3507, 0.0913),
+        (58.5, -0.3833, 5.4834, 0.09132),
+        (59, -0.3833, 5.6151, 0.09134),
+        (59.5, -0.3833, 5.7454, 0.09135),
+        (60, -0.3833, 5.8742, 0.09136),
+        (60.5, -0.3833, 6.0014, 0.09137),
+        (61, -0.3833, 6.127, 0.09137),
+        (61.5, -0.3833, 6.2511, 0.09136),
+        (62, -0.3833, 6.3738, 0.09135),
+        (62.5, -0.3833, 6.4948, 0.09133),
+        (63, -0.3833, 6.6144, 0.09131),
+        (63.5, -0.3833, 6.7328, 0.09129),
+        (64, -0.3833, 6.8501, 0.09126),
+        (64.5, -0.3833, 6.9662, 0.09123),
+        (65, -0.3833, 7.0812, 0.09119),
+        (65.5, -0.3833, 7.195, 0.09115),
+        (66, -0.3833, 7.3076, 0.0911),
+        (66.5, -0.3833, 7.4189, 0.09106),
+        (67, -0.3833, 7.5288, 0.09101),
+        (67.5, -0.3833, 7.6375, 0.09096),
+        (68, -0.3833, 7.7448, 0.0909),
+        (68.5, -0.3833, 7.8509, 0.09085),
+        (69, -0.3833, 7.9559, 0.09079),
+        (69.5, -0.3833, 8.0599, 0.09074),
+        (70, -0.3833, 8.163, 0.09068),
+        (70.5, -0.3833, 8.2651, 0.09062),
+        (71, -0.3833, 8.3666, 0.09056),
+        (71.5, -0.3833, 8.4676, 0.0905),
+        (72, -0.3833, 8.5679, 0.09043),
+        (72.5, -0.3833, 8.6674, 0.09037),
+        (73, -0.3833, 8.7661, 0.09031),
+        (73.5, -0.3833, 8.8638, 0.09025),
+        (74, -0.3833, 8.9601, 0.09018),
+        (74.5, -0.3833, 9.0552, 0.09012),
+        (75, -0.3833, 9.149, 0.09005),
+        (75.5, -0.3833, 9.2418, 0.08999),
+        (76, -0.3833, 9.3337, 0.08992),
+        (76.5, -0.3833, 9.4252, 0.08985),
+        (77, -0.3833, 9.5166, 0.08979),
+        (77.5, -0.3833, 9.6086, 0.08972),
+        (78, -0.3833, 9.7015, 0.08965),
+        (78.5, -0.3833, 9.7957, 0.08959),
+        (79, -0.3833, 9.8915, 0.08952),
+        (79.5, -0.3833, 9.9892, 0.08946),
+        (80, -0.3833, 10.0891, 0.0894),
+        (80.5, -0.3833, 10.1916, 0.08934),
+        (81, -0.3833, 10.2965, 0.08928),
+        (81.5, -0.3833, 10.4041, 0.08923),
+        (82, -0.3833, 10.514, 0.08918),
+        (82.5, -0.3833, 10.6263, 0.08914),
+        (83, -0.3833, 10.741, 0.0891),
+        (83.5, -0.3833, 10.8578, 0.08906),
+        (84, -0.3833, 10.9767, 0.08903),
+        (84.5, -0.3833, 11.0974, 0.089),
+        (85, -0.3833, 11.2198, 0.08898),
+        (85.5, -0.3833, 11.3435, 0.08897),
+        (86, -0.3833, 11.4684, 0.08895),
+        (86.5, -0.3833, 11.594, 0.08895),
+        (87, -0.3833, 11.7201, 0.08895),
+        (87.5, -0.3833, 11.8461, 0.08895),
+        (88, -0.3833, 11.972, 0.08896),
+        (88.5, -0.3833, 12.0976, 0.08898),
+        (89, -0.3833, 12.2229, 0.089),
+        (89.5, -0.3833, 12.3477, 0.08903),
+        (90, -0.3833, 12.4723, 0.08906),
+        (90.5, -0.3833, 12.5965, 0.08909),
+        (91, -0.3833, 12.7205, 0.08913),
+        (91.5, -0.3833, 12.8443, 0.08918),
+        (92, -0.3833, 12.9681, 0.08923),
+        (92.5, -0.3833, 13.092, 0.08928),
+        (93, -0.3833, 13.2158, 0.08934),
+        (93.5, -0.3833, 13.3399, 0.08941),
+        (94, -0.3833, 13.4643, 0.08948),
+        (94.5, -0.3833, 13.5892, 0.08955),
+        (95, -0.3833, 13.7146, 0.08963),
+        (95.5, -0.3833, 13.8408, 0.08972),
+        (96, -0.3833, 13.9676, 0.08981),
+        (96.5, -0.3833, 14.0953, 0.0899),
+        (97, -0.3833, 14.2239, 0.09),
+        (97.5, -0.3833, 14.3537, 0.0901),
+        (98, -0.3833, 14.4848, 0.09021),
+        (98.5, -0.3833, 14.6174, 0.09033),
+        (99, -0.3833, 14.7519, 0.09044),
+        (99.5, -0.3833, 14.8882, 0.09057),
+        (100, -0.3833, 15.0267, 0.09069),
+        (100.5, -0.3833, 15.1676, 0.09083),
+        (101, -0.3833, 15.3108, 0.09096),
+        (101.5, -0.3833, 15.4564, 0.0911),
+        (102, -0.3833, 15.6046, 0.09125),
+        (102.5, -0.3833, 15.7553, 0.09139),
+        (103, -0.3833, 15.9087, 0.09155),
+        (103.5, -0.3833, 16.0645, 0.0917),
+        (104, -0.3833, 16.2229, 0.09186),
+        (104.5, -0.3833, 16.3837, 0.09203),
+        (105, -0.3833, 16.547, 0.09219),
+        (105.5, -0.3833, 16.7129, 0.09236),
+        (106, -0.3833, 16.8814, 0.09254),
+        (106.5, -0.3833, 17.0527, 0.09271),
+        (107, -0.3833, 17.2269, 0.09289),
+        (107.5, -0.3833, 17.4039, 0.09307),
+        (108, -0.3833, 17.5839, 0.09326),
+        (108.5, -0.3833, 17.7668, 0.09344),
+        (109, -0.3833, 17.9526, 0.09363),
+        (109.5, -0.3833, 18.1412, 0.09382),
+        (110, -0.3833, 18.3324, 0.09401),
+    ),
+}